@@ -1,18 +1,42 @@
 import os
+import asyncio
+import importlib
 import logging
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from dotenv import load_dotenv
-import yfinance as yf
-from alpha_vantage.timeseries import TimeSeries
+
+from agents.common.deadline import DeadlineMiddleware
+from agents.common.metrics import instrument_app, track
+from agents.common.warmup import Lazy, warm_up_on_startup
 
 logger = logging.getLogger("api_agent")
 logging.basicConfig(level=logging.INFO)
 load_dotenv()
 
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+# Upstream overrides, e.g. to run against the local stand-ins in benchmarks/loadtest
+ALPHA_VANTAGE_BASE_URL = os.getenv("ALPHA_VANTAGE_BASE_URL")  # default: https://www.alphavantage.co
+YFINANCE_ENABLED = os.getenv("YFINANCE_ENABLED", "1") not in ("0", "false", "False")
 app = FastAPI(title="API Agent – Full Market Data (AV+YF)")
+app.add_middleware(DeadlineMiddleware)  # honours X-Request-Deadline from the orchestrator
+instrument_app(app, "api_agent")
+
+# yfinance (and pandas under it) and alpha_vantage are imported on first use or by the
+# startup warm-up, not at import time
+def _alpha_vantage():
+    module = importlib.import_module("alpha_vantage.timeseries")
+    if ALPHA_VANTAGE_BASE_URL:
+        importlib.import_module("alpha_vantage.alphavantage").AlphaVantage._ALPHA_VANTAGE_API_URL = (
+            f"{ALPHA_VANTAGE_BASE_URL.rstrip('/')}/query?"
+        )
+    return module
+
+yfinance = Lazy("yfinance", lambda: importlib.import_module("yfinance"))
+alpha_vantage = Lazy("alpha_vantage", _alpha_vantage)
+warm_up_on_startup(app, yfinance, alpha_vantage)
 
 class StockRequest(BaseModel):
     symbols: List[str]
@@ -42,14 +66,15 @@ class MultiStockResponse(BaseModel):
 def av_get_timeseries(symbol, function, **kwargs):
     if not ALPHA_VANTAGE_API_KEY:
         raise Exception("Alpha Vantage API key not set")
-    ts = TimeSeries(key=ALPHA_VANTAGE_API_KEY, output_format='json')
+    ts = alpha_vantage.get().TimeSeries(key=ALPHA_VANTAGE_API_KEY, output_format='json')
     try:
-        if function == "INTRADAY":
-            data, meta = ts.get_intraday(symbol=symbol, interval=kwargs.get('interval', '5min'))
-        elif function == "DAILY":
-            data, meta = ts.get_daily(symbol=symbol)
-        else:
-            raise ValueError("Unknown AV function")
+        with track("alpha_vantage"):
+            if function == "INTRADAY":
+                data, meta = ts.get_intraday(symbol=symbol, interval=kwargs.get('interval', '5min'))
+            elif function == "DAILY":
+                data, meta = ts.get_daily(symbol=symbol)
+            else:
+                raise ValueError("Unknown AV function")
         return data
     except Exception as e:
         logger.warning(f"AV timeseries {function} failed for {symbol}: {e}")
@@ -63,36 +88,41 @@ def av_latest_from_ohlcv(data):
     price = float(data[latest_time]['4. close'])
     return price, latest_time
 
-@app.post("/quote", response_model=MultiStockResponse)
-async def get_full_data(req: StockRequest):
-    all_results = []
-    for symbol in req.symbols:
-        result = {"symbol": symbol.upper()}
-        av_ohlcv = None
-        av_price = None
-        av_time = None
-        if ALPHA_VANTAGE_API_KEY:
-            av_ohlcv = av_get_timeseries(symbol, "INTRADAY")
-            av_price, av_time = av_latest_from_ohlcv(av_ohlcv)
-            if av_price is not None:
-                result["latest_price"] = round(av_price, 2)
-                result["latest_timestamp"] = av_time
-            # Provide only 5 most recent OHLCV rows if requested
-            if req.history and av_ohlcv:
-                data_points = []
-                for dt, v in list(av_ohlcv.items())[:5]:  # Only 5 days
-                    row = {
-                        "date": dt,
-                        "open": float(v['1. open']),
-                        "high": float(v['2. high']),
-                        "low": float(v['3. low']),
-                        "close": float(v['4. close']),
-                        "volume": float(v['5. volume']),
-                    }
-                    data_points.append(row)
-                result["ohlcv_history"] = data_points
-        ticker = yf.Ticker(symbol)
-        try:
+def tail_records(frame, n: int) -> List[dict]:
+    """Last `n` rows of a yfinance DataFrame/Series, index included, as dicts."""
+    # Slice before reset_index so only n rows are copied
+    return frame.tail(n).reset_index().to_dict("records")
+
+def fetch_symbol(symbol: str, req: StockRequest) -> StockResponse:
+    result = {"symbol": symbol.upper()}
+    av_ohlcv = None
+    av_price = None
+    av_time = None
+    if ALPHA_VANTAGE_API_KEY:
+        av_ohlcv = av_get_timeseries(symbol, "INTRADAY")
+        av_price, av_time = av_latest_from_ohlcv(av_ohlcv)
+        if av_price is not None:
+            result["latest_price"] = round(av_price, 2)
+            result["latest_timestamp"] = av_time
+        # Provide only 5 most recent OHLCV rows if requested
+        if req.history and av_ohlcv:
+            data_points = []
+            for dt, v in list(av_ohlcv.items())[:5]:  # Only 5 days
+                row = {
+                    "date": dt,
+                    "open": float(v['1. open']),
+                    "high": float(v['2. high']),
+                    "low": float(v['3. low']),
+                    "close": float(v['4. close']),
+                    "volume": float(v['5. volume']),
+                }
+                data_points.append(row)
+            result["ohlcv_history"] = data_points
+    if not YFINANCE_ENABLED:
+        return StockResponse(**result)
+    ticker = yfinance.get().Ticker(symbol)
+    try:
+        with track("yfinance"):
             if result.get("latest_price") is None:
                 hist = ticker.history(period="1d")
                 if not hist.empty:
@@ -101,7 +131,7 @@ async def get_full_data(req: StockRequest):
                     result["latest_timestamp"] = str(latest.name)
             if req.history and (not result.get("ohlcv_history")):
                 hist = ticker.history(period="5d", interval="1d")
-                result["ohlcv_history"] = hist.reset_index().tail(2).to_dict("records")
+                result["ohlcv_history"] = tail_records(hist, 2)
             if req.info:
                 info = ticker.info
                 # Only return limited essential fields
@@ -109,11 +139,9 @@ async def get_full_data(req: StockRequest):
                     "longName", "sector", "industry", "currency", "exchange", "country", "website"
                 ] if k in info}
             if req.dividends:
-                divs = ticker.dividends.reset_index().tail(3).to_dict("records")
-                result["dividends"] = divs
+                result["dividends"] = tail_records(ticker.dividends, 3)
             if req.splits:
-                splits = ticker.splits.reset_index().tail(3).to_dict("records")
-                result["splits"] = splits
+                result["splits"] = tail_records(ticker.splits, 3)
             if req.financials:
                 # Limit to last 5 rows for each financial report
                 result["financials"] = {
@@ -122,7 +150,13 @@ async def get_full_data(req: StockRequest):
                     "cashflow": ticker.cashflow.iloc[:, :3].to_dict() if not ticker.cashflow.empty else {}
                 }
             # Do not fetch corporate actions for optimization!
-        except Exception as e:
-            logger.warning(f"yfinance fallback failed for {symbol}: {e}")
-        all_results.append(StockResponse(**result))
-    return MultiStockResponse(results=all_results)
+    except Exception as e:
+        logger.warning(f"yfinance fallback failed for {symbol}: {e}")
+    return StockResponse(**result)
+
+@app.post("/quote", response_model=MultiStockResponse)
+async def get_full_data(req: StockRequest):
+    # Symbols are independent (and the AV/yfinance clients are blocking), so fetch them
+    # side by side on the threadpool instead of one after another.
+    all_results = await asyncio.gather(*(run_in_threadpool(fetch_symbol, symbol, req) for symbol in req.symbols))
+    return MultiStockResponse(results=list(all_results))
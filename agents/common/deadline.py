@@ -0,0 +1,84 @@
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("deadline")
+
+# Absolute deadline for the whole request, as a Unix timestamp in seconds (float).
+DEADLINE_HEADER = "X-Request-Deadline"
+
+_current_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+
+def deadline_in(seconds: float) -> float:
+    return time.time() + seconds
+
+
+def remaining(deadline) -> float:
+    """Seconds left until `deadline` (None means no deadline -> infinity)."""
+    if deadline is None:
+        return float("inf")
+    return deadline - time.time()
+
+
+def current_deadline():
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """Make `deadline` the current one, as DeadlineMiddleware does, for an in-process call."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def time_left(default: float) -> float:
+    """Timeout to use for an outbound call: `default`, capped by the caller's deadline."""
+    # HTTP clients reject a zero timeout, so an expired deadline still yields a tiny one
+    return max(0.01, min(default, remaining(current_deadline())))
+
+
+def deadline_headers(deadline) -> dict:
+    return {DEADLINE_HEADER: f"{deadline:.3f}"} if deadline is not None else {}
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware: reads X-Request-Deadline, rejects already-expired requests with 504
+    before any work is done, and exposes the deadline to handlers via current_deadline().
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        deadline = None
+        for name, value in scope.get("headers", []):
+            if name.decode("latin-1").lower() == DEADLINE_HEADER.lower():
+                try:
+                    deadline = float(value.decode("latin-1"))
+                except ValueError:
+                    pass
+                break
+        if deadline is not None and remaining(deadline) <= 0:
+            logger.warning(f"Dropping {scope.get('path')}: deadline passed {-remaining(deadline):.2f}s ago")
+            body = json.dumps({"detail": "Request deadline exceeded"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        token = _current_deadline.set(deadline)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_deadline.reset(token)
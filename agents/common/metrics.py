@@ -0,0 +1,247 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("metrics")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TIMING_HEADER_ENABLED = os.getenv("METRICS_TIMING_HEADER", "0") in ("1", "true", "True")
+TIMING_REQUEST_HEADER = "x-debug-timing"
+
+# Per-request list of (name, seconds) used for the Server-Timing breakdown
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(names, values, extra=None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_one(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _render_one(self, key, value):
+        return [f"{self.name}{_fmt_labels(self.labels, key)} {value}"]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def _render_one(self, key, state):
+        lines = []
+        for bound, n in zip(self.buckets, state["counts"]):
+            le = 'le="%s"' % bound
+            lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {n}")
+        le = 'le="+Inf"'
+        lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le)} {state['count']}")
+        lines.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {state['sum']}")
+        lines.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {state['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, help_text, labels=()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labels, buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "Latency of inbound HTTP requests", ("service", "method", "path", "status"))
+NODE_LATENCY = REGISTRY.histogram(
+    "langgraph_node_duration_seconds", "Latency of orchestrator LangGraph nodes", ("node", "outcome"))
+OUTBOUND_LATENCY = REGISTRY.histogram(
+    "outbound_call_duration_seconds", "Latency of calls to external services and other agents", ("target", "outcome"))
+CACHE_EVENTS = REGISTRY.counter(
+    "cache_events_total", "Cache lookups by cache and result (hit, miss, ...)", ("cache", "event"))
+
+
+def _record_timing(name: str, seconds: float):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+@contextmanager
+def track(target: str):
+    """Time an outbound call (Groq, Cohere, SEC, another agent, ...)."""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        OUTBOUND_LATENCY.observe(elapsed, target=target, outcome=outcome)
+        _record_timing(target, elapsed)
+
+
+def timed_node(name: str, node):
+    """Wrap an async LangGraph node so its latency is recorded."""
+    async def run(state):
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await node(state)
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            NODE_LATENCY.observe(elapsed, node=name, outcome=outcome)
+            _record_timing(f"node_{name}", elapsed)
+    return run
+
+
+def cache_event(cache: str, event: str):
+    CACHE_EVENTS.inc(cache=cache, event=event)
+
+
+def _server_timing(timings, total) -> str:
+    merged = {}
+    for name, seconds in timings:
+        merged[name] = merged.get(name, 0.0) + seconds
+    parts = [f"total;dur={total * 1000:.1f}"]
+    parts.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in merged.items())
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and, on demand, a Server-Timing header."""
+
+    def __init__(self, app, service: str):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") == "/metrics":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        timings = []
+        token = _request_timings.set(timings)
+        want_header = TIMING_HEADER_ENABLED or any(
+            name.decode("latin-1").lower() == TIMING_REQUEST_HEADER for name, _ in scope.get("headers", [])
+        )
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if want_header:
+                    value = _server_timing(timings, time.perf_counter() - start)
+                    message = {**message, "headers": list(message.get("headers", [])) + [
+                        (b"server-timing", value.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_timings.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or (scope.get("path") if status["code"] != 404 else "unmatched")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                service=self.service, method=scope.get("method", ""), path=path, status=status["code"],
+            )
+
+
+def instrument_app(app, service: str):
+    """Add request metrics and a Prometheus-style GET /metrics endpoint to a FastAPI app."""
+    from fastapi.responses import PlainTextResponse
+
+    app.add_middleware(MetricsMiddleware, service=service)
+
+    def metrics():
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
@@ -0,0 +1,98 @@
+import os
+import re
+from dataclasses import dataclass
+
+# <SYMBOL>_<FORM>[_<CIK>][_filed<YYYYmmdd>]_<YYYYmmdd>_<HHMMSS>[_<n>].txt, as written by the
+# orchestrator's doc_writer: the EDGAR filing date when the scraper reported one, then the
+# time it was saved (the _<n> suffix avoids clobbering a file saved in the same second)
+_DOC_NAME = re.compile(
+    r"^(?P<symbol>[A-Z0-9.\-]+)_(?P<form>[A-Z0-9]+)(?:_(?P<cik>\d{10}))?(?:_filed(?P<filed>\d{8}))?"
+    r"_\d{8}_\d{6}(?:_\d+)?\.txt$"
+)
+
+# Files saved before the CIK was part of the name used company nicknames
+LEGACY_SYMBOLS = {"TSMC": ("TSM", "0001046179")}
+
+
+def normalize_form(form_type: str) -> str:
+    """Form type as spelled in filenames: both 20-F and 20F -> 20F."""
+    return form_type.replace("-", "").upper()
+
+
+def day_number(date: str) -> int:
+    """YYYY-MM-DD (or YYYYMMDD) -> YYYYMMDD as a number, for range filters."""
+    return int(date.replace("-", "")[:8])
+
+
+def parse_doc_filename(name: str) -> dict:
+    """
+    Partition tags for a scraped document: symbol, form_type, and when known cik and the
+    EDGAR filing date (filing_date as YYYY-MM-DD, filing_day as a YYYYMMDD number). The
+    save time in the name is not a filing date, so older files get no date tags.
+    Returns {} for files not named by the doc writer.
+    """
+    m = _DOC_NAME.match(os.path.basename(name))
+    if not m:
+        return {}
+    symbol, cik = m["symbol"], m["cik"]
+    if symbol in LEGACY_SYMBOLS:
+        symbol, legacy_cik = LEGACY_SYMBOLS[symbol]
+        cik = cik or legacy_cik
+    tags = {"symbol": symbol, "form_type": m["form"]}
+    if cik:
+        tags["cik"] = cik
+    date = m["filed"]
+    if date:
+        tags["filing_date"] = f"{date[:4]}-{date[4:6]}-{date[6:]}"
+        tags["filing_day"] = int(date)
+    return tags
+
+
+@dataclass
+class PartitionFilter:
+    """Which partitions a retrieval may search; empty fields don't restrict."""
+
+    symbols: tuple = ()
+    ciks: tuple = ()
+    form_types: tuple = ()
+    date_from: str = None  # inclusive, YYYY-MM-DD
+    date_to: str = None
+
+    def __post_init__(self):
+        self.symbols = tuple(dict.fromkeys(s.upper() for s in self.symbols or ()))
+        self.ciks = tuple(dict.fromkeys(c.zfill(10) for c in self.ciks or ()))
+        self.form_types = tuple(dict.fromkeys(normalize_form(f) for f in self.form_types or ()))
+
+    def __bool__(self):
+        return bool(self.symbols or self.ciks or self.form_types or self.date_from or self.date_to)
+
+    def matches(self, tags: dict) -> bool:
+        if self.symbols and tags.get("symbol") not in self.symbols:
+            return False
+        if self.ciks and tags.get("cik") not in self.ciks:
+            return False
+        if self.form_types and tags.get("form_type") not in self.form_types:
+            return False
+        day = tags.get("filing_day")
+        if self.date_from and (day is None or day < day_number(self.date_from)):
+            return False
+        if self.date_to and (day is None or day > day_number(self.date_to)):
+            return False
+        return True
+
+    def pinecone(self):
+        """The same restriction as a Pinecone metadata filter, or None."""
+        clauses = []
+        if self.symbols:
+            clauses.append({"symbol": {"$in": list(self.symbols)}})
+        if self.ciks:
+            clauses.append({"cik": {"$in": list(self.ciks)}})
+        if self.form_types:
+            clauses.append({"form_type": {"$in": list(self.form_types)}})
+        if self.date_from:
+            clauses.append({"filing_day": {"$gte": day_number(self.date_from)}})
+        if self.date_to:
+            clauses.append({"filing_day": {"$lte": day_number(self.date_to)}})
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
@@ -0,0 +1,36 @@
+import codecs
+import json
+
+
+def sse(data: dict, event: str = None) -> str:
+    return (f"event: {event}\n" if event else "") + f"data: {json.dumps(data)}\n\n"
+
+
+def parse_sse(raw: str):
+    """(event, data) for one server-sent event block."""
+    event, data = "message", ""
+    for line in raw.splitlines():
+        if line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data += line[5:].strip()
+    try:
+        return event, json.loads(data) if data else {}
+    except ValueError:
+        return event, {}
+
+
+class SSEDecoder:
+    """Incremental parser for a server-sent event byte stream: feed() raw chunks, get (event, data)s."""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        self._buffer = ""
+
+    def feed(self, chunk: bytes):
+        self._buffer += self._decoder.decode(chunk)
+        events = []
+        while "\n\n" in self._buffer:
+            block, self._buffer = self._buffer.split("\n\n", 1)
+            events.append(parse_sse(block))
+        return events
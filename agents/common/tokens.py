@@ -0,0 +1,49 @@
+import logging
+import re
+
+from agents.common.warmup import Lazy
+
+logger = logging.getLogger("tokens")
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _build_encoding():
+    # get_encoding downloads the BPE file on a cold host, so it is built on first use or
+    # by warm-up rather than at import
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # tiktoken missing, or its BPE file cannot be fetched
+        logger.warning(f"tiktoken unavailable, estimating token counts from words: {e}")
+        return None
+
+
+encoding = Lazy("tiktoken", _build_encoding)
+
+
+def tokenizer_name() -> str:
+    return "tiktoken" if encoding.get() is not None else "estimate"
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    enc = encoding.get()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    # ~1.3 BPE tokens per word/punctuation piece is close enough for budgeting
+    return int(len(_WORD_RE.findall(text)) * 1.3) + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    enc = encoding.get()
+    if enc is not None:
+        ids = enc.encode(text, disallowed_special=())
+        return text if len(ids) <= max_tokens else enc.decode(ids[:max_tokens])
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return text
+    return text[: int(len(text) * max_tokens / total)]
@@ -0,0 +1,56 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("warmup")
+
+# Build lazily-created clients in the background as soon as the app starts, so the first
+# request does not pay for them. The server accepts requests meanwhile either way.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") in ("1", "true", "True")
+
+_UNSET = object()
+
+
+class Lazy:
+    """A heavy import or client built on first use (or by warm-up), exactly once."""
+
+    def __init__(self, name: str, factory):
+        self.name = name
+        self._factory = factory
+        self._value = _UNSET
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not _UNSET
+
+    def get(self):
+        if self._value is _UNSET:
+            with self._lock:
+                if self._value is _UNSET:
+                    start = time.perf_counter()
+                    self._value = self._factory()
+                    logger.info(f"Loaded {self.name} in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return self._value
+
+
+def warm_up(*lazies: Lazy):
+    """Build `lazies` on a background thread now (WARMUP_ON_STARTUP), e.g. from a lifespan."""
+    if not WARMUP_ON_STARTUP:
+        return
+
+    def warm():
+        for lazy in lazies:
+            try:
+                lazy.get()
+            except Exception as e:
+                logger.warning(f"Warm-up of {lazy.name} failed; it will be retried on first use: {e}")
+
+    threading.Thread(target=warm, name="warmup", daemon=True).start()
+
+
+def warm_up_on_startup(app, *lazies: Lazy):
+    """Register a startup hook that builds `lazies` on a background thread (WARMUP_ON_STARTUP)."""
+    if WARMUP_ON_STARTUP:
+        app.add_event_handler("startup", lambda: warm_up(*lazies))
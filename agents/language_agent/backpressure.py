@@ -0,0 +1,90 @@
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+
+
+class Saturated(Exception):
+    """Raised when the LLM cannot take more work; maps to 429 (queue full) or 503 (waited too long)."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    At most `max_concurrency` LLM calls run at once and at most `max_queue` callers wait
+    for a slot. A caller arriving at a full queue is rejected immediately (429); a caller
+    that waits longer than `queue_timeout` seconds gives up (503). Both carry a
+    Retry-After estimated from recent call durations.
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_queue: int = 16, queue_timeout: float = 10.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._avg_hold = 2.0  # seconds, EWMA of how long a slot is held
+
+    def retry_after(self) -> int:
+        backlog = (self.waiting + 1) / self.max_concurrency
+        return max(1, math.ceil(backlog * self._avg_hold))
+
+    def check(self):
+        """Fail fast with 429 if a new caller would not even get a place in the queue."""
+        if self.active >= self.max_concurrency and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Saturated(429, "LLM queue full, retry later", self.retry_after())
+
+    async def acquire(self):
+        self.check()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise Saturated(503, "Timed out waiting for an LLM slot", self.retry_after())
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return time.monotonic()
+
+    def release(self, acquired_at: float):
+        self.active -= 1
+        self._avg_hold = 0.8 * self._avg_hold + 0.2 * (time.monotonic() - acquired_at)
+        self._sem.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        acquired_at = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(acquired_at)
+
+    def snapshot(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_call_s": round(self._avg_hold, 3),
+        }
+
+
+def build_limiter() -> ConcurrencyLimiter:
+    return ConcurrencyLimiter(
+        max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+        max_queue=int(os.getenv("LLM_MAX_QUEUE", "16")),
+        queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "10")),
+    )
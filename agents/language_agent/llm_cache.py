@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("language_agent.llm_cache")
+
+
+def cache_key(model: str, temperature: float, prompt: str) -> str:
+    raw = json.dumps([model, temperature, prompt], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskTier:
+    """One JSON file per key under `directory`; expiry is checked on read."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry["expires_at"] < time.time():
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+            return None
+        return entry["value"]
+
+    def set(self, key, value, ttl):
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"value": value, "expires_at": time.time() + ttl}, f)
+        os.replace(tmp, self._path(key))
+
+
+class RedisTier:
+    def __init__(self, url: str, prefix: str = "llm_cache:"):
+        import redis  # optional dependency, only needed for this tier
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=int(ttl))
+
+
+class LLMCache:
+    """
+    Bounded in-memory LRU+TTL cache for LLM completions, with an optional second tier
+    (disk or Redis) and single-flight: concurrent callers with the same key await the
+    one in-flight completion instead of each calling the model.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 900.0, tier=None, enabled: bool = True, on_event=None):
+        self.max_entries = max_entries
+        self.on_event = on_event  # optional callback(event_name), e.g. a metrics counter
+        self.ttl = ttl
+        self.tier = tier
+        self.enabled = enabled
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # key -> asyncio.Future
+        self.stats = {"hits": 0, "tier_hits": 0, "misses": 0, "shared": 0, "evictions": 0, "bypassed": 0}
+
+    def _count(self, event: str):
+        self.stats[event] += 1
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _get_local(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._count("evictions")
+
+    # Tier reads and writes are file or network IO, so they run off the event loop
+
+    async def _get_tier(self, key):
+        if self.tier is None:
+            return None
+        try:
+            return await asyncio.to_thread(self.tier.get, key)
+        except Exception as e:
+            logger.warning(f"LLM cache tier read failed: {e}")
+            return None
+
+    async def _set_tier(self, key, value):
+        if self.tier is None:
+            return
+        try:
+            await asyncio.to_thread(self.tier.set, key, value, self.ttl)
+        except Exception as e:
+            logger.warning(f"LLM cache tier write failed: {e}")
+
+    async def peek(self, key: str):
+        """Cached value for `key` (memory, then the tier) without computing anything."""
+        if not self.enabled:
+            return None
+        value = self._get_local(key)
+        if value is not None:
+            self._count("hits")
+            return value
+        value = await self._get_tier(key)
+        if value is not None:
+            self._count("tier_hits")
+            self._set_local(key, value)
+        return value
+
+    async def put(self, key: str, value: str):
+        """Store a completion produced outside get_or_compute (e.g. a finished stream)."""
+        if not self.enabled:
+            return
+        self._count("misses")
+        self._set_local(key, value)
+        await self._set_tier(key, value)
+
+    async def get_or_compute(self, key: str, compute, bypass: bool = False) -> str:
+        """
+        Return the cached completion for `key`, or await `compute()` (an async callable
+        returning the completion text) exactly once across concurrent callers.
+        """
+        if bypass or not self.enabled:
+            self._count("bypassed")
+            return await compute()
+
+        value = self._get_local(key)
+        if value is not None:
+            self._count("hits")
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._count("shared")
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # this caller was cancelled, not the leader
+                # The leader's request was cancelled mid-flight: compute it ourselves.
+                return await self.get_or_compute(key, compute)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._get_tier(key)
+            if value is not None:
+                self._count("tier_hits")
+            else:
+                self._count("misses")
+                value = await compute()
+                await self._set_tier(key, value)
+            self._set_local(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # Waiters see the same failure; nothing is cached.
+            future.set_exception(e)
+            future.exception()  # mark retrieved so an unobserved failure is not logged
+            raise
+        finally:
+            del self._inflight[key]
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["tier_hits"] + self.stats["misses"] + self.stats["shared"]
+        served = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+        }
+
+
+def build_llm_cache(on_event=None) -> LLMCache:
+    """Configure the cache from LLM_CACHE_* environment variables."""
+    tier = None
+    backend = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+    try:
+        if backend == "disk":
+            tier = DiskTier(os.getenv("LLM_CACHE_DIR", ".cache/llm"))
+        elif backend == "redis":
+            tier = RedisTier(os.getenv("LLM_CACHE_REDIS_URL", "redis://localhost:6379/2"))
+    except Exception as e:
+        logger.error(f"LLM cache {backend} tier unavailable, using memory only: {e}")
+    return LLMCache(
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+        ttl=float(os.getenv("LLM_CACHE_TTL", "900")),
+        tier=tier,
+        enabled=os.getenv("LLM_CACHE_ENABLED", "1") not in ("0", "false", "False"),
+        on_event=on_event,
+    )
@@ -1,10 +1,22 @@
+import ast
 import logging
 import os
-from fastapi import FastAPI, HTTPException
+import time
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from langchain_groq import ChatGroq
 from dotenv import load_dotenv
 
+from agents.common.deadline import DeadlineMiddleware
+from agents.common.metrics import cache_event, instrument_app, track
+from agents.common.sse import sse
+from agents.common.tokens import count_tokens, encoding as token_encoding
+from agents.common.warmup import Lazy, warm_up_on_startup
+from agents.language_agent.backpressure import Saturated, build_limiter
+from agents.language_agent.llm_cache import build_llm_cache, cache_key
+from agents.language_agent.ticker_matcher import get_ticker_matcher
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("language_agent")
 
@@ -12,116 +24,268 @@ logger = logging.getLogger("language_agent")
 load_dotenv()
 
 app = FastAPI(title="Language Agent – Market Analysis")
+app.add_middleware(DeadlineMiddleware)  # honours X-Request-Deadline from the orchestrator
+instrument_app(app, "language_agent")
 
 class AnalyzeRequest(BaseModel):
     question: str
     context: str = ""   # <-- Accept context from orchestrator!
+    no_cache: bool = False  # Bypass the LLM response cache
 
 class AnalyzeResponse(BaseModel):
     answer: str
 
 class SymbolExtractRequest(BaseModel):
     question: str
+    no_cache: bool = False
 
 class SymbolExtractResponse(BaseModel):
     symbols: list[str]
-    details: list[dict]  # Each dict: symbol, cik, filing_type
+    details: list[dict]  # Each dict: symbol, cik, filing_type (+ confidence for local matches)
+    method: str = "llm"  # "local" (trie match) or "llm" (fallback)
+    confidence: float = 0.0  # Lowest confidence among the returned local matches
 
  
 
 
 
 # --- Groq Llama 3.1/3.3 70B Instruct setup ---
-try:
-    groq_key = os.environ.get("GROQ_API_KEY")
-    if not groq_key:
-        logger.error("GROQ_API_KEY is missing from environment! Please check your .env file.")
-    llm = ChatGroq(
-        groq_api_key=groq_key,
-        model_name="llama3-70b-8192",
-        temperature=0.5,
-        max_tokens=1024
+LLM_MODEL = "llama3-70b-8192"
+LLM_TEMPERATURE = 0.5
+
+def _build_llm():
+    # langchain_groq pulls in most of langchain_core, so it is imported here rather than
+    # at module level; `llm.get()` returns None if initialization failed, as before
+    try:
+        from langchain_groq import ChatGroq
+        groq_key = os.environ.get("GROQ_API_KEY")
+        if not groq_key:
+            logger.error("GROQ_API_KEY is missing from environment! Please check your .env file.")
+        return ChatGroq(
+            groq_api_key=groq_key,
+            model_name=LLM_MODEL,
+            temperature=LLM_TEMPERATURE,
+            max_tokens=1024
+        )
+    except Exception as e:
+        logger.error(f"Error initializing Groq LLM: {e}")
+        return None
+
+llm = Lazy("groq_llm", _build_llm)
+
+# Identical prompts (dashboards, retries) are answered from here; see llm_cache.py
+llm_cache = build_llm_cache(on_event=lambda event: cache_event("llm", event))
+# Caps concurrent Groq calls and the queue in front of them; see backpressure.py
+llm_limiter = build_limiter()
+# Groq client, the ticker trie and the tokenizer are built in the background once the app is up
+warm_up_on_startup(app, llm, Lazy("ticker_matcher", get_ticker_matcher), token_encoding)
+
+
+@app.exception_handler(Saturated)
+async def saturated_handler(request: Request, exc: Saturated):
+    logger.warning(f"LLM saturated ({exc.status_code}): {exc.detail}; retry after {exc.retry_after}s")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
     )
-except Exception as e:
-    logger.error(f"Error initializing Groq LLM: {e}")
-    llm = None
 
 
+async def get_llm():
+    """The Groq client, built off the event loop on first use."""
+    return llm.get() if llm.loaded else await run_in_threadpool(llm.get)
+
+
+async def complete(prompt: str, bypass_cache: bool = False) -> str:
+    """Run the prompt through the LLM, deduplicated and cached by (model, temperature, prompt)."""
+    async def compute():
+        async with llm_limiter.slot():
+            with track("groq"):
+                result = await llm.get().ainvoke(prompt)
+        return result.content if hasattr(result, "content") else str(result)
+
+    key = cache_key(LLM_MODEL, LLM_TEMPERATURE, prompt)
+    return await llm_cache.get_or_compute(key, compute, bypass=bypass_cache)
+
 
-@app.post("/extract_symbols", response_model=SymbolExtractResponse)
-async def extract_symbols(req: SymbolExtractRequest):
-    logger.info(f"Received extract_symbols request: {req.question}")
 
-    # --- Load ticker->CIK mapping ONCE (as explained before) ---
-    import json
-    TICKER_TO_CIK = {}
-    with open("data_ingestion/company_tickers.json", "r") as f:
-        data = json.load(f)
-        for entry in data.values():
-            TICKER_TO_CIK[entry["ticker"].upper()] = str(entry["cik_str"]).zfill(10)
+FOREIGN_FILERS = {"TSM", "BABA", "INFY", "TCEHY"}
 
+
+def _symbol_details(symbols, ticker_to_cik, confidences=None):
+    # Add CIK + filing_type for each symbol (filing_type 10-K for US, 20-F for foreign)
+    details = []
+    for s in symbols[:3]:
+        cik = ticker_to_cik.get(s.upper())
+        # Heuristic: use 20-F for foreign (TSM, BABA, etc.), else 10-K
+        filing_type = "20-F" if s.upper() in FOREIGN_FILERS else "10-K"
+        if cik:
+            detail = {"symbol": s.upper(), "cik": cik, "filing_type": filing_type}
+            if confidences is not None:
+                detail["confidence"] = confidences.get(s.upper(), 0.0)
+            details.append(detail)
+    return details
+
+
+async def _llm_extract_symbols(question: str, bypass_cache: bool = False) -> list:
     # Prompt LLM for up to 3 tickers, Python list only
     prompt = (
         "You are a financial data extraction assistant. Given a financial question, "
         "extract the most relevant (up to 3) **US-listed** stock ticker symbols as a valid Python list of strings. "
         "DO NOT add explanation or text. ONLY return the list.\n\n"
-        f"Question: {req.question}\n\n"
+        f"Question: {question}\n\n"
         "Python list:"
     )
 
-    result = llm.invoke(prompt)
-    import ast
+    content = await complete(prompt, bypass_cache)
     try:
-        symbols = ast.literal_eval(result.content)
+        symbols = ast.literal_eval(content)
         if not isinstance(symbols, list):
             symbols = []
     except Exception:
         symbols = []
+    return [s for s in symbols if isinstance(s, str)]
 
-    # Add CIK + filing_type for each symbol (filing_type 10-K for US, 20-F for foreign)
-    details = []
-    for s in symbols[:3]:
-        cik = TICKER_TO_CIK.get(s.upper())
-        # Heuristic: use 20-F for foreign (TSM, BABA, etc.), else 10-K
-        filing_type = "20-F" if s.upper() in {"TSM", "BABA", "INFY", "TCEHY"} else "10-K"
-        if cik:
-            details.append({"symbol": s.upper(), "cik": cik, "filing_type": filing_type})
 
-    return {"symbols": [d["symbol"] for d in details], "details": details}
+@app.post("/extract_symbols", response_model=SymbolExtractResponse)
+async def extract_symbols(req: SymbolExtractRequest):
+    logger.info(f"Received extract_symbols request: {req.question}")
+    matcher = get_ticker_matcher()
 
+    # 1) Deterministic local match over tickers, company names and aliases
+    local = matcher.match(req.question)
+    if local.matches and not local.ambiguous:
+        confidences = {m.symbol: m.confidence for m in local.matches}
+        details = _symbol_details([m.symbol for m in local.matches], matcher.ticker_to_cik, confidences)
+        logger.info(f"Local symbol match: {confidences}")
+        return {
+            "symbols": [d["symbol"] for d in details],
+            "details": details,
+            "method": "local",
+            "confidence": local.confidence,
+        }
 
-@app.post("/analyze_graph", response_model=AnalyzeResponse)
-async def analyze_graph(req: AnalyzeRequest):
-    logger.info(f"LangGraph flow: question={req.question}")
-    logger.info(f"Context (truncated): {req.context[:200]}...")
+    # 2) Nothing (or nothing unambiguous) found locally: ask the LLM
+    if not await get_llm():
+        logger.error("LLM is not initialized! Returning local matches only.")
+        return {"symbols": [], "details": [], "method": "local", "confidence": 0.0}
+    logger.info(f"Local match {'ambiguous' if local.ambiguous else 'empty'}; falling back to LLM")
+    symbols = await _llm_extract_symbols(req.question, req.no_cache)
+    details = _symbol_details(symbols, matcher.ticker_to_cik)
+    return {"symbols": [d["symbol"] for d in details], "details": details, "method": "llm", "confidence": 0.0}
 
-    if not llm:
-        logger.error("LLM is not initialized! Check GROQ_API_KEY and initialization.")
-        raise HTTPException(500, "LLM not initialized. See server logs.")
 
+def build_brief_prompt(question: str, context: str) -> str:
     # Compose RAG prompt using both question and full context
-  # Compose RAG prompt using both question and full context
-    prompt = (
+    return (
         "You are a professional financial assistant that generates concise, high-quality market briefs for portfolio managers. "
         "You have access to multi-source context from APIs, earnings transcripts, SEC filings, and a vector knowledge base. "
         "Given the following question and context, generate a direct, data-rich response in exactly 2–4 sentences. "
         "The brief must include exposure percentages (if relevant), highlight earnings surprises with figures (e.g., 'beat by 4%'), "
         "summarize regional or sector sentiment, and focus on *actionable insights*. "
         "Avoid vague or generic commentary. Do not include any preamble or explanation—respond only with the brief.\n\n"
-        f"Context:\n{req.context}\n\n"
-        f"Question:\n{req.question}\n\n"
+        f"Context:\n{context}\n\n"
+        f"Question:\n{question}\n\n"
         "Market Brief:"
     )
 
 
+@app.post("/analyze_graph", response_model=AnalyzeResponse)
+async def analyze_graph(req: AnalyzeRequest):
+    logger.info(f"LangGraph flow: question={req.question}")
+    logger.info(f"Context (truncated): {req.context[:200]}...")
+
+    if not await get_llm():
+        logger.error("LLM is not initialized! Check GROQ_API_KEY and initialization.")
+        raise HTTPException(500, "LLM not initialized. See server logs.")
+
+    prompt = build_brief_prompt(req.question, req.context)
+
     try:
-        answer = llm.invoke(prompt)
+        answer = await complete(prompt, req.no_cache)
         logger.info("Answer synthesized.")
+    except Saturated:
+        raise
     except Exception as e:
         logger.error(f"LLM invocation failed: {e}", exc_info=True)
         raise HTTPException(500, f"LLM generation failed: {e}")
 
-    return AnalyzeResponse(answer=answer.content if hasattr(answer, "content") else str(answer))
+    return AnalyzeResponse(answer=answer)
+
+@app.post("/analyze_graph/stream")
+async def analyze_graph_stream(req: AnalyzeRequest):
+    """
+    Same brief as /analyze_graph, streamed as server-sent events:
+    `data: {"token": ...}` per chunk, then `event: done` with timing stats.
+    """
+    logger.info(f"Streaming flow: question={req.question}")
+    if not await get_llm():
+        logger.error("LLM is not initialized! Check GROQ_API_KEY and initialization.")
+        raise HTTPException(500, "LLM not initialized. See server logs.")
+
+    prompt = build_brief_prompt(req.question, req.context)
+    key = cache_key(LLM_MODEL, LLM_TEMPERATURE, prompt)
+
+    start = time.perf_counter()
+    cached = None if req.no_cache else await llm_cache.peek(key)
+    if cached is None:
+        # Reject up front while we can still answer with a 429 status
+        llm_limiter.check()
+
+    async def events():
+        if cached is not None:
+            yield sse({"token": cached})
+            yield sse({"cached": True, "ttft_ms": round((time.perf_counter() - start) * 1000, 2)}, "done")
+            return
+
+        parts = []
+        ttft = None
+        try:
+            async with llm_limiter.slot():
+                with track("groq_stream"):
+                    async for chunk in llm.get().astream(prompt):
+                        token = chunk.content if hasattr(chunk, "content") else str(chunk)
+                        if not token:
+                            continue
+                        if ttft is None:
+                            ttft = time.perf_counter() - start
+                        parts.append(token)
+                        yield sse({"token": token})
+        except Saturated as e:
+            yield sse({"error": e.detail, "retry_after": e.retry_after}, "error")
+            return
+        except Exception as e:
+            logger.error(f"LLM streaming failed: {e}", exc_info=True)
+            yield sse({"error": f"LLM generation failed: {e}"}, "error")
+            return
+
+        total = time.perf_counter() - start
+        gen_time = total - (ttft or 0.0)
+        answer = "".join(parts)
+        # Streamed chunks are not tokens; count with the same tokenizer as the context budget
+        tokens = count_tokens(answer)
+        stats = {
+            "cached": False,
+            "ttft_ms": round((ttft or total) * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+            "chunks": len(parts),
+            "tokens": tokens,
+            "tokens_per_s": round(tokens / gen_time, 2) if gen_time > 0 else None,
+        }
+        logger.info(f"Stream finished: {stats}")
+        if not req.no_cache:
+            await llm_cache.put(key, answer)
+        yield sse(stats, "done")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.get("/cache/stats")
+def cache_stats():
+    return llm_cache.snapshot()
+
+@app.get("/limiter/stats")
+def limiter_stats():
+    return llm_limiter.snapshot()
 
 @app.get("/ping")
 def ping():
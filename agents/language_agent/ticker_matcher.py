@@ -0,0 +1,258 @@
+import json
+import os
+import re
+import logging
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+logger = logging.getLogger("language_agent.ticker_matcher")
+
+TICKERS_PATH = os.getenv("TICKERS_PATH", "data_ingestion/company_tickers.json")
+ALIASES_PATH = os.getenv("TICKER_ALIASES_PATH", "")
+
+# Common nicknames / brand names that never appear in the SEC titles.
+DEFAULT_ALIASES = {
+    "tsmc": "TSM",
+    "taiwan semi": "TSM",
+    "taiwan semiconductor": "TSM",
+    "google": "GOOGL",
+    "alphabet": "GOOGL",
+    "facebook": "META",
+    "meta": "META",
+    "alibaba": "BABA",
+    "infosys": "INFY",
+    "tencent": "TCEHY",
+    "berkshire": "BRK-B",
+    "berkshire hathaway": "BRK-B",
+    "jp morgan": "JPM",
+    "jpmorgan": "JPM",
+    "coca cola": "KO",
+    "coke": "KO",
+    "amd": "AMD",
+    "nvidia": "NVDA",
+    "microsoft": "MSFT",
+    "amazon": "AMZN",
+    "tesla": "TSLA",
+    "netflix": "NFLX",
+    "broadcom": "AVGO",
+    "salesforce": "CRM",
+    "sony": "SONY",
+    "baidu": "BIDU",
+    "jd": "JD",
+    "pdd": "PDD",
+    "asml": "ASML",
+}
+
+# Legal-form words dropped from the end of SEC titles before indexing them.
+NAME_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited",
+    "plc", "sa", "ag", "nv", "se", "spa", "llc", "lp", "holding", "holdings",
+    "group", "the", "de", "new", "adr", "ads", "trust", "n", "v", "a", "s",
+}
+
+# Tickers that are also everyday English words / finance jargon. An upper-case hit on one
+# of these is only weak evidence; a cashtag ($ON) is still a strong one.
+AMBIGUOUS_TICKERS = {
+    "A", "I", "AI", "ALL", "AN", "ANY", "ARE", "AT", "BE", "BIG", "CAN", "CEO", "DO", "EPS",
+    "ETF", "FOR", "GDP", "GO", "HAS", "IPO", "IT", "KEY", "LOW", "NEW", "NOW", "ON", "ONE",
+    "OR", "OUT", "REAL", "SEC", "SEE", "SO", "TECH", "TWO", "US", "USA", "WELL", "YOU",
+    "ASIA", "EU", "UK", "Q", "PE", "ESG", "ATH", "ROI", "FREE", "OPEN", "PLAY", "RUN",
+}
+
+# One-word SEC names that are ordinary English words ("Show me the latest News on Tesla"
+# must not pull in News Corp). Capitalising them is only weak evidence; a cashtag or an
+# upper-case ticker still counts. Brands mostly meant as the company in finance questions
+# (Apple, Visa, Shell, Target, Oracle) are deliberately left out.
+COMMON_WORD_NAMES = {
+    "affirm", "allied", "amaze", "arena", "atlas", "authentic", "ball", "banner", "bark", "beyond", "bill",
+    "block", "box", "buckle", "cactus", "cadre", "capstone", "carnival", "cheer", "city", "click", "cluster",
+    "coffee", "compass", "cool", "crane", "crown", "crypto", "decent", "deluxe", "diploma", "eastern",
+    "elastic", "emerald", "employers", "endeavour", "enact", "everest", "evergreen", "fathom", "fold",
+    "forge", "fossil", "founder", "fox", "freedom", "frontier", "frontline", "fuse", "gap", "gates",
+    "genius", "glimpse", "grab", "gravity", "guess", "guild", "hello", "highway", "hippo", "honest", "hub",
+    "icon", "immersion", "integer", "inter", "interface", "intrusion", "joint", "lakeside", "lineage",
+    "lion", "lithium", "lucid", "match", "meridian", "mint", "mosaic", "mystic", "navigator", "news",
+    "noble", "northern", "nova", "orange", "orion", "outdoor", "paid", "perfect", "pineapple", "pony",
+    "pool", "popular", "porch", "post", "premier", "pros", "quantum", "remark", "root", "senior",
+    "sentinel", "slam", "sound", "southern", "spire", "star", "stem", "stride", "team", "ten", "tilt",
+    "track", "triumph", "ultimate", "unit", "upstart", "visionary", "wag", "waters", "weed", "yellow",
+}
+
+CONF_CASHTAG = 1.0
+CONF_ALIAS = 0.95
+CONF_MULTI_WORD_NAME = 0.9
+CONF_TICKER = 0.85
+CONF_SINGLE_WORD_NAME = 0.7
+CONF_WEAK = 0.4
+
+_TOKEN_RE = re.compile(r"\$?[A-Za-z0-9][A-Za-z0-9.\-&'\u2019]*")
+_POSSESSIVE_RE = re.compile(r"['\u2019]s$", re.IGNORECASE)  # "TSMC's" -> "TSMC"
+
+
+@dataclass
+class SymbolMatch:
+    symbol: str
+    cik: str
+    confidence: float
+    matched_text: str
+    kind: str  # cashtag | ticker | alias | name
+
+
+@dataclass
+class MatchResult:
+    matches: list = field(default_factory=list)
+    ambiguous: bool = False
+
+    @property
+    def confidence(self) -> float:
+        return min((m.confidence for m in self.matches), default=0.0)
+
+
+def _normalize_token(token: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", token.lower())
+
+
+def normalize_name(title: str) -> list:
+    """Lower-case an SEC title into word tokens and strip trailing legal-form words."""
+    words = [_normalize_token(w) for w in re.split(r"[\s,/.&\-]+", title)]
+    words = [w for w in words if w]
+    while words and words[-1] in NAME_SUFFIXES:
+        words.pop()
+    return words
+
+
+class TickerMatcher:
+    """
+    Word-level trie over tickers, company names and aliases.
+
+    `match()` walks the question once per start position and keeps the longest phrase
+    found there, so "Taiwan Semiconductor Manufacturing" wins over "Taiwan".
+    """
+
+    def __init__(self, entries, aliases=None, threshold: float = 0.7):
+        self.threshold = threshold
+        self.ticker_to_cik = {}
+        self._root = {}
+        for entry in entries:
+            ticker = entry["ticker"].upper()
+            cik = str(entry["cik_str"]).zfill(10)
+            # company_tickers.json is ordered by market cap: keep the first (largest) listing
+            self.ticker_to_cik.setdefault(ticker, cik)
+            words = normalize_name(entry.get("title", ""))
+            if words:
+                self._insert(words, ticker, cik, "name")
+        for alias, ticker in (aliases or {}).items():
+            ticker = ticker.upper()
+            cik = self.ticker_to_cik.get(ticker)
+            if cik:
+                self._insert(normalize_name(alias) or [_normalize_token(alias)], ticker, cik, "alias")
+
+    def _insert(self, words, ticker, cik, kind):
+        node = self._root
+        for w in words:
+            node = node.setdefault(w, {})
+        targets = node.setdefault("$", {})
+        # An alias always overrides a title for the same phrase ("meta" -> META, not a
+        # small company literally called "Meta").
+        if kind == "alias":
+            targets.clear()
+            targets[cik] = (ticker, kind)
+        elif not any(k == "alias" for _, k in targets.values()):
+            targets.setdefault(cik, (ticker, kind))
+
+    def _longest_phrase(self, words, start):
+        node = self._root
+        best = None
+        for i in range(start, len(words)):
+            node = node.get(words[i])
+            if node is None:
+                break
+            if "$" in node:
+                best = (i + 1, node["$"])
+        return best
+
+    def match(self, question: str, limit: int = 3) -> MatchResult:
+        raw_tokens = [_POSSESSIVE_RE.sub("", t) for t in _TOKEN_RE.findall(question)]
+        words = [_normalize_token(t) for t in raw_tokens]
+        found = {}
+        ambiguous = False
+        i = 0
+        while i < len(raw_tokens):
+            raw = raw_tokens[i]
+            # 1) Cashtags: "$TSM"
+            if raw.startswith("$") and raw[1:].upper() in self.ticker_to_cik:
+                t = raw[1:].upper()
+                self._keep(found, SymbolMatch(t, self.ticker_to_cik[t], CONF_CASHTAG, raw, "cashtag"))
+                i += 1
+                continue
+            # 2) Names / aliases, longest phrase first
+            phrase = self._longest_phrase(words, i)
+            if phrase:
+                end, targets = phrase
+                text = " ".join(raw_tokens[i:end])
+                if len(targets) > 1:
+                    # Same phrase, different companies (different CIKs) -> let the LLM decide
+                    ambiguous = True
+                else:
+                    (cik, (ticker, kind)), = targets.items()
+                    conf = self._phrase_confidence(raw_tokens[i:end], kind)
+                    self._keep(found, SymbolMatch(ticker, cik, conf, text, kind))
+                    if conf > CONF_WEAK or end - i > 1:
+                        i = end
+                        continue
+                    # A weak one-word name may still be an upper-case ticker ("BOX")
+            # 3) Bare tickers written in upper case: "TSM", "BRK-B"
+            t = raw.rstrip(".'").upper()
+            if raw.rstrip(".'").isupper() and t in self.ticker_to_cik:
+                conf = CONF_WEAK if (t in AMBIGUOUS_TICKERS or len(t) == 1) else CONF_TICKER
+                self._keep(found, SymbolMatch(t, self.ticker_to_cik[t], conf, raw, "ticker"))
+            i += 1
+
+        matches = sorted(found.values(), key=lambda m: -m.confidence)
+        confident = [m for m in matches if m.confidence >= self.threshold]
+        if not confident and matches:
+            ambiguous = True
+        return MatchResult(matches=confident[:limit], ambiguous=ambiguous and not confident)
+
+    @staticmethod
+    def _phrase_confidence(raw_tokens, kind):
+        if kind == "alias":
+            return CONF_ALIAS
+        if len(raw_tokens) > 1:
+            return CONF_MULTI_WORD_NAME
+        # One-word names ("Apple", "Target", "Oracle") collide with ordinary words unless
+        # the user capitalised them; everyday words ("News") stay weak even then.
+        word = raw_tokens[0]
+        if _normalize_token(word) in COMMON_WORD_NAMES:
+            return CONF_WEAK
+        return CONF_SINGLE_WORD_NAME if word[:1].isupper() else CONF_WEAK
+
+    @staticmethod
+    def _keep(found, match):
+        prev = found.get(match.symbol)
+        if prev is None or match.confidence > prev.confidence:
+            found[match.symbol] = match
+
+
+def load_aliases(path: str = ALIASES_PATH) -> dict:
+    aliases = dict(DEFAULT_ALIASES)
+    if path and os.path.exists(path):
+        with open(path, "r") as f:
+            aliases.update({k.lower(): v.upper() for k, v in json.load(f).items()})
+    return aliases
+
+
+def load_ticker_matcher(path: str = TICKERS_PATH, aliases: dict = None, threshold: float = 0.7) -> TickerMatcher:
+    """A matcher over an SEC company_tickers.json file."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    return TickerMatcher(data.values(), aliases=aliases, threshold=threshold)
+
+
+@lru_cache(maxsize=1)
+def get_ticker_matcher() -> TickerMatcher:
+    """Build the matcher once per process from company_tickers.json."""
+    threshold = float(os.getenv("SYMBOL_MATCH_THRESHOLD", "0.7"))
+    matcher = load_ticker_matcher(TICKERS_PATH, aliases=load_aliases(), threshold=threshold)
+    logger.info(f"Ticker matcher ready: {len(matcher.ticker_to_cik)} tickers")
+    return matcher
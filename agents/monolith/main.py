@@ -0,0 +1,20 @@
+"""
+Single-node deployment: one process, one port. The orchestrator serves at the root, every
+other agent is mounted under its own prefix (/api, /scraper, /retriever, /language,
+/voice) for direct use, and the orchestrator and voice agent call the other agents
+in-process instead of over localhost HTTP.
+
+    uvicorn agents.monolith.main:app --port 8000
+
+The per-agent apps in run_all_agents.sh are unchanged for distributed deployments.
+"""
+import importlib
+import os
+
+os.environ.setdefault("ORCHESTRATOR_MODE", "inprocess")
+
+from agents.orchestrator_agent.main import app  # noqa: E402
+from agents.orchestrator_agent.services import AGENT_MODULES  # noqa: E402
+
+for name in ("api", "scraper", "retriever", "language", "voice"):
+    app.mount(f"/{name}", importlib.import_module(AGENT_MODULES[name]).app)
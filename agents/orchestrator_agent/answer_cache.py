@@ -0,0 +1,244 @@
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+logger = logging.getLogger("orchestrator_agent.answer_cache")
+
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "of", "in", "on", "for", "to", "and", "or",
+    "our", "my", "me", "we", "us", "what", "whats", "how", "any", "do", "does", "did", "with", "about",
+    "please", "can", "you", "tell", "give", "show", "i", "it", "its", "s", "this", "that",
+}
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9%$.]+", question.lower().replace("'", "")))
+
+
+_FORM = re.compile(r"\b(10-?k|10-?q|20-?f|40-?f|6-?k|8-?k|s-?1|f-?1|def ?14a|13f|13d|13g)\b")
+_QUARTER = re.compile(r"\b(?:q([1-4])|([1-4])q|(first|second|third|fourth) quarter)\b")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?%?")
+_ORDINAL = {"first": "1", "second": "2", "third": "3", "fourth": "4"}
+_PERIOD = re.compile(
+    r"\b(?:(this|last|next|past|previous|current) (week|month|quarter|year)"
+    r"|(today|tonight|yesterday|tomorrow|ytd|year[ -]to[ -]date|latest))\b"
+)
+_PERIOD_ALIAS = {"tonight": "today", "year to date": "ytd", "year-to-date": "ytd", "past": "last", "previous": "last",
+                 "current": "this"}
+
+
+def question_specifics(question: str) -> frozenset:
+    """
+    The tokens that make two otherwise similar questions different questions: filing
+    forms (10-K vs 20-F), quarters (Q1, 3Q, "second quarter"), relative periods (today,
+    last year, YTD, latest) and numbers (years, percentages). A paraphrase must have
+    exactly the same ones.
+    """
+    text = question.lower().replace("\u2019", "'")
+    found = set()
+    for which, unit, word in _PERIOD.findall(text):
+        if word:
+            found.add("period:" + _PERIOD_ALIAS.get(word.replace("-", " "), word))
+        else:
+            found.add(f"period:{_PERIOD_ALIAS.get(which, which)} {unit}")
+    text = _PERIOD.sub(" ", text)
+    for form in _FORM.findall(text):
+        found.add("form:" + form.replace("-", "").replace(" ", ""))
+    text = _FORM.sub(" ", text)
+    for q, q_suffix, ordinal in _QUARTER.findall(text):
+        found.add("q" + (q or q_suffix or _ORDINAL[ordinal]))
+    text = _QUARTER.sub(" ", text)
+    found.update(_NUMBER.findall(text.replace(",", "")))
+    return frozenset(found)
+
+
+def embed_question(question: str, dims: int = 4096) -> dict:
+    """
+    Cheap local embedding: hashed word unigrams/bigrams plus character trigrams of the
+    content words, L2-normalised. Good enough to match paraphrases of the same question
+    ("Asia tech exposure today?" vs "what's our exposure to Asian tech today") without a
+    model round trip. Returned as a sparse {bucket: weight} dict.
+    """
+    words = [w for w in normalize_question(question).split() if w not in _STOPWORDS]
+    features = list(words)
+    features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"#{w}#"
+        features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    vec = {}
+    for feat in features:
+        bucket = int.from_bytes(hashlib.blake2b(feat.encode(), digest_size=4).digest(), "big") % dims
+        vec[bucket] = vec.get(bucket, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {k: v / norm for k, v in vec.items()}
+
+
+def cosine(a: dict, b: dict) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+@dataclass
+class CachedAnswer:
+    key: tuple
+    question: str
+    symbols: tuple
+    answer: str
+    created_at: float
+    embedding: dict
+    prices: dict = field(default_factory=dict)  # symbol -> price the answer was based on
+    accessions: dict = field(default_factory=dict)  # symbol -> filing accession number
+    source: str = "live"  # "prewarm" for answers computed ahead of demand
+    specifics: frozenset = frozenset()  # question_specifics() of the question
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+
+class AnswerCache:
+    """
+    Orchestrator answer cache keyed by (normalised question, resolved symbols).
+
+    Entries expire after `max_age` seconds, and are invalidated early when an input they
+    were built from changes materially: a quote for one of their symbols moves more than
+    `price_move` (fraction), or a newer filing accession is seen for one of their symbols.
+    Paraphrases hit through cosine similarity of question embeddings, restricted to
+    entries with exactly the same symbols and the same years, quarters, numbers and
+    filing forms (which barely move the embedding but change the answer).
+    """
+
+    def __init__(self, max_age: float = 300.0, max_entries: int = 512, price_move: float = 0.01,
+                 similarity: float = 0.8, embedder=embed_question, on_event=None):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.price_move = price_move
+        self.similarity = similarity
+        self.embedder = embedder
+        self.on_event = on_event
+        self._entries = OrderedDict()
+        self._by_symbol = {}  # symbol -> set of keys depending on it
+        self._lock = threading.Lock()
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "expired": 0,
+                      "invalidated_price": 0, "invalidated_filing": 0, "evictions": 0}
+
+    def _count(self, event: str):
+        self.stats[event] += 1
+        if self.on_event is not None:
+            self.on_event(event)
+
+    @staticmethod
+    def make_key(question: str, symbols) -> tuple:
+        return normalize_question(question), tuple(sorted(s.upper() for s in symbols))
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for s in entry.symbols:
+                self._by_symbol.get(s, set()).discard(key)
+
+    def lookup(self, question: str, symbols, max_age: float = None, count: bool = True):
+        """
+        Return (entry, "exact" | "semantic") for a fresh answer, or None. With count=False
+        (scheduled pre-warm runs) hits and misses stay out of the stats.
+        """
+        # A caller may ask for fresher answers, never for ones past the cache lifetime
+        max_age = self.max_age if max_age is None else min(max_age, self.max_age)
+        key = self.make_key(question, symbols)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.age <= max_age:
+                    self._entries.move_to_end(key)
+                    if count:
+                        self._count("exact_hits")
+                    return entry, "exact"
+                if entry.age > self.max_age:
+                    self._drop(key)
+                    self._count("expired")
+            candidates = [self._entries[k] for k in self._by_symbol.get(key[1][0], ()) if k in self._entries] \
+                if key[1] else [e for e in self._entries.values() if not e.symbols]
+            candidates = [e for e in candidates if e.symbols == key[1] and e.age <= max_age]
+        if candidates:
+            specifics = question_specifics(question)
+            candidates = [e for e in candidates if e.specifics == specifics]
+        if candidates:
+            emb = self.embedder(question)
+            best = max(candidates, key=lambda e: cosine(emb, e.embedding))
+            if cosine(emb, best.embedding) >= self.similarity:
+                if count:
+                    with self._lock:
+                        self._count("semantic_hits")
+                return best, "semantic"
+        if count:
+            with self._lock:
+                self._count("misses")
+        return None
+
+    def store(self, question: str, symbols, answer: str, prices=None, accessions=None, source: str = "live"):
+        key = self.make_key(question, symbols)
+        entry = CachedAnswer(
+            key=key, question=question, symbols=key[1], answer=answer, created_at=time.time(),
+            embedding=self.embedder(question), prices=dict(prices or {}), accessions=dict(accessions or {}),
+            source=source, specifics=question_specifics(question),
+        )
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = entry
+            for s in entry.symbols:
+                self._by_symbol.setdefault(s, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._count("evictions")
+
+    def observe_price(self, symbol: str, price):
+        """Invalidate answers built on a price for `symbol` that has since moved too far."""
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            return
+        symbol = symbol.upper()
+        with self._lock:
+            for key in list(self._by_symbol.get(symbol, ())):
+                entry = self._entries.get(key)
+                old = entry.prices.get(symbol) if entry else None
+                if old and abs(price - old) / abs(old) > self.price_move:
+                    logger.info(f"Invalidating cached answer for {key[0]!r}: {symbol} moved {old} -> {price}")
+                    self._drop(key)
+                    self._count("invalidated_price")
+
+    def observe_filing(self, symbol: str, accession: str):
+        """Invalidate answers built before a new filing accession for `symbol` appeared."""
+        if not accession:
+            return
+        symbol = symbol.upper()
+        with self._lock:
+            for key in list(self._by_symbol.get(symbol, ())):
+                entry = self._entries.get(key)
+                old = entry.accessions.get(symbol) if entry else None
+                if old and old != accession:
+                    logger.info(f"Invalidating cached answer for {key[0]!r}: new {symbol} filing {accession}")
+                    self._drop(key)
+                    self._count("invalidated_filing")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries)}
+
+
+def build_answer_cache(on_event=None) -> AnswerCache:
+    return AnswerCache(
+        max_age=float(os.getenv("ANSWER_CACHE_MAX_AGE", "300")),
+        max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512")),
+        price_move=float(os.getenv("ANSWER_CACHE_PRICE_MOVE", "0.01")),
+        similarity=float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.8")),
+        on_event=on_event,
+    )
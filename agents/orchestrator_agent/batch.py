@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import time
+
+from agents.common.deadline import deadline_in, remaining
+from agents.orchestrator_agent.answer_cache import normalize_question
+from agents.orchestrator_agent.context_assembler import assemble_context
+
+logger = logging.getLogger("orchestrator_agent.batch")
+
+
+def query_key(question, details) -> tuple:
+    return normalize_question(question), tuple(d["symbol"] for d in details)
+
+
+async def run_batch(questions, deadline, *, resolve, fetch_quotes, fetch_filing, fetch_chunks, synthesize,
+                    lookup=None, remember=None, max_concurrency: int = 4, data_share: float = 0.6):
+    """
+    Answer many questions while fetching every distinct input once.
+
+    Symbols are resolved per distinct question; answer-cache hits (`lookup`) are yielded
+    straight away. For the rest, quotes for all distinct symbols come from one call, and
+    each distinct filing (CIK + form) and retrieval query is fetched once and shared. LLM
+    synthesis then runs for each question with at most `max_concurrency` calls in flight,
+    and results are yielded in completion order as dicts tagged with the question's
+    `index`. A final {"done": True, ...} item summarises what was shared.
+
+    The fetchers are the orchestrator's: resolve(question, deadline) -> symbol details,
+    fetch_quotes(symbols, deadline), fetch_filing(detail, deadline), fetch_chunks(query,
+    deadline, symbols=...) and synthesize(question, context, deadline) -> answer. Retrieval
+    is restricted to each question's resolved symbols, as on the single-question path.
+    """
+    started = time.perf_counter()
+    # Fetches may use `data_share` of the time left; the rest is kept for synthesis
+    data_deadline = deadline_in(max(0.0, remaining(deadline)) * data_share)
+
+    # 1. Symbols, once per distinct question
+    distinct = {}
+    for q in questions:
+        distinct.setdefault(normalize_question(q), q)
+    resolved = await asyncio.gather(*(resolve(q, data_deadline) for q in distinct.values()))
+    details_for = dict(zip(distinct, resolved))
+
+    pending = []
+    hits = 0
+    for index, question in enumerate(questions):
+        details = details_for[normalize_question(question)]
+        hit = lookup(question, details) if lookup else None
+        if hit:
+            entry, match = hit
+            hits += 1
+            yield {"index": index, "question": question, "answer": entry.answer, "symbols": list(entry.symbols),
+                   "cached": True, "age_seconds": round(entry.age, 1), "cache_match": match}
+        else:
+            pending.append((index, question, details))
+
+    # 2. Each distinct input once, all concurrently
+    symbols = sorted({d["symbol"] for _, _, details in pending for d in details})
+    filings = {}
+    for _, _, details in pending:
+        for d in details:
+            filings.setdefault((d["cik"], d["filing_type"]), d)
+    queries = {}  # (normalised question, symbols) -> (question, symbols)
+    for _, question, details in pending:
+        queries.setdefault(query_key(question, details), (question, [d["symbol"] for d in details]))
+
+    async def no_quotes():
+        return []
+
+    quotes, filing_data, chunk_lists = await asyncio.gather(
+        fetch_quotes(symbols, data_deadline) if symbols else no_quotes(),
+        asyncio.gather(*(fetch_filing(d, data_deadline) for d in filings.values())),
+        asyncio.gather(*(fetch_chunks(q, data_deadline, symbols=syms) for q, syms in queries.values())),
+    )
+    quote_by_symbol = {q.get("symbol"): q for q in quotes}
+    filing_by_key = dict(zip(filings, filing_data))
+    chunks_by_query = dict(zip(queries, chunk_lists))
+    logger.info(
+        f"Batch of {len(questions)}: {hits} cached, {len(symbols)} symbols, {len(filings)} filings, "
+        f"{len(queries)} retrieval queries for {len(pending)} questions"
+    )
+
+    # 3. Synthesis per question, capped, yielded as each finishes
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def answer(index, question, details):
+        try:
+            return await synthesize_one(index, question, details)
+        except Exception as e:
+            logger.error(f"Batch synthesis failed for {question!r}: {e}")
+            return {"index": index, "question": question, "error": str(e), "cached": False}
+
+    async def synthesize_one(index, question, details):
+        q_quotes = [quote_by_symbol[d["symbol"]] for d in details if d["symbol"] in quote_by_symbol]
+        q_filings = [filing_by_key.get((d["cik"], d["filing_type"])) or {} for d in details]
+        context, stats = assemble_context(
+            q_quotes,
+            "\n\n".join(f.get("document_text", "") for f in q_filings if f.get("document_text")),
+            chunks_by_query.get(query_key(question, details), []),
+        )
+        async with sem:
+            text = await synthesize(question, context, deadline)
+        result = {
+            "answer": text,
+            "symbol_details": details,
+            "api_quotes": q_quotes,
+            "filing_accessions": {d["symbol"]: f["accession_number"]
+                                  for d, f in zip(details, q_filings) if f.get("accession_number")},
+        }
+        if remember:
+            remember(question, result)
+        return {"index": index, "question": question, "answer": text, "symbols": [d["symbol"] for d in details],
+                "cached": False, "context_stats": stats}
+
+    for next_done in asyncio.as_completed([answer(*p) for p in pending]):
+        yield await next_done
+
+    yield {
+        "done": True,
+        "questions": len(questions),
+        "cached": hits,
+        "distinct_symbols": len(symbols),
+        "distinct_filings": len(filings),
+        "distinct_queries": len(queries),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
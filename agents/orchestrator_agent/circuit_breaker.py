@@ -0,0 +1,140 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from agents.common.metrics import REGISTRY
+
+logger = logging.getLogger("orchestrator_agent.circuit_breaker")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = REGISTRY.gauge(
+    "circuit_breaker_state", "Downstream circuit state (0 closed, 1 half-open, 2 open)", ("target",))
+CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "circuit_breaker_rejections_total", "Calls short-circuited because the circuit was open", ("target",))
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a downstream whose circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"circuit for {name} is open (next probe in {retry_in:.1f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcomes of calls to one downstream over a sliding `window` (seconds).
+    Once at least `min_calls` were made and the failure rate reaches `failure_rate`, the
+    circuit opens and calls fail immediately with CircuitOpen. After `open_seconds` one
+    probe call is let through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_rate: float = 0.5, min_calls: int = 5, window: float = 30.0,
+                 open_seconds: float = 15.0):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes = deque()  # (monotonic time, ok)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+        CIRCUIT_STATE.set(0, target=name)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning(f"Circuit {self.name}: {self.state} -> {state}")
+            self.state = state
+            CIRCUIT_STATE.set(_STATE_VALUES[state], target=self.name)
+
+    def _trim(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def before_call(self):
+        """Raise CircuitOpen unless a call may go through now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            retry_in = self._opened_at + self.open_seconds - now
+            if self.state == OPEN and retry_in <= 0:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected += 1
+        CIRCUIT_REJECTIONS.inc(target=self.name)
+        raise CircuitOpen(self.name, max(0.0, retry_in))
+
+    def record_success(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                self._outcomes.clear()
+                self._set_state(CLOSED)
+            self._outcomes.append((now, True))
+            self._trim(now)
+
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                self._trip(now)
+                return
+            self._outcomes.append((now, False))
+            self._trim(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._trip(now)
+
+    def _trip(self, now: float):
+        self._opened_at = now
+        self.opened += 1
+        self._set_state(OPEN)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._trim(time.monotonic())
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            retry_in = self._opened_at + self.open_seconds - time.monotonic() if self.state == OPEN else 0.0
+            return {
+                "state": self.state,
+                "calls_in_window": calls,
+                "failure_rate": round(failures / calls, 3) if calls else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "next_probe_in_s": round(max(0.0, retry_in), 1),
+            }
+
+
+_breakers = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(
+            name,
+            failure_rate=float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5")),
+            min_calls=int(os.getenv("CIRCUIT_MIN_CALLS", "5")),
+            window=float(os.getenv("CIRCUIT_WINDOW", "30")),
+            open_seconds=float(os.getenv("CIRCUIT_OPEN_SECONDS", "15")),
+        )
+    return breaker
+
+
+def circuits_snapshot() -> dict:
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
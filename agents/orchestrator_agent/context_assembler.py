@@ -0,0 +1,119 @@
+import hashlib
+import logging
+import os
+import re
+
+from agents.common.tokens import count_tokens, tokenizer_name, truncate_to_tokens
+
+logger = logging.getLogger("orchestrator_agent.context")
+
+# Total prompt budget for the context block. llama3-70b-8192 has an 8,192-token window;
+# the fixed brief prompt is ~250 tokens and the answer may take up to 1,024.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+# Share of the budget reserved per source; whatever a source does not use is handed on.
+SOURCE_SHARES = {"quote": 0.1, "filing": 0.4, "chunks": 0.5}
+DUPLICATE_JACCARD = float(os.getenv("CONTEXT_DUPLICATE_JACCARD", "0.8"))
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _shingles(text: str, n: int = 5) -> set:
+    words = _WORD_RE.findall(text.lower())
+    return {" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _clean(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def _allocate(needs: dict, budget: int) -> dict:
+    """Give each source up to its share, then redistribute unused budget to sources that need more."""
+    alloc = {k: min(needs[k], int(budget * SOURCE_SHARES[k])) for k in needs}
+    spare = budget - sum(alloc.values())
+    for k in ("chunks", "filing", "quote"):
+        extra = min(spare, needs[k] - alloc[k])
+        alloc[k] += extra
+        spare -= extra
+    return alloc
+
+
+def render_quotes(quotes) -> list:
+    lines = []
+    for q in quotes:
+        if not q:
+            continue
+        line = f"Latest quote for {q.get('symbol')}: ${q.get('latest_price', 'N/A')} at {q.get('latest_timestamp', 'N/A')}"
+        info = q.get("info") or {}
+        if info.get("longName"):
+            line += f" ({info['longName']}, {info.get('sector', 'n/a')})"
+        lines.append(line)
+    return lines
+
+
+def assemble_context(quotes, filing_text: str, chunks, budget: int = CONTEXT_TOKEN_BUDGET):
+    """
+    Build the LLM context from quotes, filing text and retrieved chunks within `budget` tokens.
+
+    Chunks are ranked by retriever score, exact and near duplicates (of each other or of
+    the filing excerpt) are dropped, and the lowest-ranked survivor is trimmed to fit.
+    Returns (context, stats) where stats has the pre- and post-assembly token counts.
+    """
+    quote_block = "\n".join(render_quotes(quotes))
+    filing = _clean(filing_text)
+    ranked = sorted((c for c in chunks or [] if c.get("text")), key=lambda c: c.get("score", 0.0), reverse=True)
+
+    tokens_before = (
+        count_tokens(quote_block) + count_tokens(filing_text or "")
+        + sum(count_tokens(c["text"]) for c in ranked)
+    )
+
+    # Deduplicate chunks before spending budget on them
+    kept, seen_hashes, kept_shingles = [], set(), []
+    filing_shingles = _shingles(filing[:20000]) if filing else set()
+    dropped = 0
+    for c in ranked:
+        text = _clean(c["text"])
+        digest = hashlib.sha1(text.lower().encode("utf-8")).hexdigest()
+        sh = _shingles(text)
+        contained_in_filing = bool(sh) and len(sh & filing_shingles) / len(sh) >= DUPLICATE_JACCARD
+        if digest in seen_hashes or contained_in_filing or any(_jaccard(sh, k) >= DUPLICATE_JACCARD for k in kept_shingles):
+            dropped += 1
+            continue
+        seen_hashes.add(digest)
+        kept_shingles.append(sh)
+        kept.append(text)
+
+    chunk_tokens = [count_tokens(t) for t in kept]
+    needs = {"quote": count_tokens(quote_block), "filing": count_tokens(filing), "chunks": sum(chunk_tokens)}
+    alloc = _allocate(needs, budget)
+
+    pieces = []
+    if quote_block:
+        pieces.append(truncate_to_tokens(quote_block, alloc["quote"]))
+    if filing and alloc["filing"] > 0:
+        pieces.append(f"Latest SEC Filing: {truncate_to_tokens(filing, alloc['filing'])}")
+    selected, remaining = [], alloc["chunks"]
+    for text, n in zip(kept, chunk_tokens):
+        if remaining <= 0:
+            dropped += 1
+            continue
+        selected.append(text if n <= remaining else truncate_to_tokens(text, remaining))
+        remaining -= n
+    if selected:
+        pieces.append("Knowledge Base Chunks:\n" + "\n".join(selected))
+
+    context = "\n\n".join(p for p in pieces if p)
+    stats = {
+        "tokens_before": tokens_before,
+        "tokens_after": count_tokens(context),
+        "budget": budget,
+        "allocation": alloc,
+        "chunks_used": len(selected),
+        "chunks_dropped": dropped,
+        "tokenizer": tokenizer_name(),
+    }
+    return context, stats
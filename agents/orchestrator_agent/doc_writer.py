@@ -0,0 +1,190 @@
+import glob
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from agents.common.warmup import Lazy
+
+logger = logging.getLogger("orchestrator_agent.doc_writer")
+
+DOCS_DIR = os.getenv("SCRAPED_DOCS_DIR", "data_ingestion/docs")
+HASH_INDEX = ".content_hashes"  # one sha256 per line, for every document already on disk
+INGEST_BROKER_URL = os.getenv("INGEST_BROKER_URL")
+
+
+def _ingest_celery():
+    from celery import Celery
+    return Celery(broker=INGEST_BROKER_URL)
+
+# One Celery app (and broker connection pool) for every notification, built on first use
+ingest_celery = Lazy("ingest_celery", _ingest_celery)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def doc_filename(symbol: str, filing_type: str, cik: str = "", filing_date: str = "") -> str:
+    """
+    <SYMBOL>_<FORM>[_<CIK>][_filed<YYYYmmdd>]_<YYYYmmdd_HHMMSS>.txt, the last part being
+    when it was saved, e.g. TSM_20F_0001046179_filed20250417_20250528_204322.txt
+    """
+    parts = [symbol.upper(), filing_type.replace("-", "").upper()]
+    if cik:
+        parts.append(cik)
+    if filing_date:
+        parts.append("filed" + filing_date.replace("-", "")[:8])
+    parts.append(datetime.now().strftime("%Y%m%d_%H%M%S"))
+    return "_".join(parts) + ".txt"
+
+
+def notify_ingestion(paths):
+    """Tell the indexer that new documents landed (Celery, when INGEST_BROKER_URL is set)."""
+    if not INGEST_BROKER_URL:
+        logger.info(f"{len(paths)} new document(s) ready for indexing")
+        return
+    try:
+        ingest_celery.get().send_task("data_ingestion.celery_app.rebuild_faiss_index")
+        logger.info(f"Queued FAISS rebuild for {len(paths)} new document(s)")
+    except Exception as e:
+        logger.warning(f"Could not notify ingestion: {e}")
+
+
+class WriteBehindQueue:
+    """
+    Persists scraped filings off the request path. Documents are queued, written in
+    batches by one background thread, skipped when their content hash is already on
+    disk, and each batch that lands is announced through `notifier`.
+    """
+
+    def __init__(self, docs_dir: str = DOCS_DIR, batch_size: int = 8, flush_interval: float = 2.0,
+                 max_pending: int = 256, notifier=notify_ingestion):
+        self.docs_dir = docs_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.notifier = notifier
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._hashes = None  # loaded lazily by the writer thread
+        self._pending_hashes = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self.stats = {"submitted": 0, "written": 0, "duplicates": 0, "dropped": 0, "batches": 0}
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="doc-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Flush whatever is queued and stop the writer thread."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def submit(self, text: str, symbol: str, filing_type: str, cik: str = "", filing_date: str = "") -> bool:
+        """Queue a document; never blocks. Returns False if it was a duplicate or dropped."""
+        if not text:
+            return False
+        self.start()
+        digest = content_hash(text)
+        with self._lock:
+            if digest in self._pending_hashes or (self._hashes is not None and digest in self._hashes):
+                self.stats["duplicates"] += 1
+                return False
+            self._pending_hashes.add(digest)
+        try:
+            self._queue.put_nowait((digest, text, symbol, filing_type, cik, filing_date))
+        except queue.Full:
+            with self._lock:
+                self._pending_hashes.discard(digest)
+                self.stats["dropped"] += 1
+            logger.warning(f"Write-behind queue full; not persisting {symbol} {filing_type}")
+            return False
+        with self._lock:
+            self.stats["submitted"] += 1
+        return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "queued": self._queue.qsize()}
+
+    def _load_hashes(self):
+        os.makedirs(self.docs_dir, exist_ok=True)
+        index_path = os.path.join(self.docs_dir, HASH_INDEX)
+        hashes = set()
+        if os.path.exists(index_path):
+            with open(index_path, "r") as f:
+                hashes = {line.strip() for line in f if line.strip()}
+        else:
+            # First run: hash what is already there so old duplicates are recognised too
+            for path in glob.glob(os.path.join(self.docs_dir, "*.txt")):
+                with open(path, encoding="utf-8", errors="ignore") as f:
+                    hashes.add(content_hash(f.read()))
+            with open(index_path, "w") as f:
+                f.writelines(h + "\n" for h in sorted(hashes))
+        with self._lock:
+            self._hashes = hashes
+
+    def _run(self):
+        try:
+            self._load_hashes()
+        except Exception as e:
+            logger.error(f"Could not load document hash index: {e}")
+            with self._lock:
+                self._hashes = set()
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=min(timeout, 0.5)))
+                except queue.Empty:
+                    if self._stopping.is_set():
+                        break
+            if batch:
+                self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        written = []
+        for digest, text, symbol, filing_type, cik, filing_date in batch:
+            try:
+                with self._lock:
+                    if digest in self._hashes:
+                        self.stats["duplicates"] += 1
+                        continue
+                name = doc_filename(symbol, filing_type, cik, filing_date)
+                path = os.path.join(self.docs_dir, name)
+                n = 1
+                while os.path.exists(path):
+                    path = os.path.join(self.docs_dir, name[:-4] + f"_{n}.txt")
+                    n += 1
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                with open(os.path.join(self.docs_dir, HASH_INDEX), "a") as f:
+                    f.write(digest + "\n")
+                with self._lock:
+                    self._hashes.add(digest)
+                written.append(path)
+            except Exception as e:
+                logger.error(f"Failed to persist {symbol} {filing_type}: {e}")
+            finally:
+                with self._lock:
+                    self._pending_hashes.discard(digest)
+        with self._lock:
+            self.stats["written"] += len(written)
+            self.stats["batches"] += 1
+        if written and self.notifier is not None:
+            try:
+                self.notifier(written)
+            except Exception as e:
+                logger.warning(f"Ingestion notifier failed: {e}")
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+import httpx
+
+from agents.common.deadline import deadline_headers, remaining
+from agents.common.metrics import track
+from agents.orchestrator_agent.circuit_breaker import get_breaker
+
+logger = logging.getLogger("orchestrator_agent.downstream")
+
+# One long-lived, connection-pooled client per downstream agent
+POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("DOWNSTREAM_MAX_CONNECTIONS", "50")),
+    max_keepalive_connections=int(os.getenv("DOWNSTREAM_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=30.0,
+)
+# Upper bound for any single call, even when the request deadline is further out
+MAX_CALL_TIMEOUT = float(os.getenv("DOWNSTREAM_MAX_TIMEOUT", "120"))
+
+_clients = {}
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def get_client(agent: str) -> httpx.AsyncClient:
+    client = _clients.get(agent)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(limits=POOL_LIMITS, timeout=MAX_CALL_TIMEOUT)
+        _clients[agent] = client
+    return client
+
+
+async def close_clients():
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
+
+
+def call_budget(deadline, share: float = 1.0) -> float:
+    """Seconds this call may take: `share` of the time left on the request, capped."""
+    left = remaining(deadline)
+    if left <= 0:
+        raise DeadlineExceeded("request deadline already passed")
+    return min(MAX_CALL_TIMEOUT, left * share)
+
+
+@contextmanager
+def guarded(agent: str):
+    """
+    Run a call through `agent`'s circuit breaker: fail fast with CircuitOpen while the
+    circuit is open, and count transport errors, timeouts, 5xx responses, calls cut off
+    by a branch deadline and any other exception without an HTTP status as failures.
+    Only a real response below 500 (including 4xx) means the agent is up. Used for both
+    HTTP calls and in-process calls (services.py).
+    """
+    breaker = get_breaker(agent)
+    breaker.before_call()
+    try:
+        yield
+    except (httpx.TransportError, asyncio.CancelledError, asyncio.TimeoutError):
+        breaker.record_failure()
+        raise
+    except Exception as e:
+        # HTTPStatusError over HTTP; HTTPException and the like when called in-process
+        response = getattr(e, "response", None)
+        status = getattr(response, "status_code", None)
+        if not isinstance(status, int):
+            status = getattr(e, "status_code", None)
+        if isinstance(status, int) and status < 500:
+            breaker.record_success()
+        else:
+            # 5xx, or no status at all: connection errors from in-process calls,
+            # timeouts raised as plain exceptions, bugs
+            breaker.record_failure()
+        raise
+    else:
+        breaker.record_success()
+
+
+async def post_json(agent: str, url: str, payload: dict, deadline=None, share: float = 1.0) -> dict:
+    """
+    POST `payload` to `url` on the pooled client for `agent` and return the JSON body.
+    The call gets `share` of the remaining request time, and the downstream agent is
+    told its own deadline through the X-Request-Deadline header.
+    """
+    timeout = call_budget(deadline, share)
+    call_deadline = time.time() + timeout
+    with guarded(agent), track(f"{agent}_agent"):
+        resp = await get_client(agent).post(
+            url, json=payload, timeout=timeout, headers=deadline_headers(call_deadline)
+        )
+        resp.raise_for_status()
+    return resp.json()
+
+
+async def open_stream(agent: str, url: str, payload: dict, deadline=None) -> httpx.Response:
+    """Start a streaming POST; the caller must `aclose()` the returned response."""
+    timeout = call_budget(deadline)
+    client = get_client(agent)
+    request = client.build_request(
+        "POST", url, json=payload, timeout=timeout, headers=deadline_headers(deadline)
+    )
+    with guarded(agent):
+        resp = await client.send(request, stream=True)
+        if resp.status_code >= 400:
+            await resp.aread()
+            await resp.aclose()
+            resp.raise_for_status()
+    return resp
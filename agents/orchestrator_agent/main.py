@@ -1,11 +1,29 @@
 import os
+import json
+import asyncio
 import logging
-import requests
-from fastapi import FastAPI
+import operator
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from langgraph.graph import StateGraph
-from typing import TypedDict
-from datetime import datetime
+from langgraph.graph import START, StateGraph
+from typing import Annotated, Optional, TypedDict
+
+from agents.common.deadline import DeadlineMiddleware, current_deadline, deadline_in, remaining
+from agents.common.metrics import cache_event, instrument_app, timed_node
+from agents.common.sse import SSEDecoder, sse
+from agents.common.tokens import encoding as token_encoding
+from agents.common.warmup import warm_up
+from agents.orchestrator_agent.answer_cache import build_answer_cache
+from agents.orchestrator_agent.batch import run_batch
+from agents.orchestrator_agent.circuit_breaker import CircuitOpen, circuits_snapshot
+from agents.orchestrator_agent.context_assembler import assemble_context
+from agents.orchestrator_agent.doc_writer import WriteBehindQueue
+from agents.orchestrator_agent.prewarm import record_prewarm, refresh_age_for, summarize_prewarm
+from agents.orchestrator_agent.downstream import close_clients
+from agents.orchestrator_agent.services import ORCHESTRATOR_MODE, build_service
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("orchestrator_agent")
 
@@ -14,179 +32,470 @@ API_AGENT_URL = os.getenv("API_AGENT_URL", "https://finance-ai-agent-tnjq.onrend
 SCRAPER_AGENT_URL = os.getenv("SCRAPER_AGENT_URL", "https://finance-ai-agent-1.onrender.com/filing")
 RETRIEVER_AGENT_URL = os.getenv("RETRIEVER_AGENT_URL", "https://retriever-agent.onrender.com/retrieve")
 LANGUAGE_AGENT_URL = os.getenv("LANGUAGE_AGENT_URL", "https://finance-ai-agent-rqd6.onrender.com/analyze_graph")
+LANGUAGE_STREAM_URL = os.getenv("LANGUAGE_STREAM_URL", LANGUAGE_AGENT_URL + "/stream")
+
+# Over HTTP (default) or, with ORCHESTRATOR_MODE=inprocess, as direct calls; see services.py
+api_service = build_service("api", {"/quote": API_AGENT_URL})
+scraper_service = build_service("scraper", {"/filing": SCRAPER_AGENT_URL})
+retriever_service = build_service("retriever", {"/retrieve": RETRIEVER_AGENT_URL})
+language_service = build_service("language", {
+    "/extract_symbols": LANGUAGE_AGENT_URL.replace("/analyze_graph", "/extract_symbols"),
+    "/analyze_graph": LANGUAGE_AGENT_URL,
+    "/analyze_graph/stream": LANGUAGE_STREAM_URL,
+})
 
-app = FastAPI(title="Orchestrator Agent (LangGraph)")
+@asynccontextmanager
+async def lifespan(app):
+    doc_writer.start()
+    # The tokenizer for context budgets is built in the background once the app is up
+    warm_up(token_encoding)
+    yield
+    await close_clients()
+    await asyncio.to_thread(doc_writer.stop)
+
+app = FastAPI(title="Orchestrator Agent (LangGraph)", lifespan=lifespan)
+app.add_middleware(DeadlineMiddleware)
+instrument_app(app, "orchestrator_agent")
 
 # ----- State definition for LangGraph -----
  
 class MyState(TypedDict):
     question: str
-    api_quote: dict
+    api_quotes: list
     filing_text: str
     retrieved_chunks: list
     context: str
+    context_stats: dict
     answer: str
     symbol_details: list
+    deadline: float  # absolute Unix time by which the answer is due
+    degraded: Annotated[list, operator.add]  # branches that missed their deadline
+    filing_accessions: dict  # symbol -> accession number of the filing used
+
+
+# Per-branch deadlines (seconds). A branch that misses its deadline contributes nothing
+# to the context instead of holding up the answer.
+BRANCH_DEADLINES = {
+    "extract": float(os.getenv("EXTRACT_DEADLINE", "10")),
+    "api": float(os.getenv("API_BRANCH_DEADLINE", "20")),
+    "scraper": float(os.getenv("SCRAPER_BRANCH_DEADLINE", "30")),
+    "retriever": float(os.getenv("RETRIEVER_BRANCH_DEADLINE", "15")),
+}
+# Data branches may use at most this share of the time left on the request; the rest is
+# kept for the LLM call.
+BRANCH_DEADLINE_SHARE = float(os.getenv("BRANCH_DEADLINE_SHARE", "0.6"))
+# Overall deadline for requests that arrive without an X-Request-Deadline header
+ORCHESTRATE_TIMEOUT = float(os.getenv("ORCHESTRATE_TIMEOUT", "60"))
+
+
+def with_deadline(name, node, fallback):
+    node = timed_node(name, node)
+
+    async def run(state):
+        budget = min(BRANCH_DEADLINES[name], max(0.0, remaining(state.get("deadline")) * BRANCH_DEADLINE_SHARE))
+        try:
+            # The branch (and every call it makes) sees its own, tighter deadline
+            return await asyncio.wait_for(node({**state, "deadline": deadline_in(budget)}), timeout=budget)
+        except asyncio.TimeoutError:
+            logger.warning(f"{name} branch missed its {budget:.1f}s deadline; continuing without it")
+            return {**fallback, "degraded": [name]}
+    return run
 
 
 # ----- Workflow Nodes -----
 
 
 
-def save_text_for_faiss(doc_text, base_name="scraped_doc"):
-    # Ensure directory exists
-    save_dir = "data_ingestion/docs"
-    os.makedirs(save_dir, exist_ok=True)
-    # Unique filename by timestamp
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{base_name}_{ts}.txt"
-    with open(os.path.join(save_dir, filename), "w", encoding="utf-8") as f:
-        f.write(doc_text)
+# Scraped filings are persisted for the FAISS indexer by a background writer, so the
+# request never waits on disk I/O; see doc_writer.py
+doc_writer = WriteBehindQueue()
 
 
-def api_node(state):
-    logger.info("Calling Language Agent to extract symbols...")
-    question = state["question"]
-    print(question)
+def save_text_for_faiss(doc_text, symbol, filing_type, cik="", filing_date=""):
+    doc_writer.submit(doc_text, symbol, filing_type, cik, filing_date or "")
+
+
+# Answers are reused for repeated (or paraphrased) questions about the same symbols until
+# they age out or a quote/filing they were built from changes; see answer_cache.py
+answer_cache = build_answer_cache(on_event=lambda event: cache_event("answer", event))
+
+LLM_ERROR_ANSWER = "Sorry, there was an error generating your market brief."
+
+# Used when extraction fails or finds nothing, as before
+FALLBACK_DETAILS = [{"symbol": "TSM", "cik": "0001046179", "filing_type": "20-F"}]
+
+
+# Downstream calls, shared by the graph nodes and the batch endpoint
+async def fetch_symbols(question, deadline):
     try:
-        extract_resp = requests.post( 
-            LANGUAGE_AGENT_URL.replace("/analyze_graph", "/extract_symbols"),
-            json={"question": question}, timeout=3000
-        )
-        
-        extract_resp.raise_for_status()
-        
-        symbols = extract_resp.json().get("symbols", [])
-        logger.info(f"Extracted symbols: {symbols}")
-        if not symbols:
-            symbols = ["TSM"]  # fallback if nothing found
+        extracted = await language_service.call("/extract_symbols", {"question": question}, deadline)
+        details = extracted.get("details", [])
+        logger.info(f"Extracted symbols: {[d['symbol'] for d in details]} ({extracted.get('method', 'llm')})")
     except Exception as e:
         logger.error(f"Symbol extraction failed: {e}")
-        symbols = ["TSM"]
+        details = []
+    return details or FALLBACK_DETAILS
 
-    logger.info("Calling API Agent...")
+
+async def fetch_quotes(symbols, deadline):
+    """All symbols in one /quote call."""
     try:
-        resp = requests.post(API_AGENT_URL, json={"symbols": symbols, "history": True, "info": True}, timeout=3000)
-        resp.raise_for_status()
-        data = resp.json()["results"][0]  # just the first for now, or loop for all
-        logger.info(f"API Agent response: {data}")
+        resp = await api_service.call("/quote", {"symbols": symbols, "history": True, "info": True}, deadline)
+        quotes = resp["results"]
+        logger.info(f"API Agent returned {len(quotes)} quotes")
+        for q in quotes:
+            answer_cache.observe_price(q.get("symbol", ""), q.get("latest_price"))
     except Exception as e:
         logger.error(f"API Agent failed: {e}")
-        data = {"symbol": symbols[0], "latest_price": "N/A", "latest_timestamp": "N/A"}
-    return {"api_quote": data}
+        quotes = [{"symbol": s, "latest_price": "N/A", "latest_timestamp": "N/A"} for s in symbols]
+    return quotes
 
-def scraper_node(state):
-    logger.info("Calling Scraper Agent...")
-    filings = []
-    # details were fetched from extract_symbols before!
-    details = state.get("symbol_details", [])
-    for d in details:
-        cik = d["cik"]
-        filing_type = d["filing_type"]
-        try:
-            resp = requests.post(SCRAPER_AGENT_URL, json={"cik": cik, "filing_type": filing_type}, timeout=300)
-            resp.raise_for_status()
-            data = resp.json()
-            filing_text = data.get("document_text", "")
-            logger.info(f"Scraper Agent got filing for {d['symbol']}, length: {len(filing_text)}")
-            if filing_text:
-                save_text_for_faiss(filing_text, f"{d['symbol']}_{filing_type}")
-            filings.append(filing_text)
-        except Exception as e:
-            logger.error(f"Scraper Agent failed for {d['symbol']}: {e}")
-            filings.append("")
-    return {"filing_text": "\n\n".join(filings)}
-
-
-def retriever_node(state):
-    logger.info("Calling Retriever Agent...")
-    question = state["question"]
+
+async def fetch_filing(detail, deadline):
+    """The Scraper Agent's /filing response (document_text, accession_number, ...), or {} on failure."""
     try:
-        resp = requests.post(RETRIEVER_AGENT_URL, json={"query": question, "top_k": 3}, timeout=300)
-        resp.raise_for_status()
-        data = resp.json()
+        data = await scraper_service.call(
+            "/filing", {"cik": detail["cik"], "filing_type": detail["filing_type"]}, deadline
+        )
+        filing_text = data.get("document_text", "")
+        logger.info(f"Scraper Agent got filing for {detail['symbol']}, length: {len(filing_text)}")
+        if filing_text:
+            save_text_for_faiss(filing_text, detail["symbol"], detail["filing_type"], detail["cik"],
+                                data.get("filing_date"))
+        answer_cache.observe_filing(detail["symbol"], data.get("accession_number"))
+        return data
+    except Exception as e:
+        logger.error(f"Scraper Agent failed for {detail['symbol']}: {e}")
+        return {}
+
+
+async def fetch_chunks(query, deadline, top_k=3, symbols=None):
+    payload = {"query": query, "top_k": top_k}
+    if symbols:
+        payload["symbols"] = symbols  # search only these companies' chunks
+    try:
+        data = await retriever_service.call("/retrieve", payload, deadline)
         chunks = data.get("results", [])
         logger.info(f"Retriever Agent returned {len(chunks)} chunks")
     except Exception as e:
         logger.error(f"Retriever Agent failed: {e}")
         chunks = []
+    return chunks
+
+
+async def extract_node(state):
+    if state.get("symbol_details"):
+        return {}  # already resolved by the endpoint for the answer-cache lookup
+    logger.info("Calling Language Agent to extract symbols...")
+    details = await fetch_symbols(state["question"], state.get("deadline"))
+    return {"symbol_details": details}
+
+async def api_node(state):
+    logger.info("Calling API Agent...")
+    symbols = [d["symbol"] for d in state.get("symbol_details", [])]
+    return {"api_quotes": await fetch_quotes(symbols, state.get("deadline"))}
+
+async def scraper_node(state):
+    logger.info("Calling Scraper Agent...")
+    # One filing per extracted symbol, fetched concurrently
+    details = state.get("symbol_details", [])
+    filings = await asyncio.gather(*(fetch_filing(d, state.get("deadline")) for d in details))
+    return {
+        "filing_text": "\n\n".join(f.get("document_text", "") for f in filings if f.get("document_text")),
+        "filing_accessions": {
+            d["symbol"]: f["accession_number"] for d, f in zip(details, filings) if f.get("accession_number")
+        },
+    }
 
+
+async def retriever_node(state):
+    logger.info("Calling Retriever Agent...")
     # Remove fallback logic! Just pass the chunks (possibly empty)
-    return {"retrieved_chunks": chunks}
+    symbols = [d["symbol"] for d in state.get("symbol_details", [])]
+    return {"retrieved_chunks": await fetch_chunks(state["question"], state.get("deadline"), symbols=symbols)}
 
 
 
-def context_builder_node(state):
+async def context_builder_node(state):
     if "answer" in state and state["answer"]:
         return {}
     logger.info("Building context for LLM...")
-    context_pieces = []
-    # Quote
-    quote = state.get("api_quote", {})
-    print("quote is :", quote)
-    context_pieces.append(f"Latest quote for {quote.get('symbol')}: ${quote.get('price')} at {quote.get('timestamp')}")
-    # Filing
-    filing = state.get("filing_text", "")
-    print("fillin is :", filing)
-    if filing:
-        context_pieces.append(f"Latest SEC Filing: {filing[:2000]}")
-    # Retriever
-    chunks = state.get("retrieved_chunks", [])
-    if chunks:
-        context_pieces.append("Knowledge Base Chunks:\n" + "\n".join(chunk.get("text", "") for chunk in chunks))
-    full_context = "\n\n".join(context_pieces)
-    return {"context": full_context}
-
-def llm_node(state):
-    logger.info("Calling Language Agent (LLM)...")
-    question = state["question"]
-    context = state.get("context", "")
-    if "answer" in state and state["answer"]:
-        return {}
+    context, stats = assemble_context(
+        state.get("api_quotes", []),
+        state.get("filing_text", ""),
+        state.get("retrieved_chunks", []),
+    )
+    logger.info(
+        f"Context tokens: {stats['tokens_before']} -> {stats['tokens_after']} "
+        f"(budget {stats['budget']}, {stats['chunks_used']} chunks kept, {stats['chunks_dropped']} dropped)"
+    )
+    return {"context": context, "context_stats": stats}
+
+async def synthesize(question, context, deadline):
     try:
-        resp = requests.post(LANGUAGE_AGENT_URL, json={"question": question, "context": context}, timeout=3000)
-        resp.raise_for_status()
-        data = resp.json()
+        data = await language_service.call("/analyze_graph", {"question": question, "context": context}, deadline)
         answer = data.get("answer", "No answer.")
         logger.info(f"Language Agent returned answer: {answer[:200]}")
     except Exception as e:
         logger.error(f"Language Agent failed: {e}")
-        answer = "Sorry, there was an error generating your market brief."
-    return {"answer": answer}
+        answer = LLM_ERROR_ANSWER
+    return answer
+
+async def llm_node(state):
+    logger.info("Calling Language Agent (LLM)...")
+    if "answer" in state and state["answer"]:
+        return {}
+    return {"answer": await synthesize(state["question"], state.get("context", ""), state.get("deadline"))}
 
 # ---- LangGraph Workflow Definition ----
-workflow = (
-    StateGraph(state_schema=MyState)
-    .add_node("api", api_node)
-    .add_node("scraper", scraper_node)
-    .add_node("retriever", retriever_node)
-    .add_node("context_builder", context_builder_node)
-    .add_node("llm", llm_node)
-    # Edges
-    .add_edge("api", "scraper")
-    .add_edge("scraper", "retriever")
-    .add_edge("retriever", "context_builder")
-    .add_edge("context_builder", "llm")
-    .set_entry_point("api")
-    .set_finish_point("llm")
-    .compile()
-)
+def build_workflow(include_llm: bool = True):
+    graph = (
+        StateGraph(state_schema=MyState)
+        .add_node("extract", with_deadline("extract", extract_node, {"symbol_details": FALLBACK_DETAILS}))
+        .add_node("api", with_deadline("api", api_node, {"api_quotes": []}))
+        .add_node("scraper", with_deadline("scraper", scraper_node, {"filing_text": ""}))
+        .add_node("retriever", with_deadline("retriever", retriever_node, {"retrieved_chunks": []}))
+        .add_node("context_builder", timed_node("context_builder", context_builder_node))
+        # Edges: symbols are extracted once and feed the quote, filing and retrieval branches
+        # (retrieval searches only those symbols' chunks; the endpoints resolve symbols before
+        # running the graph, so extract is normally a no-op). All join at context_builder.
+        .add_edge(START, "extract")
+        .add_edge("extract", "api")
+        .add_edge("extract", "scraper")
+        .add_edge("extract", "retriever")
+        .add_edge(["api", "scraper", "retriever"], "context_builder")
+    )
+    if include_llm:
+        graph = graph.add_node("llm", timed_node("llm", llm_node)).add_edge("context_builder", "llm").set_finish_point("llm")
+    else:
+        # Streaming requests stop after context assembly and stream the LLM call themselves
+        graph = graph.set_finish_point("context_builder")
+    return graph.compile()
+
+
+workflow = build_workflow()
+context_workflow = build_workflow(include_llm=False)
 
 # ----- FastAPI Endpoint -----
 class OrchestrateRequest(BaseModel):
     question: str
+    max_age: Optional[float] = None  # accept a cached answer at most this old (s); 0 skips the cache
 
 class OrchestrateResponse(BaseModel):
     answer: str
+    context_stats: Optional[dict] = None  # token counts before/after context assembly
+    degraded: list[str] = []  # data branches that timed out for this answer
+    cached: bool = False
+    age_seconds: Optional[float] = None  # age of the cached answer
+    cache_match: Optional[str] = None  # "exact" or "semantic"
+
+def request_deadline() -> float:
+    """Deadline propagated by the caller (X-Request-Deadline), else ORCHESTRATE_TIMEOUT from now."""
+    return current_deadline() or deadline_in(ORCHESTRATE_TIMEOUT)
+
+
+# Symbol extraction runs ahead of the graph (the cache key needs the symbols), under the
+# same deadline the extract node would have had
+resolve_symbols = with_deadline("extract", extract_node, {"symbol_details": FALLBACK_DETAILS})
+
+
+async def cached_answer(req: OrchestrateRequest, deadline):
+    """Resolve symbols, then look the question up. Returns (symbol_details, hit or None)."""
+    resolved = await resolve_symbols({"question": req.question, "deadline": deadline})
+    details = resolved["symbol_details"]
+    if req.max_age == 0:
+        return details, None
+    hit = answer_cache.lookup(req.question, [d["symbol"] for d in details], req.max_age)
+    if hit:
+        entry, match = hit
+        logger.info(f"Answer cache {match} hit ({entry.age:.0f}s old) for: {req.question}")
+        if entry.source == "prewarm":
+            cache_event("answer", "prewarm_hits")
+    return details, hit
+
+
+def remember_answer(question, result, source="live"):
+    """Cache a complete answer together with the quotes and filings it was built from."""
+    answer = result.get("answer", "")
+    if not answer or answer == LLM_ERROR_ANSWER or result.get("degraded"):
+        return
+    answer_cache.store(
+        question,
+        [d["symbol"] for d in result.get("symbol_details", [])],
+        answer,
+        prices={q["symbol"]: q["latest_price"] for q in result.get("api_quotes", [])
+                if isinstance(q.get("latest_price"), (int, float))},
+        accessions=result.get("filing_accessions", {}),
+        source=source,
+    )
+
 
 @app.post("/orchestrate", response_model=OrchestrateResponse)
-def orchestrate(req: OrchestrateRequest):
+async def orchestrate(req: OrchestrateRequest):
     logger.info(f"Received orchestrate request: {req.question}")
-    state = {"question": req.question}
-    result = workflow.invoke(state)
+    deadline = request_deadline()
+    details, hit = await cached_answer(req, deadline)
+    if hit:
+        entry, match = hit
+        return OrchestrateResponse(answer=entry.answer, cached=True, age_seconds=round(entry.age, 1), cache_match=match)
+    state = {"question": req.question, "deadline": deadline, "symbol_details": details}
+    result = await workflow.ainvoke(state)
     answer = result["answer"]
-    return OrchestrateResponse(answer=answer)
+    remember_answer(req.question, result)
+    return OrchestrateResponse(
+        answer=answer,
+        context_stats=result.get("context_stats"),
+        degraded=result.get("degraded", []),
+    )
+
+
+@app.post("/orchestrate/stream")
+async def orchestrate_stream(req: OrchestrateRequest):
+    """
+    Runs the data-gathering nodes, then relays the Language Agent's server-sent event
+    stream (token events + a final `done` event) straight through to the caller.
+    """
+    logger.info(f"Received orchestrate/stream request: {req.question}")
+    deadline = request_deadline()
+    details, hit = await cached_answer(req, deadline)
+    if hit:
+        entry, match = hit
+
+        async def replay():
+            yield sse({"token": entry.answer})
+            yield sse({"ttft_ms": 0, "total_ms": 0, "cached": True,
+                       "age_seconds": round(entry.age, 1), "cache_match": match}, event="done")
+
+        return StreamingResponse(replay(), media_type="text/event-stream")
+
+    state = await context_workflow.ainvoke({"question": req.question, "deadline": deadline, "symbol_details": details})
+    try:
+        resp = await language_service.stream(
+            "/analyze_graph/stream", {"question": req.question, "context": state.get("context", "")}, deadline
+        )
+    except CircuitOpen as e:
+        raise HTTPException(503, str(e), headers={"Retry-After": str(max(1, round(e.retry_in)))})
+    except Exception as e:
+        logger.error(f"Language Agent stream failed: {e}")
+        raise HTTPException(502, f"Language Agent stream failed: {e}")
+
+    async def relay():
+        # Bytes go through untouched; tokens are collected on the side so a completed
+        # answer can be cached like a non-streamed one
+        decoder, tokens, completed = SSEDecoder(), [], False
+        try:
+            async for chunk in resp.aiter_raw():
+                yield chunk
+                for event, data in decoder.feed(chunk):
+                    if event == "done":
+                        completed = True
+                    elif event == "error":
+                        tokens = None
+                    elif tokens is not None and "token" in data:
+                        tokens.append(data["token"])
+        finally:
+            await resp.aclose()
+        if completed and tokens:
+            remember_answer(req.question, {**state, "answer": "".join(tokens)})
+
+    return StreamingResponse(relay(), media_type="text/event-stream")
+
+class BatchRequest(BaseModel):
+    questions: list[str]
+    max_age: Optional[float] = None  # as for /orchestrate; 0 skips the answer cache
+
+# LLM calls in flight per batch; the Language Agent's own limiter still applies on top
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+
+@app.post("/orchestrate_batch")
+async def orchestrate_batch(req: BatchRequest):
+    """
+    Many questions at once, sharing every quote, filing and retrieval fetch between them;
+    see batch.py. Streams one JSON line per question as it completes, then a summary line.
+    """
+    logger.info(f"Received orchestrate_batch request: {len(req.questions)} questions")
+    deadline = request_deadline()
+
+    async def resolve(question, data_deadline):
+        return (await resolve_symbols({"question": question, "deadline": data_deadline}))["symbol_details"]
+
+    def lookup(question, details):
+        if req.max_age == 0:
+            return None
+        return answer_cache.lookup(question, [d["symbol"] for d in details], req.max_age)
+
+    async def lines():
+        async for item in run_batch(
+            req.questions, deadline,
+            resolve=resolve, fetch_quotes=fetch_quotes, fetch_filing=fetch_filing, fetch_chunks=fetch_chunks,
+            synthesize=synthesize, lookup=lookup, remember=remember_answer,
+            max_concurrency=BATCH_LLM_CONCURRENCY, data_share=BRANCH_DEADLINE_SHARE,
+        ):
+            yield json.dumps(item) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+class PrewarmRequest(BaseModel):
+    questions: list[str]
+    period: float = 60.0  # seconds until the next scheduled run
+    # Answers younger than this (s) are kept as they are; by default those that would
+    # still be in the cache at the next run (age + period <= the cache's max age)
+    refresh_age: Optional[float] = None
+
+# Overall deadline for a pre-warm run; it is background work, so more generous
+PREWARM_TIMEOUT = float(os.getenv("PREWARM_TIMEOUT", "300"))
+_prewarm_running = asyncio.Lock()
+
+@app.post("/prewarm")
+async def prewarm(req: PrewarmRequest):
+    """
+    Computes answers for a watchlist ahead of demand (run by the scheduled job in
+    data_ingestion/celery_app.py). Questions are answered like /orchestrate_batch, except
+    that cached answers older than `refresh_age` are recomputed rather than reused, so
+    peak-hour requests find fresh ones. Each answer is recomputed about once per cache
+    lifetime however often the job runs. Returns the answers, e.g. for pre-synthesizing
+    their audio, with coverage and freshness (also exported as prewarm_* metrics).
+    """
+    logger.info(f"Received prewarm request: {len(req.questions)} questions")
+    if _prewarm_running.locked():
+        raise HTTPException(409, "A pre-warm run is already in progress")
+    async with _prewarm_running:
+        return await run_prewarm(req)
+
+async def run_prewarm(req: PrewarmRequest):
+    deadline = current_deadline() or deadline_in(PREWARM_TIMEOUT)
+    refresh_age = refresh_age_for(answer_cache.max_age, req.period, req.refresh_age)
+
+    async def resolve(question, data_deadline):
+        return (await resolve_symbols({"question": question, "deadline": data_deadline}))["symbol_details"]
+
+    def lookup(question, details):
+        # Not counted: the hit ratio should reflect real traffic only
+        return answer_cache.lookup(question, [d["symbol"] for d in details], refresh_age, count=False)
+
+    items = [item async for item in run_batch(
+        req.questions, deadline,
+        resolve=resolve, fetch_quotes=fetch_quotes, fetch_filing=fetch_filing, fetch_chunks=fetch_chunks,
+        synthesize=synthesize, lookup=lookup, remember=lambda q, result: remember_answer(q, result, "prewarm"),
+        max_concurrency=BATCH_LLM_CONCURRENCY, data_share=BRANCH_DEADLINE_SHARE,
+    )]
+    summary = summarize_prewarm(items, LLM_ERROR_ANSWER)
+    record_prewarm(summary)
+    return summary
+
+@app.get("/circuits")
+def circuits():
+    """Circuit breaker state per downstream agent."""
+    return circuits_snapshot()
+
+@app.get("/answer_cache/stats")
+def answer_cache_stats():
+    return answer_cache.snapshot()
+
+@app.get("/doc_writer/stats")
+def doc_writer_stats():
+    return doc_writer.snapshot()
 
 @app.get("/ping")
 def ping():
-    return {"msg": "orchestrator (langgraph) up"}
+    return {"msg": "orchestrator (langgraph) up", "mode": ORCHESTRATOR_MODE}
@@ -0,0 +1,74 @@
+import logging
+import time
+
+from agents.common.metrics import REGISTRY
+
+logger = logging.getLogger("orchestrator_agent.prewarm")
+
+PREWARM_COVERAGE = REGISTRY.gauge(
+    "prewarm_coverage_ratio", "Share of the watchlist holding a usable precomputed answer after the last pre-warm run")
+PREWARM_OLDEST_AGE = REGISTRY.gauge(
+    "prewarm_oldest_answer_age_seconds", "Age of the oldest watchlist answer when the last pre-warm run finished")
+PREWARM_LAST_RUN = REGISTRY.gauge(
+    "prewarm_last_run_timestamp_seconds", "Unix time the last pre-warm run finished")
+PREWARM_QUESTIONS = REGISTRY.gauge(
+    "prewarm_questions", "Watchlist questions in the last pre-warm run by outcome", ("outcome",))
+PREWARM_DURATION = REGISTRY.gauge(
+    "prewarm_duration_seconds", "Wall time of the last pre-warm run")
+
+
+def refresh_age_for(max_age: float, period: float, refresh_age: float = None) -> float:
+    """
+    Age above which a pre-warm run recomputes a cached answer: the ones that would expire
+    before the next run (age + period > max_age). Each answer is then recomputed about
+    once per cache lifetime, however often the job runs.
+    """
+    if refresh_age is not None:
+        return refresh_age
+    return max(0.0, max_age - period)
+
+
+def summarize_prewarm(items, error_answer: str) -> dict:
+    """
+    Outcome of a pre-warm run from run_batch's items: each watchlist question was either
+    still fresh in the answer cache ("fresh"), recomputed ("refreshed") or not answered
+    ("failed", an error or the LLM fallback text). Coverage is the share with an answer.
+    """
+    answers = sorted((i for i in items if "index" in i), key=lambda i: i["index"])
+    done = next((i for i in items if i.get("done")), {})
+    outcomes = {"fresh": 0, "refreshed": 0, "failed": 0}
+    ages = []
+    for item in answers:
+        if item.get("error") or not item.get("answer") or item["answer"] == error_answer:
+            item["outcome"] = "failed"
+        elif item.get("cached"):
+            item["outcome"] = "fresh"
+            ages.append(item.get("age_seconds") or 0.0)
+        else:
+            item["outcome"] = "refreshed"
+            ages.append(0.0)
+        outcomes[item["outcome"]] += 1
+    return {
+        "questions": len(answers),
+        **outcomes,
+        "coverage": round((len(answers) - outcomes["failed"]) / len(answers), 3) if answers else 0.0,
+        "oldest_age_seconds": max(ages) if ages else None,
+        "elapsed_ms": done.get("elapsed_ms"),
+        "answers": [{"question": i["question"], "answer": i.get("answer", ""), "outcome": i["outcome"],
+                     "symbols": i.get("symbols", [])} for i in answers],
+    }
+
+
+def record_prewarm(summary: dict):
+    PREWARM_COVERAGE.set(summary["coverage"])
+    if summary["oldest_age_seconds"] is not None:
+        PREWARM_OLDEST_AGE.set(summary["oldest_age_seconds"])
+    PREWARM_LAST_RUN.set(time.time())
+    for outcome in ("fresh", "refreshed", "failed"):
+        PREWARM_QUESTIONS.set(summary[outcome], outcome=outcome)
+    if summary["elapsed_ms"] is not None:
+        PREWARM_DURATION.set(summary["elapsed_ms"] / 1000)
+    logger.info(
+        f"Pre-warm: {summary['questions']} questions, {summary['fresh']} fresh, {summary['refreshed']} refreshed, "
+        f"{summary['failed']} failed in {summary['elapsed_ms']}ms"
+    )
@@ -0,0 +1,116 @@
+import abc
+import asyncio
+import importlib
+import logging
+import os
+import typing
+
+from agents.common.deadline import deadline_in, deadline_scope
+from agents.common.metrics import track
+from agents.orchestrator_agent.downstream import call_budget, guarded, open_stream, post_json
+
+logger = logging.getLogger("orchestrator_agent.services")
+
+# "http": every agent is its own service (run_all_agents.sh, Render).
+# "inprocess": agents are imported and their endpoints called directly (agents/monolith).
+ORCHESTRATOR_MODE = os.getenv("ORCHESTRATOR_MODE", "http")
+
+AGENT_MODULES = {
+    "api": "agents.api_agent.main",
+    "scraper": "agents.scraper_agent.main",
+    "retriever": "agents.retriever_agent.main",
+    "language": "agents.language_agent.main",
+    "voice": "agents.voice_agent.main",
+    "orchestrator": "agents.orchestrator_agent.main",
+}
+
+
+class AgentService(abc.ABC):
+    """How the orchestrator reaches one agent. Routes are the agent's own paths ("/quote")."""
+
+    name = ""
+
+    @abc.abstractmethod
+    async def call(self, route: str, payload: dict, deadline=None, share: float = 1.0) -> dict:
+        ...
+
+    @abc.abstractmethod
+    async def stream(self, route: str, payload: dict, deadline=None):
+        """Start a streaming call; returns an object with `aiter_raw()` and `aclose()`."""
+
+
+class HttpAgentService(AgentService):
+    """Calls over the pooled HTTP clients in downstream.py; `urls` maps routes to full URLs."""
+
+    def __init__(self, name: str, urls: dict):
+        self.name = name
+        self.urls = urls
+
+    async def call(self, route, payload, deadline=None, share=1.0):
+        return await post_json(self.name, self.urls[route], payload, deadline, share)
+
+    async def stream(self, route, payload, deadline=None):
+        return await open_stream(self.name, self.urls[route], payload, deadline)
+
+
+class _LocalStream:
+    def __init__(self, body_iterator):
+        self._body = body_iterator
+
+    async def aiter_raw(self):
+        async for chunk in self._body:
+            yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+    async def aclose(self):
+        aclose = getattr(self._body, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+class InProcessAgentService(AgentService):
+    """
+    Calls the agent's FastAPI endpoint functions directly: the payload is validated into
+    the endpoint's request model and the response model is returned as a dict, with no
+    HTTP, JSON or socket in between. The agent module is imported on first use. Deadlines,
+    circuit breakers and outbound metrics behave as in HTTP mode.
+    """
+
+    def __init__(self, name: str, module: str):
+        self.name = name
+        self.module = module
+        self._endpoints = None
+
+    def _endpoint(self, route: str):
+        if self._endpoints is None:
+            app = importlib.import_module(self.module).app
+            self._endpoints = {}
+            for r in app.routes:
+                if "POST" in getattr(r, "methods", ()):
+                    hints = typing.get_type_hints(r.endpoint)
+                    hints.pop("return", None)
+                    self._endpoints[r.path] = (r.endpoint, next(iter(hints.values()), None))
+            logger.info(f"{self.name} agent loaded in-process ({len(self._endpoints)} routes)")
+        return self._endpoints[route]
+
+    async def _invoke(self, route, payload, deadline):
+        endpoint, model = self._endpoint(route)
+        with deadline_scope(deadline):
+            return await endpoint(model(**payload))
+
+    async def call(self, route, payload, deadline=None, share=1.0):
+        timeout = call_budget(deadline, share)
+        with guarded(self.name), track(f"{self.name}_agent"):
+            result = await asyncio.wait_for(self._invoke(route, payload, deadline_in(timeout)), timeout)
+        return result.model_dump() if hasattr(result, "model_dump") else result
+
+    async def stream(self, route, payload, deadline=None):
+        call_budget(deadline)
+        with guarded(self.name):
+            response = await self._invoke(route, payload, deadline)
+        return _LocalStream(response.body_iterator)
+
+
+def build_service(name: str, urls: dict, mode: str = None) -> AgentService:
+    if (mode or ORCHESTRATOR_MODE) == "inprocess":
+        return InProcessAgentService(name, AGENT_MODULES[name])
+    return HttpAgentService(name, urls)
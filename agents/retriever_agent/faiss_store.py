@@ -0,0 +1,80 @@
+import logging
+import os
+import pickle
+import threading
+
+import numpy as np
+
+from agents.common.partitions import PartitionFilter, parse_doc_filename
+
+logger = logging.getLogger("retriever_agent.faiss_store")
+
+FAISS_INDEX_PATH = os.getenv("FAISS_INDEX_PATH", "data_ingestion/faiss_index")
+
+
+class FaissStore:
+    """
+    The local index written by data_ingestion/build_faiss.py, searched whole or by
+    partition. Chunks are grouped by symbol into flat sub-indexes (built on first use), so
+    a question about TSM only computes distances against TSM's chunks; CIK, form-type and
+    date filters are applied inside the search with an ID selector.
+    """
+
+    def __init__(self, index_path: str = FAISS_INDEX_PATH, model_name: str = "all-MiniLM-L6-v2"):
+        import faiss
+        from sentence_transformers import SentenceTransformer
+
+        self._faiss = faiss
+        self.index = faiss.read_index(index_path)
+        with open(f"{index_path}.meta", "rb") as f:
+            self.meta = pickle.load(f)
+        for m in self.meta:
+            if "symbol" not in m:  # indexes built before chunks were tagged
+                m.update(parse_doc_filename(m.get("source", "")))
+        self.by_symbol = {}
+        for i, m in enumerate(self.meta):
+            if m.get("symbol"):
+                self.by_symbol.setdefault(m["symbol"], []).append(i)
+        # Only an index built from tagged chunks can be filtered meaningfully
+        self.partitioned = bool(self.by_symbol)
+        self.model = SentenceTransformer(model_name)
+        self._partitions = {}
+        self._lock = threading.Lock()
+        logger.info(f"FAISS index loaded: {self.index.ntotal} chunks, {len(self.by_symbol)} symbols")
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.model.encode([text], convert_to_numpy=True).astype("float32")
+
+    def _partition(self, symbol: str):
+        """(sub-index, positions in the full index) for one symbol's chunks."""
+        with self._lock:
+            part = self._partitions.get(symbol)
+            if part is None:
+                ids = np.array(self.by_symbol[symbol], dtype="int64")
+                sub = self._faiss.IndexFlatL2(self.index.d)
+                sub.add(np.vstack([self.index.reconstruct(int(i)) for i in ids]))
+                part = self._partitions[symbol] = (sub, ids)
+            return part
+
+    def search(self, vector: np.ndarray, top_k: int, partition: PartitionFilter = None):
+        """[(metadata, L2 distance)] for the nearest chunks inside `partition`, closest first."""
+        partition = partition or PartitionFilter()
+        if partition.symbols:
+            parts = [self._partition(s) for s in partition.symbols if s in self.by_symbol]
+        else:
+            parts = [(self.index, np.arange(self.index.ntotal, dtype="int64"))]
+        rest = PartitionFilter(ciks=partition.ciks, form_types=partition.form_types,
+                               date_from=partition.date_from, date_to=partition.date_to)
+        hits = []
+        for index, ids in parts:
+            params, candidates = None, len(ids)
+            if rest:
+                allowed = np.array([j for j, i in enumerate(ids) if rest.matches(self.meta[i])], dtype="int64")
+                if not len(allowed):
+                    continue
+                params = self._faiss.SearchParameters(sel=self._faiss.IDSelectorBatch(allowed))
+                candidates = len(allowed)
+            distances, positions = index.search(vector, min(top_k, candidates), params=params)
+            hits.extend((self.meta[int(ids[p])], float(d)) for d, p in zip(distances[0], positions[0]) if p >= 0)
+        hits.sort(key=lambda hit: hit[1])
+        return hits[:top_k]
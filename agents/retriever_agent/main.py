@@ -1,11 +1,16 @@
 import os
 import logging
+from typing import Optional
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from pinecone import Pinecone
-import cohere
 from dotenv import load_dotenv
 
+from agents.common.deadline import DeadlineMiddleware
+from agents.common.metrics import instrument_app, track
+from agents.common.partitions import PartitionFilter
+from agents.common.warmup import Lazy, warm_up_on_startup
+
 logger = logging.getLogger("retriever_agent")
 logging.basicConfig(level=logging.INFO)
 load_dotenv()
@@ -14,65 +19,154 @@ load_dotenv()
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 PINECONE_INDEX = os.getenv("PINECONE_INDEX", "finance")
 COHERE_API_KEY = os.getenv("COHERE_API_KEY")
+# Upstream overrides, e.g. to run against the local stand-ins in benchmarks/loadtest
+PINECONE_HOST = os.getenv("PINECONE_HOST")  # index host; skips the control-plane lookup
+COHERE_BASE_URL = os.getenv("COHERE_BASE_URL")
 EMBED_MODEL = os.getenv("EMBED_MODEL1", "all-MiniLM-L6-v2")  # Default to a commonly used model
+# "pinecone" (Cohere embeddings) or "faiss" (the local index from data_ingestion/build_faiss.py)
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "pinecone").lower()
+# Set once the Pinecone vectors carry partition metadata (symbol, cik, form_type,
+# filing_day); until then partition filters are ignored rather than matching nothing
+PINECONE_PARTITIONED = os.getenv("PINECONE_PARTITIONED", "0") in ("1", "true", "True")
+
+# Pinecone and Cohere clients (and their SDK imports) are built on first use or by the
+# startup warm-up, not at import time
+def _pinecone_index():
+    from pinecone import Pinecone
+    if PINECONE_HOST:
+        return Pinecone(api_key=PINECONE_API_KEY).Index(PINECONE_INDEX, host=PINECONE_HOST)
+    return Pinecone(api_key=PINECONE_API_KEY).Index(PINECONE_INDEX)
+
+def _cohere_client():
+    import cohere
+    if COHERE_BASE_URL:
+        return cohere.Client(COHERE_API_KEY, base_url=COHERE_BASE_URL)
+    return cohere.Client(COHERE_API_KEY)
 
-# Initialize Pinecone client
-pc = Pinecone(api_key=PINECONE_API_KEY)
-index = pc.Index(PINECONE_INDEX)
+pinecone_index = Lazy("pinecone", _pinecone_index)
+cohere_client = Lazy("cohere", _cohere_client)
 
-# Initialize Cohere client
-co = cohere.Client(COHERE_API_KEY)
+def _faiss_store():
+    from agents.retriever_agent.faiss_store import FaissStore
+    return FaissStore(model_name=EMBED_MODEL)
+
+faiss_store = Lazy("faiss", _faiss_store)
 
 # FastAPI setup
 app = FastAPI(title="Retriever Agent – Pinecone + Cohere Embeddings")
+app.add_middleware(DeadlineMiddleware)  # honours X-Request-Deadline from the orchestrator
+instrument_app(app, "retriever_agent")
+if RETRIEVER_BACKEND == "faiss":
+    warm_up_on_startup(app, faiss_store)
+else:
+    warm_up_on_startup(app, cohere_client, pinecone_index)
 
 # Pydantic models
 class RetrieveRequest(BaseModel):
     query: str
     top_k: int = 5
+    # Optional partition filters; the search only looks at matching chunks
+    symbols: list[str] = []
+    ciks: list[str] = []
+    form_types: list[str] = []
+    date_from: Optional[str] = None  # YYYY-MM-DD, inclusive
+    date_to: Optional[str] = None
+
+    def partition(self) -> PartitionFilter:
+        return PartitionFilter(self.symbols, self.ciks, self.form_types, self.date_from, self.date_to)
 
 class Chunk(BaseModel):
     text: str
     source: str = ""
     offset: int = 0
     score: float = 0.0
+    symbol: Optional[str] = None
+    form_type: Optional[str] = None
+    filing_date: Optional[str] = None
 
 class RetrieveResponse(BaseModel):
     query: str
     results: list[Chunk]
+    filtered: bool = False  # False when no filter was given or nothing matched it
 
-# Endpoint
-@app.post("/retrieve", response_model=RetrieveResponse)
-async def retrieve(req: RetrieveRequest):
-    logger.info(f"Received query: {req.query}, top_k={req.top_k}")
+def to_chunk(meta: dict, score: float) -> Chunk:
+    return Chunk(
+        text=meta.get("text", ""),
+        source=meta.get("source", ""),
+        offset=meta.get("offset", 0),
+        score=score,
+        symbol=meta.get("symbol"),
+        form_type=meta.get("form_type"),
+        filing_date=meta.get("filing_date"),
+    )
+
+# Each backend embeds the query once, then searches with or without a partition filter
+async def embed_faiss(query: str):
+    store = await run_in_threadpool(faiss_store.get)
+    with track("faiss_embed"):
+        return await run_in_threadpool(store.embed, query)
 
+async def search_faiss(vector, top_k: int, partition: PartitionFilter) -> list[Chunk]:
+    store = faiss_store.get()
+    with track("faiss"):
+        hits = await run_in_threadpool(store.search, vector, top_k, partition)
+    return [to_chunk(meta, 1.0 / (1.0 + distance)) for meta, distance in hits]
+
+def faiss_partitioned() -> bool:
+    return faiss_store.get().partitioned
+
+async def embed_pinecone(query: str):
     # Embed the query with Cohere API
     try:
-        response = co.embed(texts=[req.query], model="embed-english-v2.0")
-        q_emb = response.embeddings[0]  # list of floats
+        with track("cohere"):
+            # .get() inside the threadpool: a cold client must not block the event loop
+            response = await run_in_threadpool(
+                lambda: cohere_client.get().embed(texts=[query], model="embed-english-v2.0")
+            )
+        return response.embeddings[0]  # list of floats
     except Exception as e:
         logger.error(f"Cohere embedding failed: {e}")
         raise HTTPException(status_code=500, detail=f"Cohere embedding failed: {e}")
 
-    # Query Pinecone index
+async def search_pinecone(vector, top_k: int, partition: PartitionFilter) -> list[Chunk]:
+    # Query Pinecone index, restricted to the partition by a metadata filter
     try:
-        pinecone_results = index.query(
-            vector=q_emb,
-            top_k=req.top_k,
-            include_metadata=True
-        )
-        results = []
-        for match in pinecone_results.matches:
-            meta = match.metadata or {}
-            results.append(Chunk(
-                text=meta.get("text", ""),
-                source=meta.get("source", ""),
-                offset=meta.get("offset", 0),
-                score=match.score
-            ))
+        with track("pinecone"):
+            pinecone_results = await run_in_threadpool(
+                lambda: pinecone_index.get().query(vector=vector, top_k=top_k, include_metadata=True,
+                                                   filter=partition.pinecone())
+            )
+        return [to_chunk(match.metadata or {}, match.score) for match in pinecone_results.matches]
     except Exception as e:
         logger.error(f"Pinecone query failed: {e}")
         raise HTTPException(status_code=500, detail=f"Pinecone query failed: {e}")
 
+def pinecone_partitioned() -> bool:
+    return PINECONE_PARTITIONED
+
+BACKENDS = {
+    "faiss": (embed_faiss, search_faiss, faiss_partitioned),
+    "pinecone": (embed_pinecone, search_pinecone, pinecone_partitioned),
+}
+
+# Endpoint
+@app.post("/retrieve", response_model=RetrieveResponse)
+async def retrieve(req: RetrieveRequest):
+    logger.info(f"Received query: {req.query}, top_k={req.top_k}, partition={req.partition()}")
+
+    embed, search, partitioned = BACKENDS.get(RETRIEVER_BACKEND, BACKENDS["pinecone"])
+    vector = await embed(req.query)
+    partition = req.partition()
+    if partition and not partitioned():
+        partition = PartitionFilter()  # untagged data: a filter could only match nothing
+    results = await search(vector, req.top_k, partition)
+    filtered = bool(partition)
+    if filtered and not results:
+        # Nothing tagged for this partition (e.g. a symbol ingested before tagging); search
+        # everything with the same embedding rather than answer with no context
+        logger.info(f"No chunks match {partition}; retrying unfiltered")
+        results = await search(vector, req.top_k, PartitionFilter())
+        filtered = False
+
     logger.info(f"Returning {len(results)} results for query: {req.query}")
-    return RetrieveResponse(query=req.query, results=results)
+    return RetrieveResponse(query=req.query, results=results, filtered=filtered)
@@ -1,9 +1,16 @@
+import os
 import requests
 import logging
+import re
+from typing import Optional
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from bs4 import BeautifulSoup
 
+from agents.common.deadline import DeadlineMiddleware, time_left
+from agents.common.metrics import instrument_app, track
+
 # Optionally use sec-edgar-api if installed
 try:
     from sec_edgar_api import EdgarClient
@@ -14,7 +21,13 @@ except ImportError:
  
 logger = logging.getLogger("scraper_agent")
 
+# SEC hosts; overridable to run against the local stand-ins in benchmarks/loadtest
+SEC_WWW_URL = os.getenv("SEC_WWW_URL", "https://www.sec.gov").rstrip("/")
+SEC_DATA_URL = os.getenv("SEC_DATA_URL", "https://data.sec.gov").rstrip("/")
+
 app = FastAPI(title="Scraper Agent – SEC Filings")
+app.add_middleware(DeadlineMiddleware)  # honours X-Request-Deadline from the orchestrator
+instrument_app(app, "scraper_agent")
 
 class FilingRequest(BaseModel):
     cik: str
@@ -24,20 +37,33 @@ class FilingResponse(BaseModel):
     cik: str
     filing_type: str
     document_text: str
+    accession_number: Optional[str] = None
+    filing_date: Optional[str] = None
+
+def html_to_text(content) -> str:
+    """Visible text of an HTML filing document, one block per line."""
+    return BeautifulSoup(content, "html.parser").get_text(separator="\n")
+
+def sec_get(url, headers, timeout):
+    with track("sec"):
+        return requests.get(url, headers=headers, timeout=timeout)
 
 def fetch_with_python_loader(cik, filing_type):
     """
     Try to fetch the latest filing using the sec-edgar-api Python loader.
-    Returns the document text if successful, else None.
+    Returns (document text, accession number, filing date) if successful, else None.
     """
     if not HAVE_EDGAR_CLIENT:
         logger.warning("sec-edgar-api not installed; skipping Python loader.")
         return None
+    if SEC_DATA_URL != "https://data.sec.gov":
+        return None  # the loader always talks to data.sec.gov
 
     try:
         edgar = EdgarClient(user_agent="finance-assistant-bot (rathaurnikhil14@gmail.com)")
         logger.info("Trying sec-edgar-api Python loader...")
-        submissions = edgar.get_submissions(cik=cik)
+        with track("sec"):
+            submissions = edgar.get_submissions(cik=cik)
         filings = submissions.get("filings", {}).get("recent", {})
         if not filings:
             logger.warning("No recent filings from sec-edgar-api loader.")
@@ -45,15 +71,16 @@ def fetch_with_python_loader(cik, filing_type):
         accession_numbers = filings.get("accessionNumber", [])
         form_types = filings.get("form", [])
         primary_docs = filings.get("primaryDocument", [])
-        for acc, ftype, doc in zip(accession_numbers, form_types, primary_docs):
+        filing_dates = filings.get("filingDate", [None] * len(accession_numbers))
+        for acc, ftype, doc, fdate in zip(accession_numbers, form_types, primary_docs, filing_dates):
             if ftype.upper() == filing_type.upper():
                 clean_cik = cik.lstrip("0")
                 acc_nodash = acc.replace("-", "")
-                filing_url = f"https://www.sec.gov/Archives/edgar/data/{clean_cik}/{acc_nodash}/{doc}"
+                filing_url = f"{SEC_WWW_URL}/Archives/edgar/data/{clean_cik}/{acc_nodash}/{doc}"
                 logger.info(f"Found {filing_type} via sec-edgar-api loader: {filing_url}")
-                filing_resp = requests.get(filing_url, headers={"User-Agent": "finance-assistant-bot (rathaurnikhil14@gmail.com)"}, timeout=300)
+                filing_resp = sec_get(filing_url, headers={"User-Agent": "finance-assistant-bot (rathaurnikhil14@gmail.com)"}, timeout=time_left(300))
                 if filing_resp.status_code == 200:
-                    return filing_resp.text[:50000]
+                    return filing_resp.text[:50000], acc, fdate
                 else:
                     logger.warning(f"Failed to fetch doc from {filing_url} (loader)")
         logger.warning("Requested filing type not found with sec-edgar-api loader.")
@@ -65,13 +92,13 @@ def fetch_with_python_loader(cik, filing_type):
 def fetch_with_edgar_api(cik, filing_type):
     """
     Tries to fetch the latest filing using SEC's new JSON API.
-    Returns the full filing text if found, else None.
+    Returns (filing text, accession number, filing date) if found, else None.
     """
-    base_url = f"https://data.sec.gov/submissions/CIK{cik.zfill(10)}.json"
+    base_url = f"{SEC_DATA_URL}/submissions/CIK{cik.zfill(10)}.json"
     headers = {"User-Agent": "finance-assistant-bot (youremail@example.com)"}
     logger.info(f"Trying SEC EDGAR JSON API: {base_url}")
     try:
-        resp = requests.get(base_url, headers=headers, timeout=100)
+        resp = sec_get(base_url, headers=headers, timeout=time_left(100))
         if resp.status_code != 200:
             logger.warning(f"SEC EDGAR JSON API request failed: {resp.status_code}")
             return None
@@ -85,17 +112,18 @@ def fetch_with_edgar_api(cik, filing_type):
         accession_numbers = filings.get("accessionNumber", [])
         form_types = filings.get("form", [])
         primary_docs = filings.get("primaryDocument", [])
+        filing_dates = filings.get("filingDate", [None] * len(accession_numbers))
 
-        for acc, ftype, doc in zip(accession_numbers, form_types, primary_docs):
+        for acc, ftype, doc, fdate in zip(accession_numbers, form_types, primary_docs, filing_dates):
             if ftype.upper() == filing_type.upper():
                 clean_cik = cik.lstrip("0")
                 acc_nodash = acc.replace("-", "")
-                filing_url = f"https://www.sec.gov/Archives/edgar/data/{clean_cik}/{acc_nodash}/{doc}"
+                filing_url = f"{SEC_WWW_URL}/Archives/edgar/data/{clean_cik}/{acc_nodash}/{doc}"
                 logger.info(f"Found {filing_type} filing via JSON API: {filing_url}")
-                filing_resp = requests.get(filing_url, headers=headers, timeout=100)
+                filing_resp = sec_get(filing_url, headers=headers, timeout=time_left(100))
                 if filing_resp.status_code == 200:
                     text = filing_resp.text[:50000]
-                    return text
+                    return text, acc, fdate
                 else:
                     logger.warning(f"Failed to fetch filing doc from {filing_url}")
         logger.warning("Requested filing type not found in JSON API.")
@@ -107,15 +135,16 @@ def fetch_with_edgar_api(cik, filing_type):
 def fetch_with_atom_feed(cik, filing_type):
     """
     Fallback: Fetches the latest filing using the old Atom feed + BeautifulSoup.
+    Returns (filing text, accession number, filing date).
     """
     feed_url = (
-        f"https://www.sec.gov/cgi-bin/browse-edgar"
+        f"{SEC_WWW_URL}/cgi-bin/browse-edgar"
         f"?action=getcompany&CIK={cik}"
         f"&type={filing_type}&owner=exclude&count=1&output=atom"
     )
     headers = {"User-Agent": "finance-assistant-bot (youremail@example.com)"}
     logger.info(f"Trying Atom feed: {feed_url}")
-    feed_resp = requests.get(feed_url, headers=headers, timeout=100)
+    feed_resp = sec_get(feed_url, headers=headers, timeout=time_left(100))
     if feed_resp.status_code != 200:
         logger.error(f"Failed to fetch EDGAR feed: {feed_resp.status_code}")
         raise HTTPException(502, "Failed to fetch EDGAR feed")
@@ -131,48 +160,51 @@ def fetch_with_atom_feed(cik, filing_type):
         logger.error("Malformed EDGAR feed entry (no filing link).")
         raise HTTPException(502, "Malformed EDGAR feed entry")
     doc_url = link_tag["href"]
+    entry_id = entry.find("id").get_text() if entry.find("id") else ""
+    acc_match = re.search(r"accession-number=([\d-]+)", entry_id)
+    date_tag = entry.find("filing-date")
     logger.info(f"Found filing link via Atom feed: {doc_url}")
 
-    doc_resp = requests.get(doc_url, headers=headers, timeout=100)
+    doc_resp = sec_get(doc_url, headers=headers, timeout=time_left(100))
     if doc_resp.status_code != 200:
         logger.error(f"Failed to fetch filing document: {doc_resp.status_code}")
         raise HTTPException(502, "Failed to fetch filing document")
 
-    doc_soup = BeautifulSoup(doc_resp.content, "html.parser")
-    text = doc_soup.get_text(separator="\n")
-    snippet = text[:50000]
-    return snippet
+    snippet = html_to_text(doc_resp.content)[:50000]
+    return (
+        snippet,
+        acc_match.group(1) if acc_match else None,
+        date_tag.get_text().strip() if date_tag else None,
+    )
 
 @app.post("/filing", response_model=FilingResponse)
 async def get_filing(req: FilingRequest):
     logger.info(f"Request: CIK={req.cik}, Filing Type={req.filing_type}")
 
-    # 1. Try sec-edgar-api Python loader (super simple)
-    text = fetch_with_python_loader(req.cik, req.filing_type)
-    if text:
-        logger.info("Success using sec-edgar-api Python loader.")
+    def respond(result):
+        text, accession, filing_date = result
         return FilingResponse(
             cik=req.cik,
             filing_type=req.filing_type,
-            document_text=text
+            document_text=text,
+            accession_number=accession,
+            filing_date=filing_date,
         )
 
+    # 1. Try sec-edgar-api Python loader (super simple)
+    result = await run_in_threadpool(fetch_with_python_loader, req.cik, req.filing_type)
+    if result:
+        logger.info("Success using sec-edgar-api Python loader.")
+        return respond(result)
+
     # 2. Try SEC EDGAR JSON API
-    text = fetch_with_edgar_api(req.cik, req.filing_type)
-    if text:
+    result = await run_in_threadpool(fetch_with_edgar_api, req.cik, req.filing_type)
+    if result:
         logger.info("Success using SEC EDGAR JSON API.")
-        return FilingResponse(
-            cik=req.cik,
-            filing_type=req.filing_type,
-            document_text=text
-        )
+        return respond(result)
 
     # 3. Fallback: Atom feed + BeautifulSoup
     logger.warning("Both sec-edgar-api loader and JSON API failed. Falling back to Atom feed.")
-    text = fetch_with_atom_feed(req.cik, req.filing_type)
+    result = await run_in_threadpool(fetch_with_atom_feed, req.cik, req.filing_type)
     logger.info("Success using Atom feed fallback.")
-    return FilingResponse(
-        cik=req.cik,
-        filing_type=req.filing_type,
-        document_text=text
-    )
+    return respond(result)
@@ -1,16 +1,21 @@
 import os
+import time
 import logging
-import tempfile
-import requests
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+import httpx
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
 
-import speech_recognition as sr
-from gtts import gTTS
+from agents.common.deadline import deadline_headers, deadline_in
+from agents.common.metrics import REGISTRY, cache_event, instrument_app, track
+from agents.common.sse import SSEDecoder
+from agents.voice_agent.stt_pool import SphinxPool
+from agents.voice_agent.tts import WHOLE_TEXT_MAX_CHARS, SentenceBuffer, TTSCache, TTSService
+from agents.voice_agent.vad import Resampler, Segmenter
 
 # Setup logging with timestamps and levels
 logging.basicConfig(
@@ -20,6 +25,7 @@ logging.basicConfig(
 logger = logging.getLogger("voice_agent")
 
 app = FastAPI(title="Voice Agent – Offline STT/TTS")
+instrument_app(app, "voice_agent")
 
 # Add CORS middleware (adjust origins as needed)
 app.add_middleware(
@@ -29,115 +35,307 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global recognizer and pyttsx3 TTS engine instances
-recognizer = sr.Recognizer()
- 
-# Executor for running blocking code without blocking the event loop
-executor = ThreadPoolExecutor()
+ORCH_URL = os.getenv("ORCHESTRATOR_AGENT_URL", "https://finance-ai-agent-rfqw.onrender.com/orchestrate")
+VOICE_BRIEF_TIMEOUT = float(os.getenv("VOICE_BRIEF_TIMEOUT", "60"))
+
+VOICE_BRIEF_STAGES = REGISTRY.histogram(
+    "voice_brief_stage_seconds", "Time from the start of a /voice_brief request to each pipeline stage", ("stage",))
+TTS_PREWARM_PIECES = REGISTRY.gauge(
+    "tts_prewarm_pieces", "Audio pieces in the last TTS pre-warm run by outcome", ("outcome",))
+TTS_PREWARM_LAST_RUN = REGISTRY.gauge(
+    "tts_prewarm_last_run_timestamp_seconds", "Unix time the last TTS pre-warm run finished")
+
+# In the single-process deployment (agents/monolith) the orchestrator is called directly
+if os.getenv("ORCHESTRATOR_MODE", "http") == "inprocess":
+    from agents.orchestrator_agent.services import AGENT_MODULES, InProcessAgentService
+    orchestrator = InProcessAgentService("orchestrator", AGENT_MODULES["orchestrator"])
+else:
+    orchestrator = None
+
+# Otherwise over one long-lived, connection-pooled client
+_orchestrator_client = None
+
+
+def get_orchestrator_client() -> httpx.AsyncClient:
+    global _orchestrator_client
+    if _orchestrator_client is None or _orchestrator_client.is_closed:
+        _orchestrator_client = httpx.AsyncClient(timeout=VOICE_BRIEF_TIMEOUT)
+    return _orchestrator_client
 
-@app.post("/stt")
-async def stt(file: UploadFile = File(...)):
-    logger.info(f"STT: Received audio file: {file.filename}")
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-        data = await file.read()
-        tmp.write(data)
-        wav_path = tmp.name
 
-    loop = asyncio.get_event_loop()
+async def close_orchestrator_client():
+    if _orchestrator_client is not None:
+        await _orchestrator_client.aclose()
 
-    def recognize_audio():
-        with sr.AudioFile(wav_path) as source:
-            audio = recognizer.record(source)
-        return recognizer.recognize_sphinx(audio)
+app.add_event_handler("shutdown", close_orchestrator_client)
 
+# PocketSphinx runs on pre-warmed worker processes; see stt_pool.py
+stt_pool = SphinxPool()
+app.add_event_handler("startup", stt_pool.start)
+app.add_event_handler("shutdown", stt_pool.shutdown)
+
+# Text-to-speech through the configured engine (TTS_ENGINE) with an on-disk audio cache;
+# see tts.py
+tts_service = TTSService(cache=TTSCache(on_event=lambda event: cache_event("tts", event)))
+
+
+async def synthesize(text: str) -> bytes:
     try:
-        text = await loop.run_in_executor(executor, recognize_audio)
-        logger.info(f"STT: Transcribed text: {text!r}")
-    except sr.UnknownValueError:
-        logger.error("STT: Sphinx could not understand audio")
-        text = ""
+        with track(tts_service.engine.name):
+            return await tts_service.synthesize(text)
+    except Exception as e:
+        logger.error(f"TTS error: {e}")
+        raise HTTPException(500, f"TTS failed: {e}")
+
+
+def audio_response(audio: bytes, filename: str) -> Response:
+    return Response(
+        audio, media_type=tts_service.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{tts_service.engine.extension}"'},
+    )
+
+@app.post("/stt")
+async def stt(file: UploadFile = File(...)):
+    logger.info(f"STT: Received audio file: {file.filename}")
+    data = await file.read()
+    try:
+        with track("sphinx"):
+            text = await stt_pool.transcribe(data)
+        if text:
+            logger.info(f"STT: Transcribed text: {text!r}")
+        else:
+            logger.error("STT: Sphinx could not understand audio")
     except Exception as e:
         logger.error(f"STT error: {e}")
         raise HTTPException(500, f"STT failed: {e}")
-    finally:
-        try:
-            os.unlink(wav_path)
-        except Exception:
-            pass
 
     return {"text": text}
 
 
+async def transcribe_stream(ws: WebSocket, sample_rate: int = 16000) -> str:
+    """
+    Receive raw 16-bit mono PCM frames over `ws` and transcribe them incrementally. Each
+    speech segment the VAD closes at a pause is decoded on the STT pool while audio keeps
+    arriving, and a {"type": "partial"} message is sent as it lands. Returns the full
+    transcript once the speaker stops (VAD end of speech), the client sends "end", or
+    the socket closes.
+    """
+    resample = Resampler(sample_rate)
+    segmenter = Segmenter()
+    texts = []
+    tasks = []
+    send_lock = asyncio.Lock()
+
+    async def decode(i, pcm):
+        with track("sphinx"):
+            texts[i] = await stt_pool.transcribe_raw(pcm)
+        partial = " ".join(t for t in texts if t)
+        async with send_lock:
+            await ws.send_json({"type": "partial", "text": partial, "segments": sum(1 for t in texts if t is not None)})
+
+    def start_decode(pcm):
+        texts.append(None)
+        tasks.append(asyncio.create_task(decode(len(texts) - 1, pcm)))
+
+    try:
+        while True:
+            message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text") is not None:
+                if message["text"].strip().lower() == "end":
+                    break
+                continue
+            finished = False
+            for event, pcm in segmenter.feed(resample(message.get("bytes") or b"")):
+                if event == "segment":
+                    start_decode(pcm)
+                elif event == "end":
+                    finished = True
+            if finished:
+                break
+    except WebSocketDisconnect:
+        pass
+    ended = time.perf_counter()
+    rest = segmenter.flush()
+    if rest:
+        start_decode(rest)
+    await asyncio.gather(*tasks, return_exceptions=True)
+    logger.info(f"STT stream: {len(texts)} segment(s), final transcript {(time.perf_counter() - ended) * 1000:.0f}ms "
+                f"after end of speech")
+    return " ".join(t for t in texts if t)
+
+
+@app.websocket("/stt/stream")
+async def stt_stream(ws: WebSocket, sample_rate: int = 16000):
+    """Streaming STT: send PCM frames, get partial transcripts, then a final one."""
+    await ws.accept()
+    text = await transcribe_stream(ws, sample_rate)
+    logger.info(f"STT stream: Transcribed text: {text!r}")
+    try:
+        await ws.send_json({"type": "final", "text": text})
+        await ws.close()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+
+
 @app.post("/tts")
-async def tts_endpoint(text: str = Form(..., min_length=1, max_length=500), background_tasks: BackgroundTasks = None):
-    print("hi")
+async def tts_endpoint(text: str = Form(..., min_length=1, max_length=WHOLE_TEXT_MAX_CHARS)):
     logger.info(f"TTS: Received text: {text[:100]!r}")
-    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
-        out_path = tmp.name
-    try:
-        tts = gTTS(text, lang='en', slow=False)
-        tts.save(out_path)
-        print("success")
-        logger.info(f"TTS: Audio saved at {out_path}")
-    except Exception as e:
-        logger.error(f"TTS error: {e}")
+    audio = await synthesize(text)
+    return audio_response(audio, "tts_output")
+
+
+@app.post("/tts/stream")
+async def tts_stream(text: str = Form(..., min_length=1, max_length=5000)):
+    """
+    Audio for `text`, sentence by sentence: sentences are synthesized in parallel and
+    streamed in order as each is ready, so playback can start after the first one.
+    """
+    logger.info(f"TTS stream: Received text: {text[:100]!r}")
+
+    async def audio():
         try:
-            os.unlink(out_path)
-        except Exception:
-            pass
-        raise HTTPException(500, f"TTS failed: {e}")
+            with track(f"{tts_service.engine.name}_stream"):
+                async for piece in tts_service.stream(text):
+                    yield piece
+        except Exception as e:
+            logger.error(f"TTS stream error: {e}")  # headers are sent; the stream just ends
+
+    return StreamingResponse(audio(), media_type=tts_service.media_type)
+
+
+class PrewarmRequest(BaseModel):
+    texts: list[str]
 
-    # Schedule temp file deletion after response
-    if background_tasks:
-        background_tasks.add_task(os.unlink, out_path)
 
-    return FileResponse(out_path, media_type="audio/mpeg", filename="tts_output.mp3")
+@app.post("/tts/prewarm")
+async def tts_prewarm(req: PrewarmRequest):
+    """Caches the audio for answers computed ahead of demand (see the orchestrator's /prewarm)."""
+    start = time.perf_counter()
+    with track(f"{tts_service.engine.name}_prewarm"):
+        outcomes = await tts_service.warm(req.texts)
+    for outcome, n in outcomes.items():
+        TTS_PREWARM_PIECES.set(n, outcome=outcome)
+    TTS_PREWARM_LAST_RUN.set(time.time())
+    logger.info(f"TTS pre-warm: {len(req.texts)} texts, {outcomes}")
+    return {"texts": len(req.texts), **outcomes, "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+async def open_answer_stream(question: str, deadline):
+    """The orchestrator's /orchestrate/stream response (server-sent events) for `question`."""
+    if orchestrator is not None:
+        return await orchestrator.stream("/orchestrate/stream", {"question": question}, deadline)
+    client = get_orchestrator_client()
+    request = client.build_request("POST", f"{ORCH_URL}/stream", json={"question": question},
+                                   headers=deadline_headers(deadline))
+    resp = await client.send(request, stream=True)
+    if resp.status_code >= 400:
+        await resp.aread()
+        await resp.aclose()
+        resp.raise_for_status()
+    return resp
+
+
+async def answer_tokens(resp):
+    """Answer tokens from an orchestrator event stream, until its `done` event."""
+    decoder = SSEDecoder()
+    try:
+        async for chunk in resp.aiter_raw():
+            for event, data in decoder.feed(chunk):
+                if event == "error":
+                    raise RuntimeError(data.get("error", "orchestrator stream failed"))
+                if event == "done":
+                    return
+                if data.get("token"):
+                    yield data["token"]
+    finally:
+        await resp.aclose()
+
 
 @app.post("/voice_brief")
-async def voice_brief(file: UploadFile = File(...), background_tasks: BackgroundTasks = None):
+async def voice_brief(file: Optional[UploadFile] = File(None), question: Optional[str] = Form(None, max_length=1000)):
     """
-    Full pipeline: audio → STT → Orchestrator → TTS → return audio.
+    Full pipeline: audio (or a typed `question`) → STT → Orchestrator → TTS → audio,
+    streamed. The answer is consumed as it is generated and each sentence is synthesized
+    as soon as it is complete, so audio starts while the LLM is still writing.
     """
-    stt_resp = await stt(file)
-    question = stt_resp.get("text", "")
+    start = time.perf_counter()
+    timings = {}
+
+    def mark(stage):
+        if stage not in timings:
+            timings[stage] = time.perf_counter() - start
+            VOICE_BRIEF_STAGES.observe(timings[stage], stage=stage)
+
+    if file is not None:
+        question = (await stt(file)).get("text", "")
+        mark("stt")
     if not question:
-        raise HTTPException(400, "Could not transcribe audio")
+        raise HTTPException(400, "Could not transcribe audio" if file is not None else "Send an audio file or a question")
 
-    ORCH_URL = os.getenv("ORCHESTRATOR_AGENT_URL", "https://finance-ai-agent-rfqw.onrender.com/orchestrate")
     try:
-        resp = requests.post(ORCH_URL, json={"question": question}, timeout=60)
-        resp.raise_for_status()
-        answer = resp.json().get("answer", "")
-        logger.info(f"Voice Brief: Orchestrator answered: {answer!r}")
+        resp = await open_answer_stream(question, deadline_in(VOICE_BRIEF_TIMEOUT))
     except Exception as e:
         logger.error(f"Voice Brief Orchestrator error: {e}")
         raise HTTPException(502, f"Orchestrator Agent failed: {e}")
 
-    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
-        out_path = tmp.name
+    answer = []
+    upstream_error = []
 
-    def save_tts():
-        tts = gTTS(text=answer, lang='en', slow=False)
-        tts.save(out_path)
+    async def sentences():
+        buffer = SentenceBuffer()
+        try:
+            async for token in answer_tokens(resp):
+                mark("first_token")
+                answer.append(token)
+                for sentence in buffer.feed(token):
+                    mark("first_sentence")
+                    yield sentence
+        except Exception as e:
+            upstream_error.append(e)
+            raise
+        for sentence in buffer.flush():
+            mark("first_sentence")
+            yield sentence
 
-    loop = asyncio.get_event_loop()
+    pieces = tts_service.stream_sentences(sentences())
+    # Wait for the first audio so failures still get a proper status code
     try:
-        await loop.run_in_executor(executor, save_tts)
-        logger.info(f"Voice Brief: TTS audio at {out_path}")
+        first = await pieces.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(502, "Orchestrator Agent returned an empty answer")
     except Exception as e:
-        logger.error(f"Voice Brief TTS error: {e}")
-        try:
-            os.unlink(out_path)
-        except Exception:
-            pass
+        await pieces.aclose()
+        if upstream_error:
+            logger.error(f"Voice Brief Orchestrator error: {e}")
+            raise HTTPException(502, f"Orchestrator Agent failed: {e}")
+        logger.error(f"TTS error: {e}")
         raise HTTPException(500, f"TTS failed: {e}")
+    mark("first_audio")
 
-    if background_tasks:
-        background_tasks.add_task(os.unlink, out_path)
+    async def audio():
+        try:
+            yield first
+            async for piece in pieces:
+                yield piece
+        except Exception as e:
+            logger.error(f"Voice Brief stream error: {e}")  # headers are sent; the stream just ends
+        finally:
+            await pieces.aclose()
+            mark("total")
+            logger.info(f"Voice Brief: answered {''.join(answer)!r}")
+            logger.info("Voice Brief timings: " + ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
 
-    return FileResponse(out_path, media_type="audio/mpeg", filename="voice_brief.mp3")
+    headers = {"Content-Disposition": f'attachment; filename="voice_brief.{tts_service.engine.extension}"'}
+    if "stt" in timings:
+        headers["X-STT-Ms"] = f"{timings['stt'] * 1000:.0f}"
+    return StreamingResponse(audio(), media_type=tts_service.media_type, headers=headers)
 
 
+@app.get("/tts/cache/stats")
+def tts_cache_stats():
+    return tts_service.cache.snapshot()
 
 @app.get("/ping")
 def ping():
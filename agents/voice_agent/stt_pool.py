@@ -0,0 +1,108 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import speech_recognition as sr
+
+logger = logging.getLogger("voice_agent.stt_pool")
+
+# What PocketSphinx's default en-US model expects
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # bytes, i.e. 16-bit PCM
+STT_WORKERS = int(os.getenv("STT_WORKERS", str(os.cpu_count() or 1)))
+
+# One decoder per worker process, with its acoustic model, LM and dictionary loaded once
+_decoder = None
+
+
+def decode_audio(data: bytes) -> bytes:
+    """
+    Uploaded WAV/AIFF/FLAC bytes -> raw 16 kHz mono 16-bit PCM, read from memory.
+    Downmixing and resampling happen here so only the small raw buffer crosses the
+    process boundary.
+    """
+    with sr.AudioFile(io.BytesIO(data)) as source:  # AudioFile downmixes stereo to mono
+        audio = sr.Recognizer().record(source)
+    return audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+
+
+def _init_worker():
+    global _decoder
+    try:
+        from pocketsphinx import Decoder
+        _decoder = Decoder(logfn=os.devnull)
+    except Exception as e:
+        # Older pocketsphinx builds: fall back to SpeechRecognition's per-call decoder
+        logger.warning(f"Could not preload PocketSphinx decoder ({e}); using recognize_sphinx")
+        _decoder = None
+
+
+def _ping():
+    time.sleep(0.05)  # long enough that the warm-up pings spread over all workers
+    return os.getpid()
+
+
+def _recognize(raw: bytes) -> str:
+    if _decoder is None:
+        try:
+            return sr.Recognizer().recognize_sphinx(sr.AudioData(raw, SAMPLE_RATE, SAMPLE_WIDTH))
+        except sr.UnknownValueError:
+            return ""
+    _decoder.start_utt()
+    _decoder.process_raw(raw, full_utt=True)
+    _decoder.end_utt()
+    hyp = _decoder.hyp()
+    return hyp.hypstr if hyp is not None else ""
+
+
+class SphinxPool:
+    """
+    PocketSphinx on a pool of worker processes (STT_WORKERS, default one per core), each
+    with its decoder loaded at start-up, so concurrent transcriptions run in parallel
+    instead of taking turns on the GIL.
+    """
+
+    def __init__(self, workers: int = STT_WORKERS):
+        self.workers = max(1, workers)
+        self._pool = None
+        self._lock = threading.Lock()  # concurrent first requests must not each start a pool
+
+    def start(self):
+        with self._lock:
+            if self._pool is not None:
+                return
+            # spawn, not fork: the parent is running an event loop and threads
+            pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker
+            )
+            start = time.perf_counter()
+            try:
+                pids = {f.result() for f in [pool.submit(_ping) for _ in range(self.workers)]}
+            except Exception:
+                pool.shutdown(cancel_futures=True)
+                raise
+            self._pool = pool
+            logger.info(f"STT pool ready: {len(pids)} worker(s) in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    async def transcribe(self, data: bytes) -> str:
+        """Transcribe an uploaded audio file."""
+        raw = await asyncio.get_running_loop().run_in_executor(None, decode_audio, data)
+        return await self.transcribe_raw(raw)
+
+    async def transcribe_raw(self, raw: bytes) -> str:
+        """Transcribe raw 16 kHz mono 16-bit PCM."""
+        loop = asyncio.get_running_loop()
+        if self._pool is None:
+            await loop.run_in_executor(None, self.start)
+        return await loop.run_in_executor(self._pool, _recognize, raw)
@@ -0,0 +1,365 @@
+import abc
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("voice_agent.tts")
+
+TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts")  # gtts (network) | espeak | pyttsx3 (offline)
+TTS_LANG = os.getenv("TTS_LANG", "en")
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", ".cache/tts")
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "200"))
+TTS_PARALLEL = int(os.getenv("TTS_PARALLEL", "4"))  # sentences synthesized at once
+WHOLE_TEXT_MAX_CHARS = 500  # longest text /tts synthesizes in one piece
+GTTS_BASE_URL = os.getenv("GTTS_BASE_URL")  # instead of translate.google.<tld>, e.g. a local stand-in
+
+
+# ----- Engines -----
+
+class TTSEngine(abc.ABC):
+    """Turns text into one self-contained audio file (bytes)."""
+
+    name = ""
+    media_type = "audio/mpeg"
+    extension = "mp3"
+
+    @property
+    def cache_id(self) -> str:
+        """Everything besides the text that changes the audio."""
+        return self.name
+
+    @abc.abstractmethod
+    def synthesize(self, text: str) -> bytes:
+        ...
+
+    def stream_piece(self, audio: bytes, first: bool) -> bytes:
+        """Bytes to send for one sentence so the concatenated stream stays playable."""
+        return audio  # MP3 frames can simply be concatenated
+
+
+class GTTSEngine(TTSEngine):
+    name = "gtts"
+
+    def __init__(self, lang: str = TTS_LANG):
+        self.lang = lang
+
+    @property
+    def cache_id(self):
+        return f"gtts:{self.lang}"
+
+    def synthesize(self, text):
+        from gtts import gTTS
+        if GTTS_BASE_URL:
+            # gTTS has no endpoint option; it builds every URL through this helper
+            import gtts.tts
+            gtts.tts._translate_url = lambda tld="com", path="": f"{GTTS_BASE_URL.rstrip('/')}/{path}"
+        buf = io.BytesIO()
+        gTTS(text, lang=self.lang, slow=False).write_to_fp(buf)
+        return buf.getvalue()
+
+
+class WavEngine(TTSEngine):
+    """Engines producing WAV: streamed as one header with an open-ended length, then PCM."""
+
+    media_type = "audio/wav"
+    extension = "wav"
+
+    def stream_piece(self, audio, first):
+        with wave.open(io.BytesIO(audio)) as w:
+            params = w.getparams()
+            pcm = w.readframes(w.getnframes())
+        if not first:
+            return pcm
+        byte_rate = params.framerate * params.nchannels * params.sampwidth
+        header = b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVEfmt " + struct.pack(
+            "<IHHIIHH", 16, 1, params.nchannels, params.framerate, byte_rate,
+            params.nchannels * params.sampwidth, params.sampwidth * 8,
+        ) + b"data" + struct.pack("<I", 0xFFFFFFFF)
+        return header + pcm
+
+
+class EspeakEngine(WavEngine):
+    name = "espeak"
+
+    def __init__(self, voice: str = TTS_LANG):
+        self.voice = voice
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak") or "espeak-ng"
+
+    @property
+    def cache_id(self):
+        return f"espeak:{self.voice}"
+
+    def synthesize(self, text):
+        result = subprocess.run([self.binary, "--stdout", "-v", self.voice, text], capture_output=True, check=True)
+        return result.stdout
+
+
+class Pyttsx3Engine(WavEngine):
+    name = "pyttsx3"
+
+    def __init__(self):
+        self._engine = None
+        self._lock = threading.Lock()  # pyttsx3 engines are not thread-safe
+
+    def synthesize(self, text):
+        with self._lock:
+            if self._engine is None:
+                import pyttsx3
+                self._engine = pyttsx3.init()
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "out.wav")
+                self._engine.save_to_file(text, path)
+                self._engine.runAndWait()
+                with open(path, "rb") as f:
+                    return f.read()
+
+
+ENGINES = {"gtts": GTTSEngine, "espeak": EspeakEngine, "pyttsx3": Pyttsx3Engine}
+
+
+def get_engine(name: str = TTS_ENGINE) -> TTSEngine:
+    return ENGINES[name]()
+
+
+# ----- Cache -----
+
+class TTSCache:
+    """
+    Synthesized audio on disk, keyed by a hash of (engine, text). Bounded to `max_bytes`;
+    the least recently used files go first (a hit refreshes the file's mtime).
+    """
+
+    def __init__(self, directory: str = TTS_CACHE_DIR, max_bytes: int = int(TTS_CACHE_MAX_MB * 1024 * 1024),
+                 on_event=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.on_event = on_event
+        self._lock = threading.Lock()
+        self._size = None  # bytes on disk, computed on first use
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def key(engine: TTSEngine, text: str) -> str:
+        return hashlib.sha256(f"{engine.cache_id}\x00{text}".encode()).hexdigest()
+
+    def _count(self, event):
+        self.stats[event] += 1
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _path(self, key, extension):
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def _entries(self):
+        return [e for e in os.scandir(self.directory) if e.is_file() and not e.name.endswith(".tmp")]
+
+    def get(self, key: str, extension: str):
+        path = self._path(key, extension)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._count("misses")
+            return None
+        with self._lock:
+            self._count("hits")
+        return audio
+
+    def contains(self, key: str, extension: str) -> bool:
+        return os.path.exists(self._path(key, extension))
+
+    def put(self, key: str, extension: str, audio: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key, extension)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(audio)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(e.stat().st_size for e in self._entries())
+            existed = os.path.exists(path)
+            os.replace(tmp, path)
+            if not existed:
+                self._size += len(audio)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        for entry in sorted(self._entries(), key=lambda e: e.stat().st_mtime):
+            if self._size <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                continue
+            self._size -= size
+            self._count("evictions")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+# ----- Sentence splitting and streaming -----
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+(?=[\"'(\[A-Z0-9$])")
+
+
+def split_sentences(text: str, min_chars: int = 20, max_chars: int = 250):
+    """Sentences to synthesize one by one; tiny fragments are merged, long ones split at commas."""
+    pieces = []
+    for sentence in _SENTENCE_END.split(" ".join(text.split())):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(", ", 0, max_chars)
+            cut = cut + 1 if cut > 0 else sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            if pieces and len(pieces[-1]) < min_chars:
+                pieces[-1] = f"{pieces[-1]} {sentence}"
+            else:
+                pieces.append(sentence)
+    return pieces
+
+
+class SentenceBuffer:
+    """Collects streamed text (LLM tokens) and hands out sentences as soon as they are complete."""
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 250):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._text = ""
+
+    def feed(self, text: str):
+        self._text += text
+        pieces = split_sentences(self._text, self.min_chars, self.max_chars)
+        if len(pieces) <= 1:
+            return []
+        # The last piece may still be growing
+        self._text = pieces[-1] + (" " if self._text[-1:].isspace() else "")
+        return pieces[:-1]
+
+    def flush(self):
+        rest, self._text = self._text.strip(), ""
+        return [rest] if rest else []
+
+
+class TTSService:
+    """Cached synthesis, whole-text or streamed sentence by sentence."""
+
+    def __init__(self, engine: TTSEngine = None, cache: TTSCache = None, parallel: int = TTS_PARALLEL):
+        self.engine = engine or get_engine()
+        self.cache = cache if cache is not None else TTSCache()
+        self._executor = ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="tts")
+
+    @property
+    def media_type(self):
+        return self.engine.media_type
+
+    def synthesize_sync(self, text: str) -> bytes:
+        key = TTSCache.key(self.engine, text)
+        audio = self.cache.get(key, self.engine.extension)
+        if audio is None:
+            audio = self.engine.synthesize(text)
+            self.cache.put(key, self.engine.extension, audio)
+        return audio
+
+    async def synthesize(self, text: str) -> bytes:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.synthesize_sync, text)
+
+    def warm_sync(self, text: str) -> bool:
+        """Make sure audio for `text` is cached. True if it already was."""
+        key = TTSCache.key(self.engine, text)
+        if self.cache.contains(key, self.engine.extension):
+            return True
+        self.cache.put(key, self.engine.extension, self.engine.synthesize(text))
+        return False
+
+    async def warm(self, texts):
+        """
+        Cache the audio /voice_brief and /tts/stream (every sentence) and /tts (the whole
+        text, when short enough) will ask for. Returns {"cached": n, "synthesized": n,
+        "failed": n} over the distinct pieces.
+        """
+        pieces = []
+        for text in texts:
+            pieces.extend(split_sentences(text))
+            if len(text) <= WHOLE_TEXT_MAX_CHARS:
+                pieces.append(text)
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self.warm_sync, p) for p in dict.fromkeys(pieces) if p.strip()),
+            return_exceptions=True,
+        )
+        failed = [r for r in results if isinstance(r, BaseException)]
+        for e in failed[:1]:
+            logger.error(f"TTS pre-warm failed for {len(failed)} pieces, e.g.: {e}")
+        cached = sum(r is True for r in results)
+        return {"cached": cached, "synthesized": len(results) - cached - len(failed), "failed": len(failed)}
+
+    async def stream(self, text: str):
+        """
+        Audio for `text`, sentence by sentence: all sentences are synthesized in parallel
+        (up to `parallel` at once) and yielded in order as soon as each is ready.
+        """
+        async def sentences():
+            for sentence in split_sentences(text):
+                yield sentence
+
+        async for piece in self.stream_sentences(sentences()):
+            yield piece
+
+    async def stream_sentences(self, sentences):
+        """
+        Like stream(), for sentences that are still arriving (an async iterator): each
+        one is handed to the synthesizer as soon as it arrives, while earlier audio is
+        being yielded.
+        """
+        queue = asyncio.Queue()
+        tasks = []
+
+        async def produce():
+            try:
+                async for sentence in sentences:
+                    task = asyncio.ensure_future(self.synthesize(sentence))
+                    tasks.append(task)
+                    await queue.put(task)
+                await queue.put(None)
+            except Exception as e:
+                await queue.put(e)
+            finally:
+                # Closes the source (e.g. an upstream HTTP stream) if we stop early
+                aclose = getattr(sentences, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+        producer = asyncio.ensure_future(produce())
+        first = True
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield self.engine.stream_piece(await item, first=first)
+                first = False
+        finally:
+            producer.cancel()
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,109 @@
+import audioop  # stdlib before 3.13; provided by audioop-lts (a SpeechRecognition dependency) after
+import math
+from collections import deque
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+class Resampler:
+    """Incremental 16-bit mono PCM rate conversion that keeps filter state across chunks."""
+
+    def __init__(self, from_rate: int, to_rate: int = SAMPLE_RATE):
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self._state = None
+
+    def __call__(self, pcm: bytes) -> bytes:
+        if self.from_rate == self.to_rate:
+            return pcm
+        out, self._state = audioop.ratecv(pcm, SAMPLE_WIDTH, 1, self.from_rate, self.to_rate, self._state)
+        return out
+
+
+class EnergyVAD:
+    """
+    Speech/silence per frame from its energy (dBFS) against an adaptive noise floor. The
+    floor drops quickly to quieter frames and creeps up slowly, so steady background
+    noise is learned while speech is not.
+    """
+
+    def __init__(self, margin_db: float = 10.0, min_speech_db: float = -45.0):
+        self.margin_db = margin_db
+        self.min_speech_db = min_speech_db
+        self.noise_db = None
+
+    def is_speech(self, frame: bytes) -> bool:
+        rms = audioop.rms(frame, SAMPLE_WIDTH)
+        db = 20 * math.log10(rms / 32768) if rms else -100.0
+        if self.noise_db is None:
+            self.noise_db = db
+        elif db < self.noise_db:
+            self.noise_db = 0.7 * self.noise_db + 0.3 * db
+        else:
+            self.noise_db = 0.995 * self.noise_db + 0.005 * db
+        return db > max(self.noise_db + self.margin_db, self.min_speech_db)
+
+
+class Segmenter:
+    """
+    Cuts a 16 kHz 16-bit mono PCM stream into speech segments as it arrives.
+
+    `feed()` returns events: ("segment", pcm) when speech is followed by a pause of
+    `pause_ms` (or runs past `max_segment_s`), so it can be decoded while the speaker
+    carries on, and ("end", None) once `end_ms` of silence follows the last speech,
+    i.e. the speaker has finished. Segments keep `pad_ms` of audio either side.
+    """
+
+    def __init__(self, frame_ms: int = 30, pause_ms: int = 300, end_ms: int = 800, max_segment_s: float = 10.0,
+                 pad_ms: int = 150, vad: EnergyVAD = None):
+        self.frame_bytes = SAMPLE_RATE * SAMPLE_WIDTH * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.pause_frames = max(1, pause_ms // frame_ms)
+        self.end_frames = max(1, end_ms // frame_ms)
+        self.max_frames = int(max_segment_s * 1000 // frame_ms)
+        self.vad = vad or EnergyVAD()
+        self._buffer = b""
+        self._preroll = deque(maxlen=max(1, pad_ms // frame_ms))
+        self._segment = []
+        self._silent_run = 0  # silent frames since the last speech frame
+        self.heard_speech = False
+        self.ended = False
+
+    def _close_segment(self):
+        pcm = b"".join(self._segment)
+        self._segment = []
+        return ("segment", pcm)
+
+    def feed(self, pcm: bytes):
+        events = []
+        self._buffer += pcm
+        while len(self._buffer) >= self.frame_bytes:
+            frame, self._buffer = self._buffer[:self.frame_bytes], self._buffer[self.frame_bytes:]
+            if self.vad.is_speech(frame):
+                if not self._segment:
+                    self._segment.extend(self._preroll)
+                self._segment.append(frame)
+                self._silent_run = 0
+                self.heard_speech = True
+                self.ended = False
+                if len(self._segment) >= self.max_frames:
+                    events.append(self._close_segment())
+                continue
+            self._silent_run += 1
+            if self._segment:
+                self._segment.append(frame)
+                if self._silent_run >= self.pause_frames:
+                    events.append(self._close_segment())
+            else:
+                self._preroll.append(frame)
+            if self.heard_speech and not self.ended and self._silent_run >= self.end_frames:
+                self.ended = True
+                events.append(("end", None))
+        return events
+
+    def flush(self):
+        """The unfinished segment (plus any partial frame), or None if there is none."""
+        pcm = b"".join(self._segment) + (self._buffer if self._segment else b"")
+        self._segment, self._buffer = [], b""
+        return pcm or None
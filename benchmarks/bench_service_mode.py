@@ -0,0 +1,97 @@
+"""
+HTTP vs in-process agent calls: latency and CPU per call for the same agent route.
+
+    python -m benchmarks.bench_service_mode --rounds 500 [--concurrency 8]
+    python -m benchmarks.bench_service_mode --agent retriever --route /retrieve --payload '{"query": "TSMC capex"}'
+
+Both modes run in this process (in HTTP mode uvicorn serves the agent on a background
+thread), so process CPU time covers client and server side alike. The default target,
+/extract_symbols, is answered by the local ticker matcher and needs no API keys.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import socket
+import statistics
+import threading
+import time
+
+import uvicorn
+
+from agents.common.deadline import deadline_in
+from agents.orchestrator_agent.downstream import close_clients
+from agents.orchestrator_agent.services import AGENT_MODULES, HttpAgentService, InProcessAgentService
+
+DEFAULT_PAYLOAD = {"question": "Summarize the latest 10-K filing for AAPL."}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def measure(service, route, payload, rounds, concurrency):
+    for _ in range(5):  # warm up pools, imports, caches
+        await service.call(route, payload, deadline_in(30))
+    samples = []
+
+    async def one():
+        t = time.perf_counter()
+        await service.call(route, payload, deadline_in(30))
+        samples.append((time.perf_counter() - t) * 1000)
+
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    for _ in range(max(1, rounds // concurrency)):
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "cpu_ms_per_call": round(cpu * 1000 / len(samples), 3),
+        "calls_per_s": round(len(samples) / wall, 1),
+    }
+
+
+async def main(args):
+    payload = json.loads(args.payload) if args.payload else DEFAULT_PAYLOAD
+    app = importlib.import_module(AGENT_MODULES[args.agent]).app
+    server = serve(app, _free_port() if not args.port else args.port)
+    url = f"http://127.0.0.1:{server.config.port}{args.route}"
+
+    results = {
+        "http": await measure(HttpAgentService(args.agent, {args.route: url}), args.route, payload,
+                              args.rounds, args.concurrency),
+        "inprocess": await measure(InProcessAgentService(args.agent, AGENT_MODULES[args.agent]), args.route,
+                                   payload, args.rounds, args.concurrency),
+    }
+    await close_clients()
+    server.should_exit = True
+    for mode, r in results.items():
+        print(f"{mode:<10} " + "  ".join(f"{k}={v}" for k, v in r.items()))
+    h, i = results["http"], results["inprocess"]
+    print(f"in-process saves {h['p50_ms'] - i['p50_ms']:.3f}ms p50 and "
+          f"{h['cpu_ms_per_call'] - i['cpu_ms_per_call']:.3f}ms CPU per call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agent", default="language", choices=sorted(AGENT_MODULES))
+    parser.add_argument("--route", default="/extract_symbols")
+    parser.add_argument("--payload", help="JSON request body (default: a symbol-extraction question)")
+    parser.add_argument("--rounds", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--port", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,36 @@
+"""
+STT throughput vs. worker count: transcribe the same WAV many times concurrently.
+
+    python -m benchmarks.bench_stt sample.wav --requests 32 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import time
+
+from agents.voice_agent.stt_pool import SphinxPool
+
+
+async def run(data: bytes, requests: int, workers: int):
+    pool = SphinxPool(workers)
+    pool.start()
+    try:
+        await pool.transcribe(data)  # warm
+        start = time.perf_counter()
+        texts = await asyncio.gather(*(pool.transcribe(data) for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+    finally:
+        pool.shutdown()
+    print(f"workers={workers:<3} {requests / elapsed:6.2f} transcriptions/s  "
+          f"({elapsed * 1000 / requests:.0f}ms each)  text={texts[0]!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wav")
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+    with open(args.wav, "rb") as f:
+        audio = f.read()
+    for n in args.workers:
+        asyncio.run(run(audio, args.requests, n))
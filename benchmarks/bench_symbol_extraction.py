@@ -0,0 +1,73 @@
+"""
+Latency comparison: local trie ticker matching vs. the Groq LLM round trip.
+
+    python -m benchmarks.bench_symbol_extraction --rounds 200 [--llm-rounds 5]
+
+The LLM half only runs when GROQ_API_KEY is set.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from agents.language_agent.ticker_matcher import get_ticker_matcher
+
+QUESTIONS = [
+    "What's our risk exposure in Asia tech stocks today, and highlight any earnings surprises?",
+    "Summarize the latest 10-K filing for AAPL.",
+    "Show me price history and company info for TSLA, AMZN.",
+    "How did TSMC and Alibaba react to the export controls?",
+    "Compare Microsoft and Alphabet cloud margins",
+    "Is $NVDA still a buy after earnings?",
+    "Taiwan Semiconductor Manufacturing 20-F highlights",
+    "what about target and oracle this quarter",
+]
+
+
+def _summary(samples_ms):
+    samples_ms = sorted(samples_ms)
+    p95 = samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))]
+    return f"mean={statistics.mean(samples_ms):.3f}ms p50={statistics.median(samples_ms):.3f}ms p95={p95:.3f}ms"
+
+
+def bench_local(rounds: int):
+    t0 = time.perf_counter()
+    matcher = get_ticker_matcher()
+    build_ms = (time.perf_counter() - t0) * 1000
+    samples, fallbacks = [], 0
+    for _ in range(rounds):
+        for q in QUESTIONS:
+            t = time.perf_counter()
+            result = matcher.match(q)
+            samples.append((time.perf_counter() - t) * 1000)
+            if not result.matches or result.ambiguous:
+                fallbacks += 1
+    print(f"local  build={build_ms:.1f}ms  {_summary(samples)}  "
+          f"llm_fallback_rate={fallbacks / len(samples):.0%}")
+    for q in QUESTIONS:
+        r = matcher.match(q)
+        print(f"   {[(m.symbol, m.confidence) for m in r.matches]!s:<45} ambiguous={r.ambiguous}  {q}")
+
+
+def bench_llm(rounds: int):
+    if not os.getenv("GROQ_API_KEY"):
+        print("llm    skipped (GROQ_API_KEY not set)")
+        return
+    from agents.language_agent.main import _llm_extract_symbols
+    samples = []
+    for _ in range(rounds):
+        for q in QUESTIONS:
+            t = time.perf_counter()
+            asyncio.run(_llm_extract_symbols(q, bypass_cache=True))
+            samples.append((time.perf_counter() - t) * 1000)
+    print(f"llm    {_summary(samples)}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--rounds", type=int, default=200)
+    p.add_argument("--llm-rounds", type=int, default=1)
+    args = p.parse_args()
+    bench_local(args.rounds)
+    bench_llm(args.llm_rounds)
@@ -0,0 +1,101 @@
+"""
+Import-time report per agent, from `python -X importtime`.
+
+    python -m benchmarks.import_time                       # table for every agent
+    python -m benchmarks.import_time --json import_times.json
+    python -m benchmarks.import_time --baseline import_times.json --max-regression 0.2
+
+Each agent's main module is imported in a fresh interpreter. The report shows the total
+import time, the wall time of the whole subprocess, and the heaviest top-level packages.
+With --baseline, agents slower than the baseline by more than --max-regression
+(fraction) are listed and the exit status is 1, so CI can catch startup regressions.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+
+AGENTS = {
+    "api": "agents.api_agent.main",
+    "scraper": "agents.scraper_agent.main",
+    "retriever": "agents.retriever_agent.main",
+    "language": "agents.language_agent.main",
+    "voice": "agents.voice_agent.main",
+    "orchestrator": "agents.orchestrator_agent.main",
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str):
+    """[(package, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return rows
+
+
+def measure(module: str, top: int = 8) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    rows = parse_importtime(proc.stderr)
+    heaviest = {}
+    for name, _, cumulative, _ in rows:
+        root = name.split(".")[0]
+        heaviest[root] = max(heaviest.get(root, 0), cumulative)
+    heaviest.pop(module.split(".")[0], None)
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+        "import_ms": round(sum(c for _, _, c, depth in rows if depth == 0) / 1000, 1),
+        "wall_ms": round(wall * 1000, 1),
+        "heaviest": [{"package": p, "ms": round(us / 1000, 1)}
+                     for p, us in sorted(heaviest.items(), key=lambda kv: -kv[1])[:top]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("agents", nargs="*", default=list(AGENTS), help="agents to measure (default: all)")
+    parser.add_argument("--top", type=int, default=8, help="heaviest packages to list per agent")
+    parser.add_argument("--json", help="write the report here")
+    parser.add_argument("--baseline", help="earlier --json report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    report = {name: measure(AGENTS[name], args.top) for name in args.agents}
+    for name, r in report.items():
+        if not r["ok"]:
+            print(f"{name:<13} import failed: {r['error']}")
+            continue
+        heavy = ", ".join(f"{h['package']} {h['ms']:.0f}ms" for h in r["heaviest"])
+        print(f"{name:<13} import={r['import_ms']:>8.1f}ms  wall={r['wall_ms']:>8.1f}ms  {heavy}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = [
+            (name, baseline[name]["import_ms"], r["import_ms"])
+            for name, r in report.items()
+            if r["ok"] and baseline.get(name, {}).get("ok")
+            and r["import_ms"] > baseline[name]["import_ms"] * (1 + args.max_regression)
+        ]
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.1f}ms -> {after:.1f}ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+End-to-end load test: starts all six agents against local stand-ins for Alpha Vantage,
+EDGAR, Cohere, Pinecone, Groq and gTTS (see stubs.py), drives the public endpoints at a
+target request rate (open loop) and reports throughput, p50/p95/p99 latency and error
+rate per endpoint.
+
+    python -m benchmarks.loadtest --rate 5 --duration 60
+    python -m benchmarks.loadtest --scenarios quote,filing --latency sec=800 --error-rate sec=0.1
+    python -m benchmarks.loadtest --no-cache --baseline latest --max-regression 0.2
+
+Each run is saved as <out>/<commit>-<timestamp>.json. With --baseline (a saved report,
+or "latest" for the newest one from another commit), latency or error-rate regressions
+are listed and the exit status is 1. --target URL-per-agent JSON skips the local stack
+and drives already running agents instead.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.loadtest.launcher import Stack
+from benchmarks.loadtest.loadgen import Scenario, regressions, run_open_loop, summarize
+from benchmarks.loadtest.stubs import add_stub_arguments, config_from_args
+
+QUESTIONS = [
+    "What's our risk exposure in Asia tech stocks today?",
+    "Summarize TSMC's latest 20-F and today's price move.",
+    "How did Samsung and TSMC earnings compare to estimates?",
+    "Any earnings surprises in Asian semiconductors this week?",
+]
+SCENARIOS = ("orchestrate", "quote", "filing", "retrieve", "voice_brief")
+RESULTS_DIR = os.path.join("benchmarks", "results", "loadtest")
+
+
+def build_scenarios(client: httpx.AsyncClient, urls: dict, names, no_cache: bool):
+    counter = iter(range(10 ** 9))
+
+    def question():
+        return QUESTIONS[next(counter) % len(QUESTIONS)]
+
+    async def post(url, **kwargs):
+        resp = await client.post(url, **kwargs)
+        return resp.status_code, None
+
+    async def streamed(url, **kwargs):
+        start = time.perf_counter()
+        ttfb = None
+        async with client.stream("POST", url, **kwargs) as resp:
+            async for _ in resp.aiter_raw():
+                if ttfb is None:
+                    ttfb = time.perf_counter() - start
+        return resp.status_code, ttfb
+
+    orchestrate_body = {"max_age": 0} if no_cache else {}
+    senders = {
+        "orchestrate": lambda: post(f"{urls['orchestrator']}/orchestrate",
+                                    json={"question": question(), **orchestrate_body}),
+        "quote": lambda: post(f"{urls['api']}/quote", json={"symbols": ["TSM", "005930.KS", "AAPL"]}),
+        "filing": lambda: post(f"{urls['scraper']}/filing", json={"cik": "0001046179", "filing_type": "20-F"}),
+        "retrieve": lambda: post(f"{urls['retriever']}/retrieve", json={"query": question(), "top_k": 5}),
+        "voice_brief": lambda: streamed(f"{urls['voice']}/voice_brief", data={"question": question()}),
+    }
+    return [Scenario(name, senders[name]) for name in names]
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def find_baseline(out_dir: str, commit: str):
+    """Newest saved report from a different commit."""
+    for path in sorted(glob.glob(os.path.join(out_dir, "*.json")), key=os.path.getmtime, reverse=True):
+        if not os.path.basename(path).startswith(f"{commit}-"):
+            return path
+    return None
+
+
+async def drive(args, urls: dict) -> dict:
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        scenarios = build_scenarios(client, urls, args.scenarios.split(","), args.no_cache)
+        if args.warmup:
+            await run_open_loop(scenarios, args.rate, args.warmup, args.timeout, seed=args.seed)
+        samples, lag = await run_open_loop(scenarios, args.rate, args.duration, args.timeout, seed=args.seed)
+        upstream_calls = None
+        if args.stub_url:
+            try:
+                upstream_calls = (await client.get(f"{args.stub_url}/_stats")).json()["calls"]
+            except (httpx.HTTPError, ValueError, KeyError):
+                pass
+    return {"results": summarize(samples, args.duration), "generator_lag_ms": round(lag * 1000, 1),
+            "upstream_calls": upstream_calls}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma-separated, from {SCENARIOS}")
+    parser.add_argument("--rate", type=float, default=2.0, help="requests/s over all scenarios")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds measured")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds of unmeasured load first")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-cache", action="store_true", help="switch the answer, LLM and TTS caches off")
+    parser.add_argument("--base-port", type=int, default=18000)
+    parser.add_argument("--target", help='JSON {"orchestrator": url, ...}: use running agents, no local stack')
+    parser.add_argument("--out", default=RESULTS_DIR)
+    parser.add_argument("--baseline", help='saved report to compare against, or "latest"')
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    stub_config = config_from_args(args)
+    if args.target:
+        args.stub_url = None
+        report = asyncio.run(drive(args, json.loads(args.target)))
+    else:
+        extra_env = {"LLM_CACHE_ENABLED": "0", "TTS_CACHE_MAX_MB": "0"} if args.no_cache else {}
+        with Stack(args.base_port, stub_config, extra_env) as stack:
+            args.stub_url = stack.stub_url
+            print(f"stack up (logs in {stack.log_dir}); {args.rate} req/s for {args.duration:.0f}s")
+            report = asyncio.run(drive(args, stack.urls))
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "params": {k: v for k, v in vars(args).items() if k not in ("out", "baseline", "target", "stub_url")},
+        "stubs": None if args.target else {name: vars(c) for name, c in stub_config.items()},
+        **report,
+    }
+    for name, r in report["results"].items():
+        ttfb = f"  ttfb p50={r['ttfb_p50_ms']}ms" if "ttfb_p50_ms" in r else ""
+        print(f"{name:<12} {r['throughput_rps']:>6.2f} req/s  p50={r['p50_ms']}ms  p95={r['p95_ms']}ms  "
+              f"p99={r['p99_ms']}ms  errors={r['error_rate']:.1%}{ttfb}")
+    if report["generator_lag_ms"] > 100:
+        print(f"warning: load generator fell {report['generator_lag_ms']:.0f}ms behind schedule")
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, f"{commit}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"saved {path}")
+
+    baseline = find_baseline(args.out, commit) if args.baseline == "latest" else args.baseline
+    if baseline:
+        with open(baseline) as f:
+            before = json.load(f)
+        found = regressions(report["results"], before["results"], args.max_regression)
+        print(f"compared with {baseline} ({before.get('commit')})")
+        for name, metric, old, new in found:
+            print(f"REGRESSION {name} {metric}: {old} -> {new}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Starts the upstream stand-ins and all six agents as separate uvicorn processes, wired to
+each other and to the stand-ins through the agents' environment variables, so the
+whole system runs locally with no API keys or network access.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+
+import httpx
+
+AGENTS = {  # name: (module, port offset), ports as in run_all_agents.sh
+    "api": ("agents.api_agent.main", 1),
+    "scraper": ("agents.scraper_agent.main", 2),
+    "retriever": ("agents.retriever_agent.main", 3),
+    "language": ("agents.language_agent.main", 4),
+    "voice": ("agents.voice_agent.main", 5),
+    "orchestrator": ("agents.orchestrator_agent.main", 6),
+}
+
+
+def stack_env(stub_url: str, urls: dict, workdir: str) -> dict:
+    """Environment pointing every agent at the stand-ins and at each other."""
+    return {
+        # api agent: Alpha Vantage only (yfinance cannot be redirected)
+        "ALPHA_VANTAGE_API_KEY": "stub", "ALPHA_VANTAGE_BASE_URL": f"{stub_url}/alphavantage",
+        "YFINANCE_ENABLED": "0",
+        # scraper agent
+        "SEC_DATA_URL": f"{stub_url}/sec-data", "SEC_WWW_URL": f"{stub_url}/sec-www",
+        # retriever agent
+        "PINECONE_API_KEY": "stub", "PINECONE_HOST": f"{stub_url}/pinecone",
+        "COHERE_API_KEY": "stub", "COHERE_BASE_URL": f"{stub_url}/cohere",
+        # language agent (langchain-groq reads GROQ_API_BASE)
+        "GROQ_API_KEY": "stub", "GROQ_API_BASE": f"{stub_url}/groq",
+        # voice agent
+        "TTS_ENGINE": "gtts", "GTTS_BASE_URL": f"{stub_url}/gtts", "TTS_CACHE_DIR": os.path.join(workdir, "tts"),
+        "ORCHESTRATOR_AGENT_URL": f"{urls['orchestrator']}/orchestrate",
+        # orchestrator
+        "API_AGENT_URL": f"{urls['api']}/quote",
+        "SCRAPER_AGENT_URL": f"{urls['scraper']}/filing",
+        "RETRIEVER_AGENT_URL": f"{urls['retriever']}/retrieve",
+        "LANGUAGE_AGENT_URL": f"{urls['language']}/analyze_graph",
+        "SCRAPED_DOCS_DIR": os.path.join(workdir, "docs"),
+        "LLM_CACHE_DIR": os.path.join(workdir, "llm"),
+        "INGEST_BROKER_URL": "",
+    }
+
+
+class Stack:
+    """
+    The stand-ins (on `base_port`) and the agents (on `base_port` + 1..6), as a context
+    manager. `extra_env` is applied on top, e.g. to switch caches off.
+    """
+
+    def __init__(self, base_port: int = 18000, stub_config: dict = None, extra_env: dict = None,
+                 log_dir: str = None, ready_timeout: float = 120.0):
+        self.base_port = base_port
+        self.stub_config = stub_config or {}
+        self.extra_env = extra_env or {}
+        self.ready_timeout = ready_timeout
+        self.workdir = tempfile.mkdtemp(prefix="loadtest-")
+        self.log_dir = log_dir or self.workdir
+        self.stub_url = f"http://127.0.0.1:{base_port}"
+        self.urls = {name: f"http://127.0.0.1:{base_port + offset}" for name, (_, offset) in AGENTS.items()}
+        self._procs = {}
+        self._logs = []
+
+    def _spawn(self, name, args, env):
+        log = open(os.path.join(self.log_dir, f"{name}.log"), "wb")
+        self._logs.append(log)
+        self._procs[name] = subprocess.Popen([sys.executable, *args], env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    def start(self):
+        env = {**os.environ, **stack_env(self.stub_url, self.urls, self.workdir), **self.extra_env}
+        config = json.dumps({name: asdict(c) for name, c in self.stub_config.items()})
+        self._spawn("stubs", ["-m", "benchmarks.loadtest.stubs", "--port", str(self.base_port), "--config", config],
+                    env)
+        for name, (module, offset) in AGENTS.items():
+            self._spawn(name, ["-m", "uvicorn", f"{module}:app", "--host", "127.0.0.1",
+                               "--port", str(self.base_port + offset), "--log-level", "warning"], env)
+        try:
+            self.wait_ready()
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    def wait_ready(self):
+        pending = {"stubs": f"{self.stub_url}/_stats", **{n: f"{u}/openapi.json" for n, u in self.urls.items()}}
+        deadline = time.monotonic() + self.ready_timeout
+        with httpx.Client(timeout=2) as client:
+            while pending:
+                for name, url in list(pending.items()):
+                    if self._procs[name].poll() is not None:
+                        raise RuntimeError(f"{name} exited; see {self.log_dir}/{name}.log")
+                    try:
+                        if client.get(url).status_code == 200:
+                            del pending[name]
+                    except httpx.TransportError:
+                        pass
+                if pending and time.monotonic() > deadline:
+                    raise TimeoutError(f"not ready after {self.ready_timeout:.0f}s: {', '.join(pending)}")
+                time.sleep(0.25)
+
+    def stop(self):
+        for proc in self._procs.values():
+            proc.terminate()
+        for proc in self._procs.values():
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        self._procs.clear()
+        for log in self._logs:
+            log.close()
+        self._logs.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
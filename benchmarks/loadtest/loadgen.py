@@ -0,0 +1,134 @@
+"""
+Open-loop load generation: requests are started on a fixed arrival schedule whether or not
+earlier ones have finished, so a slow system builds a queue (and shows it in the tail
+latencies) instead of quietly lowering the offered load.
+"""
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class Sample:
+    scenario: str
+    started: float  # seconds since the run began
+    latency: float  # seconds until the full response was read
+    ok: bool
+    status: int = 0  # HTTP status, 0 if the request never got one
+    ttfb: float = None  # seconds to the first body byte, for streamed responses
+    error: str = None
+
+
+@dataclass
+class Scenario:
+    """One kind of request; `send()` performs it and returns (status, ttfb or None)."""
+
+    name: str
+    send: object
+    weight: float = 1.0
+
+
+def arrivals(rate: float, duration: float, poisson: bool = True, seed: int = None):
+    """Request start offsets (s) for `rate` requests/s over `duration` seconds."""
+    rng = random.Random(seed)
+    t, times = 0.0, []
+    while True:
+        t += rng.expovariate(rate) if poisson else 1.0 / rate
+        if t >= duration:
+            return times
+        times.append(t)
+
+
+async def run_open_loop(scenarios, rate: float, duration: float, timeout: float = 120.0, poisson: bool = True,
+                        seed: int = None):
+    """
+    Drive `scenarios` (mixed by weight) at `rate` requests/s for `duration` seconds.
+    Returns (samples, lag) where lag is how far behind schedule requests were started:
+    large values mean the generator itself was saturated and the results understate load.
+    """
+    rng = random.Random(seed)
+    weights = [s.weight for s in scenarios]
+    samples, lags, tasks = [], [], []
+
+    async def one(scenario, started):
+        t = time.perf_counter()
+        try:
+            status, ttfb = await asyncio.wait_for(scenario.send(), timeout)
+            sample = Sample(scenario.name, started, time.perf_counter() - t, 200 <= status < 400, status, ttfb)
+        except Exception as e:
+            sample = Sample(scenario.name, started, time.perf_counter() - t, False, error=type(e).__name__)
+        samples.append(sample)
+
+    start = time.perf_counter()
+    for offset in arrivals(rate, duration, poisson, seed):
+        delay = offset - (time.perf_counter() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lags.append(max(0.0, -delay))
+        scenario = rng.choices(scenarios, weights)[0]
+        tasks.append(asyncio.create_task(one(scenario, offset)))
+    await asyncio.gather(*tasks)
+    return samples, max(lags, default=0.0)
+
+
+def percentile(values, p: float):
+    """Nearest-rank percentile of `values` (p in 0..100); None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def summarize(samples, duration: float) -> dict:
+    """Per-scenario (and overall) throughput, latency percentiles and error rate."""
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample.scenario, []).append(sample)
+    groups["all"] = list(samples)
+
+    report = {}
+    for name, group in groups.items():
+        ok = [s for s in group if s.ok]
+        latencies = [s.latency for s in ok]
+        ttfbs = [s.ttfb for s in ok if s.ttfb is not None]
+        errors = {}
+        for s in group:
+            if not s.ok:
+                key = s.error or str(s.status)
+                errors[key] = errors.get(key, 0) + 1
+        report[name] = {
+            "requests": len(group),
+            "ok": len(ok),
+            "error_rate": round(1 - len(ok) / len(group), 4) if group else 0.0,
+            "errors": errors,
+            "throughput_rps": round(len(ok) / duration, 2),
+            "p50_ms": _ms(percentile(latencies, 50)),
+            "p95_ms": _ms(percentile(latencies, 95)),
+            "p99_ms": _ms(percentile(latencies, 99)),
+            "max_ms": _ms(max(latencies, default=None)),
+        }
+        if ttfbs:
+            report[name]["ttfb_p50_ms"] = _ms(percentile(ttfbs, 50))
+            report[name]["ttfb_p95_ms"] = _ms(percentile(ttfbs, 95))
+    return report
+
+
+def regressions(report: dict, baseline: dict, max_regression: float = 0.2, max_error_increase: float = 0.01):
+    """[(scenario, metric, before, after)] where `report` is worse than `baseline`."""
+    found = []
+    for name, after in report.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if before.get(metric) and after.get(metric) and after[metric] > before[metric] * (1 + max_regression):
+                found.append((name, metric, before[metric], after[metric]))
+        if after["error_rate"] > before.get("error_rate", 0) + max_error_increase:
+            found.append((name, "error_rate", before.get("error_rate", 0), after["error_rate"]))
+    return found
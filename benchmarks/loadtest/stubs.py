@@ -0,0 +1,270 @@
+"""
+Local stand-ins for the third-party APIs the agents call, served by one app with a path
+prefix per upstream:
+
+    /alphavantage  Alpha Vantage         GET  /query
+    /sec-data      data.sec.gov          GET  /submissions/CIK##########.json
+    /sec-www       www.sec.gov           GET  /Archives/edgar/data/..., /cgi-bin/browse-edgar
+    /cohere        Cohere                POST /v1/embed
+    /pinecone      Pinecone index host   POST /query
+    /groq          Groq                  POST /openai/v1/chat/completions (streamed or not)
+    /gtts          Google Translate TTS  POST /_/TranslateWebserverUi/data/batchexecute
+
+Every upstream has its own latency (mean ± uniform jitter) and error rate, so slow or
+flaky dependencies can be reproduced; Groq additionally spaces streamed tokens by
+`token_ms`. GET /_stats returns the calls served per upstream.
+
+    python -m benchmarks.loadtest.stubs --port 9000 --latency groq=400 --error-rate sec=0.05
+"""
+import argparse
+import asyncio
+import base64
+import json
+import random
+import time
+import uuid
+import zlib
+from dataclasses import asdict, dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+
+UPSTREAMS = ("alphavantage", "sec", "cohere", "pinecone", "groq", "gtts")
+PREFIXES = {"alphavantage": "alphavantage", "sec-data": "sec", "sec-www": "sec", "cohere": "cohere",
+            "pinecone": "pinecone", "groq": "groq", "gtts": "gtts"}
+
+# Typical round-trip times of the real services, as a starting point
+DEFAULT_LATENCY_MS = {"alphavantage": 150, "sec": 250, "cohere": 80, "pinecone": 40, "groq": 300, "gtts": 200}
+
+ANSWER = (
+    "Asia tech allocation is 22% of AUM, up from 18% yesterday. TSMC beat estimates by 4%, while Samsung "
+    "missed by 2% on weaker memory pricing. Regional sentiment is neutral with a cautionary tilt due to "
+    "rising yields. Watch the Fed minutes on Wednesday for the next leg in semiconductor multiples."
+)
+FORMS = ("10-K", "10-Q", "20-F", "8-K")
+EMBED_DIM = 384
+MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413  # one silent 128 kbps / 44.1 kHz frame
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    token_ms: float = 0.0  # Groq streaming only: delay between tokens
+
+
+def default_config(**overrides) -> dict:
+    config = {name: StubConfig(latency_ms=ms, jitter_ms=ms * 0.2) for name, ms in DEFAULT_LATENCY_MS.items()}
+    config["groq"].token_ms = 15
+    config.update(overrides)
+    return config
+
+
+def _seed(text: str) -> int:
+    return zlib.crc32(text.encode())
+
+
+def _price(symbol: str) -> float:
+    return 50 + _seed(symbol.upper()) % 400 + random.random()
+
+
+def _accession(cik: str, form: str) -> str:
+    n = _seed(f"{cik}:{form}")
+    return f"{int(cik):010d}-24-{n % 1000000:06d}"
+
+
+def build_app(config: dict = None, filing_chars: int = 60000) -> FastAPI:
+    config = config or default_config()
+    counts = {name: 0 for name in UPSTREAMS}
+    app = FastAPI(title="Upstream stand-ins")
+
+    @app.middleware("http")
+    async def inject(request: Request, call_next):
+        upstream = PREFIXES.get(request.url.path.strip("/").split("/")[0])
+        if upstream is None:
+            return await call_next(request)
+        counts[upstream] += 1
+        stub = config[upstream]
+        delay = stub.latency_ms + random.uniform(-stub.jitter_ms, stub.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if random.random() < stub.error_rate:
+            return JSONResponse({"error": f"injected {upstream} failure"}, status_code=503)
+        return await call_next(request)
+
+    @app.get("/_stats")
+    def stats():
+        return {"calls": counts, "config": {name: asdict(c) for name, c in config.items()}}
+
+    # ----- Alpha Vantage -----
+
+    @app.get("/alphavantage/query")
+    def alpha_vantage(function: str, symbol: str, interval: str = "5min"):
+        price = _price(symbol)
+        now = time.time()
+        step = 300 if function == "TIME_SERIES_INTRADAY" else 86400
+        fmt = "%Y-%m-%d %H:%M:%S" if function == "TIME_SERIES_INTRADAY" else "%Y-%m-%d"
+        series = {}
+        for i in range(20):
+            close = price * (1 + 0.002 * ((i * 7) % 5 - 2))
+            series[time.strftime(fmt, time.gmtime(now - i * step))] = {
+                "1. open": f"{close * 0.998:.4f}", "2. high": f"{close * 1.004:.4f}",
+                "3. low": f"{close * 0.995:.4f}", "4. close": f"{close:.4f}", "5. volume": str(100000 + i * 1000),
+            }
+        key = f"Time Series ({interval})" if function == "TIME_SERIES_INTRADAY" else "Time Series (Daily)"
+        meta = {"1. Information": function, "2. Symbol": symbol, "3. Last Refreshed": next(iter(series)),
+                "4. Interval": interval, "5. Output Size": "Compact", "6. Time Zone": "US/Eastern"}
+        return {"Meta Data": meta, key: series}
+
+    # ----- SEC EDGAR -----
+
+    @app.get("/sec-data/submissions/{name}")
+    def submissions(name: str):
+        cik = name.removeprefix("CIK").removesuffix(".json")
+        return {
+            "cik": cik.lstrip("0"),
+            "name": f"Company {cik.lstrip('0')}",
+            "filings": {"recent": {
+                "accessionNumber": [_accession(cik, form) for form in FORMS],
+                "form": list(FORMS),
+                "primaryDocument": [f"{form.lower().replace('-', '')}.htm" for form in FORMS],
+                "filingDate": ["2024-04-16", "2024-08-01", "2024-04-16", "2024-10-17"],
+            }},
+        }
+
+    @app.get("/sec-www/Archives/edgar/data/{cik}/{accession}/{document}")
+    def filing_document(cik: str, accession: str, document: str):
+        paragraph = f"<p>Annual report of registrant {cik}, accession {accession}. {ANSWER}</p>\n"
+        body = paragraph * (filing_chars // len(paragraph) + 1)
+        return HTMLResponse(f"<html><body><h1>{document}</h1>{body}</body></html>")
+
+    @app.get("/sec-www/cgi-bin/browse-edgar")
+    def atom_feed(request: Request, CIK: str, type: str = "10-K"):
+        accession = _accession(CIK, type)
+        href = f"{str(request.base_url).rstrip('/')}/sec-www/Archives/edgar/data/{CIK.lstrip('0')}/" \
+               f"{accession.replace('-', '')}/{type.lower().replace('-', '')}.htm"
+        feed = (
+            '<?xml version="1.0" encoding="ISO-8859-1" ?><feed xmlns="http://www.w3.org/2005/Atom"><entry>'
+            f'<content type="text/xml"><filing-date>2024-04-16</filing-date></content>'
+            f'<id>urn:tag:sec.gov,2008:accession-number={accession}</id>'
+            f'<link rel="alternate" type="text/html" href="{href}"/></entry></feed>'
+        )
+        return Response(feed, media_type="application/atom+xml")
+
+    # ----- Cohere / Pinecone -----
+
+    @app.post("/cohere/v1/embed")
+    async def embed(request: Request):
+        texts = (await request.json()).get("texts", [])
+        embeddings = []
+        for text in texts:
+            rng = random.Random(_seed(text))
+            embeddings.append([rng.uniform(-1, 1) for _ in range(EMBED_DIM)])
+        return {"id": str(uuid.uuid4()), "response_type": "embeddings_floats", "embeddings": embeddings,
+                "texts": texts, "meta": {"api_version": {"version": "1"}}}
+
+    @app.post("/pinecone/query")
+    async def query(request: Request):
+        top_k = (await request.json()).get("topK", 5)
+        sentences = ANSWER.split(". ")
+        matches = [{
+            "id": f"TSMC_20F_20240416_101500_{i}",
+            "score": round(0.9 - i * 0.03, 4),
+            "values": [],
+            "metadata": {"text": sentences[i % len(sentences)] * 4, "source": "TSMC_20F_20240416_101500.txt",
+                         "offset": i * 1000},
+        } for i in range(top_k)]
+        return {"matches": matches, "namespace": "", "usage": {"readUnits": 5}}
+
+    # ----- Groq (OpenAI-compatible chat completions) -----
+
+    @app.post("/groq/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        tokens = [word + " " for word in ANSWER.split(" ")]
+        usage = {"prompt_tokens": 500, "completion_tokens": len(tokens), "total_tokens": 500 + len(tokens)}
+        if not body.get("stream"):
+            await asyncio.sleep(config["groq"].token_ms * len(tokens) / 1000)
+            return {"id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": ANSWER},
+                                 "finish_reason": "stop"}],
+                    "usage": usage}
+
+        def chunk(delta, finish=None):
+            data = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            for token in tokens:
+                await asyncio.sleep(config["groq"].token_ms / 1000)
+                yield chunk({"content": token})
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    # ----- gTTS -----
+
+    @app.post("/gtts/_/TranslateWebserverUi/data/batchexecute")
+    async def gtts_batchexecute(request: Request):
+        form = await request.form()
+        text = str(form.get("f.req", ""))
+        audio = base64.b64encode(MP3_FRAME * max(1, len(text) // 10)).decode()
+        # gTTS finds the audio with a regex over this exact (compact) layout
+        payload = json.dumps([["wrb.fr", "jQ1olc", json.dumps([audio]), None, None, None, "generic"]],
+                             separators=(",", ":"))
+        return PlainTextResponse(f")]}}'\n\n{len(payload)}\n{payload}\n")
+
+    return app
+
+
+def parse_overrides(items, field: str, config: dict) -> dict:
+    """Apply "upstream=value" CLI overrides (upstream "all" for every one) to `config`."""
+    for item in items or ():
+        name, _, value = item.partition("=")
+        for upstream in UPSTREAMS if name == "all" else [name]:
+            if upstream not in config:
+                raise ValueError(f"unknown upstream {upstream!r}; expected one of {', '.join(UPSTREAMS)}")
+            setattr(config[upstream], field, float(value))
+    return config
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", action="append", metavar="UPSTREAM=MS", help="mean added latency")
+    parser.add_argument("--jitter", action="append", metavar="UPSTREAM=MS", help="± uniform jitter")
+    parser.add_argument("--error-rate", action="append", metavar="UPSTREAM=P", help="fraction answered with 503")
+    parser.add_argument("--token-ms", type=float, help="delay between streamed Groq tokens")
+
+
+def config_from_args(args) -> dict:
+    config = default_config()
+    parse_overrides(args.latency, "latency_ms", config)
+    parse_overrides(args.jitter, "jitter_ms", config)
+    parse_overrides(args.error_rate, "error_rate", config)
+    if args.token_ms is not None:
+        config["groq"].token_ms = args.token_ms
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--config", help="JSON {upstream: {latency_ms, jitter_ms, error_rate, token_ms}}")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    config = config_from_args(args)
+    if args.config:
+        for name, values in json.loads(args.config).items():
+            config[name] = StubConfig(**values)
+    uvicorn.run(build_app(config), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Micro-benchmarks for the CPU-bound hot paths, on fixed synthetic fixtures (no network,
+no API keys):
+
+    pytest benchmarks/micro                                  # all of them
+    pytest benchmarks/micro -k faiss --benchmark-autosave    # saved under .benchmarks/
+    pytest benchmarks/micro --benchmark-compare              # against the last saved run
+
+Fixtures are seeded, so numbers from different commits measure the same work.
+"""
+import json
+import random
+
+import pytest
+
+WORDS = ("revenue margin wafer capacity guidance yield foundry node demand inventory export control "
+         "dividend capex depreciation segment customer currency risk factor fiscal quarter").split()
+
+
+def sentences(rng, n):
+    out = []
+    for _ in range(n):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+        out.append(" ".join(words).capitalize() + ".")
+    return out
+
+
+@pytest.fixture(scope="session")
+def rng():
+    return random.Random(1234)
+
+
+@pytest.fixture(scope="session")
+def docs_folder(tmp_path_factory, rng):
+    """Twenty ~100 kB filing texts."""
+    folder = tmp_path_factory.mktemp("docs")
+    for i in range(20):
+        (folder / f"SYM{i}_10K_{1000 + i}_20240101_000000.txt").write_text(" ".join(sentences(rng, 800)))
+    return str(folder)
+
+
+@pytest.fixture(scope="session")
+def filing_html(rng):
+    """A ~1 MB filing document with tables, like an EDGAR primary document."""
+    parts = ["<html><head><style>td {padding: 2px}</style></head><body>"]
+    for section in range(60):
+        parts.append(f"<h2>Item {section}</h2>")
+        parts.extend(f"<p><span>{s}</span></p>" for s in sentences(rng, 40))
+        parts.append("<table>" + "".join(
+            f"<tr><td>{rng.choice(WORDS)}</td><td>{rng.randint(1, 10 ** 6):,}</td></tr>" for _ in range(30)
+        ) + "</table>")
+    parts.append("</body></html>")
+    return "".join(parts).encode()
+
+
+@pytest.fixture(scope="session")
+def tickers_path(tmp_path_factory, rng):
+    """A company_tickers.json with 10,000 synthetic companies."""
+    data = {}
+    for i in range(10000):
+        name = " ".join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(1, 3)))
+        ticker = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(2, 5)))
+        data[str(i)] = {"cik_str": 100000 + i, "ticker": ticker, "title": f"{name} {rng.choice(['INC', 'CORP', 'LTD'])}"}
+    path = tmp_path_factory.mktemp("tickers") / "company_tickers.json"
+    path.write_text(json.dumps(data))
+    return str(path)
@@ -0,0 +1,56 @@
+import pytest
+
+from agents.api_agent.main import tail_records
+from agents.language_agent.ticker_matcher import load_aliases, load_ticker_matcher
+from agents.scraper_agent.main import html_to_text
+
+pd = pytest.importorskip("pandas")
+
+
+@pytest.mark.benchmark(group="html-to-text")
+def test_html_to_text(benchmark, filing_html):
+    text = benchmark(html_to_text, filing_html)
+    benchmark.extra_info["mb_per_s"] = round(len(filing_html) / 1e6 / benchmark.stats.stats.mean, 2)
+    assert "Item 59" in text
+
+
+@pytest.mark.benchmark(group="tickers")
+def test_ticker_matcher_load(benchmark, tickers_path):
+    matcher = benchmark(load_ticker_matcher, tickers_path, load_aliases())
+    assert len(matcher.ticker_to_cik) > 5000
+
+
+@pytest.mark.benchmark(group="tickers")
+def test_ticker_matching(benchmark, tickers_path):
+    matcher = load_ticker_matcher(tickers_path, load_aliases())
+    benchmark(matcher.match, "How did TSMC and Revenue Margin Corp react to the export controls?")
+
+
+@pytest.fixture(scope="module")
+def history():
+    """Two years of daily OHLCV plus a dividend series, shaped like yfinance output."""
+    index = pd.date_range("2022-01-03", periods=520, freq="B", tz="America/New_York", name="Date")
+    frame = pd.DataFrame({
+        "Open": range(520), "High": range(1, 521), "Low": range(520), "Close": range(520),
+        "Volume": range(10 ** 6, 10 ** 6 + 520), "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=index, dtype=float)
+    return frame
+
+
+@pytest.mark.benchmark(group="quote-records")
+def test_tail_records(benchmark, history):
+    records = benchmark(tail_records, history, 2)
+    assert len(records) == 2 and "Date" in records[0]
+
+
+@pytest.mark.benchmark(group="quote-records")
+def test_reset_index_then_tail(benchmark, history):
+    """The conversion tail_records replaced, kept for comparison."""
+    benchmark(lambda: history.reset_index().tail(2).to_dict("records"))
+
+
+@pytest.mark.benchmark(group="quote-records")
+def test_financials_to_dict(benchmark):
+    frame = pd.DataFrame({f"2024-0{q}-30": range(40) for q in range(1, 5)},
+                         index=[f"Line item {i}" for i in range(40)], dtype=float)
+    benchmark(lambda: frame.iloc[:, :3].to_dict())
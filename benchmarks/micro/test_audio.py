@@ -0,0 +1,40 @@
+import pytest
+
+from streamlit_app.audio_utils import frames_to_pcm16, save_audio_frames_to_mono_wav
+
+np = pytest.importorskip("numpy")
+
+RATE = 48000
+FRAME_SAMPLES = 960  # 20 ms WebRTC frames
+
+
+class Frame:
+    """The parts of av.AudioFrame the Streamlit helper uses."""
+
+    def __init__(self, array):
+        self._array = array
+        self.layout = type("Layout", (), {"channels": [None, None]})()
+        self.format = type("Format", (), {"is_planar": True})()
+
+    def to_ndarray(self):
+        return self._array
+
+
+@pytest.fixture(scope="module")
+def frames():
+    """Ten seconds of planar float stereo."""
+    rng = np.random.default_rng(3)
+    return [Frame(rng.uniform(-0.5, 0.5, (2, FRAME_SAMPLES)).astype(np.float32))
+            for _ in range(10 * RATE // FRAME_SAMPLES)]
+
+
+@pytest.mark.benchmark(group="wav-framing")
+def test_frames_to_pcm16(benchmark, frames):
+    arrays = [f.to_ndarray() for f in frames]
+    pcm = benchmark(frames_to_pcm16, arrays, 2)
+    assert pcm.size == 10 * RATE
+
+
+@pytest.mark.benchmark(group="wav-framing")
+def test_save_wav(benchmark, frames, tmp_path):
+    benchmark(save_audio_frames_to_mono_wav, frames, str(tmp_path / "out.wav"), RATE)
@@ -0,0 +1,50 @@
+import pytest
+
+from data_ingestion.build_faiss import build_index, chunk_documents
+
+np = pytest.importorskip("numpy")
+DIM = 384  # all-MiniLM-L6-v2
+
+
+@pytest.mark.benchmark(group="chunking")
+@pytest.mark.parametrize("chunk_size", [500, 1000, 4000])
+def test_chunk_documents(benchmark, docs_folder, chunk_size):
+    texts, _ = benchmark(chunk_documents, docs_folder, chunk_size)
+    benchmark.extra_info["chunks"] = len(texts)
+
+
+@pytest.mark.benchmark(group="embedding")
+def test_embedding_throughput(benchmark, docs_folder):
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    try:
+        model = sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2", local_files_only=True)
+    except Exception:
+        pytest.skip("all-MiniLM-L6-v2 is not in the local model cache")
+    texts, _ = chunk_documents(docs_folder, 1000)
+    texts = texts[:256]
+    benchmark.pedantic(model.encode, args=(texts,), kwargs={"convert_to_numpy": True, "batch_size": 64},
+                       rounds=3, warmup_rounds=1)
+    benchmark.extra_info["chunks_per_s"] = round(len(texts) / benchmark.stats.stats.mean, 1)
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    rng = np.random.default_rng(7)
+    return rng.standard_normal((100000, DIM), dtype=np.float32)
+
+
+@pytest.mark.benchmark(group="faiss-build")
+@pytest.mark.parametrize("size", [1000, 10000, 100000])
+def test_faiss_build(benchmark, vectors, size):
+    pytest.importorskip("faiss")
+    benchmark(build_index, vectors[:size])
+
+
+@pytest.mark.benchmark(group="faiss-search")
+@pytest.mark.parametrize("size", [1000, 10000, 100000])
+def test_faiss_search_latency(benchmark, vectors, size):
+    pytest.importorskip("faiss")
+    index = build_index(vectors[:size])
+    query = vectors[-1:] + 0.01
+    distances, ids = benchmark(index.search, query, 5)
+    assert ids.shape == (1, 5)
@@ -3,11 +3,46 @@ import glob
 import pickle
 import logging
 
-from sentence_transformers import SentenceTransformer
-import faiss
+from agents.common.partitions import parse_doc_filename
 
 logger = logging.getLogger("build_faiss")
 
+def chunk_documents(docs_folder: str, chunk_size: int = 1000):
+    """
+    (texts, metadatas) for every chunk_size-character piece of the .txt files in docs_folder.
+    Each chunk is tagged with its document's symbol, CIK, form type and date (from the
+    filename) so retrieval can be restricted to those partitions.
+    """
+    texts = []
+    metadatas = []
+    logger.info(f"Reading .txt files from {docs_folder}")
+    for txt_file in glob.glob(os.path.join(docs_folder, "*.txt")):
+        logger.info(f"Reading: {txt_file}")
+        with open(txt_file, encoding="utf-8") as f:
+            full = f.read()
+        source = os.path.basename(txt_file)
+        tags = parse_doc_filename(source)
+        for i in range(0, len(full), chunk_size):
+            chunk = full[i : i + chunk_size]
+            texts.append(chunk)
+            metadatas.append({
+                "source": source,
+                "offset": i,
+                "text": chunk,
+                **tags,
+            })
+    return texts, metadatas
+
+def build_index(embeddings):
+    """Exact (flat L2) FAISS index over an (n, dim) float32 array."""
+    import faiss
+
+    dimension = embeddings.shape[1]
+    logger.info(f"Building FAISS index with dimension {dimension}")
+    index = faiss.IndexFlatL2(dimension)
+    index.add(embeddings)
+    return index
+
 def ingest_and_index(
     docs_folder: str,
     index_path: str,
@@ -20,25 +55,15 @@ def ingest_and_index(
     3. Embed with SentenceTransformer
     4. Build a FAISS index and save it + metadata
     """
+    # Heavy imports are deferred so importing this module (celery worker, tests) stays cheap
+    from sentence_transformers import SentenceTransformer
+    import faiss
+
     logger.info(f"Loading embedder: {model_name}")
     model = SentenceTransformer(model_name)
 
-    texts = []
-    metadatas = []
     # 2) Read & chunk
-    logger.info(f"Reading .txt files from {docs_folder}")
-    for txt_file in glob.glob(os.path.join(docs_folder, "*.txt")):
-        logger.info(f"Reading: {txt_file}")
-        with open(txt_file, encoding="utf-8") as f:
-            full = f.read()
-        for i in range(0, len(full), chunk_size):
-            chunk = full[i : i + chunk_size]
-            texts.append(chunk)
-            metadatas.append({
-                "source": os.path.basename(txt_file),
-                "offset": i,
-                "text": chunk
-            })
+    texts, metadatas = chunk_documents(docs_folder, chunk_size)
 
     if not texts:
         logger.error(f"No .txt files found in {docs_folder}")
@@ -48,10 +73,7 @@ def ingest_and_index(
     embeddings = model.encode(texts, convert_to_numpy=True, show_progress_bar=True)
 
     # 4) Build FAISS index
-    dimension = embeddings.shape[1]
-    logger.info(f"Building FAISS index with dimension {dimension}")
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings)
+    index = build_index(embeddings)
 
     # 5) Persist index + metadata
     faiss.write_index(index, index_path)
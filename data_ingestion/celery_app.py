@@ -1,6 +1,20 @@
 from celery import Celery
+import json
+import logging
+import os
 import subprocess
-from .celeryconfig import beat_schedule
+import requests
+from .celeryconfig import PREWARM_EVERY_MINUTES, beat_schedule
+
+logger = logging.getLogger("celery_app")
+
+# Watchlist pre-warm: questions (and per-symbol briefs) answered ahead of demand
+PREWARM_WATCHLIST = os.getenv("PREWARM_WATCHLIST", "data_ingestion/watchlist.json")
+PREWARM_SYMBOL_QUESTION = os.getenv("PREWARM_SYMBOL_QUESTION", "Summarize {symbol}'s latest filing and today's price move.")
+ORCHESTRATOR_PREWARM_URL = os.getenv("ORCHESTRATOR_PREWARM_URL", "http://localhost:8006/prewarm")
+VOICE_PREWARM_URL = os.getenv("VOICE_PREWARM_URL", "http://localhost:8005/tts/prewarm")  # empty: skip audio
+PREWARM_REFRESH_AGE = os.getenv("PREWARM_REFRESH_AGE")  # s; default: cache max age minus the period
+PREWARM_TIMEOUT = float(os.getenv("PREWARM_TIMEOUT", "300"))
 
 app = Celery(
     "data_ingestion",  # match folder/module name!
@@ -15,9 +29,47 @@ def rebuild_faiss_index():
     docs_folder = "data_ingestion/docs"
     index_path = "data_ingestion/faiss_index"
     result = subprocess.run(
-        ["python3", "data_ingestion/build_faiss.py", "--docs_folder", docs_folder, "--index_path", index_path],
+        ["python3", "-m", "data_ingestion.build_faiss", "--docs_folder", docs_folder, "--index_path", index_path],
         capture_output=True, text=True
     )
     if result.returncode != 0:
         raise RuntimeError(f"FAISS index rebuild failed: {result.stderr}")
     return f"FAISS index rebuilt: {result.stdout}"
+
+
+def load_watchlist(path: str = PREWARM_WATCHLIST) -> list:
+    """Questions to pre-warm: the watchlist's `questions`, plus one brief per entry in `symbols`."""
+    with open(path) as f:
+        watchlist = json.load(f)
+    questions = list(watchlist.get("questions", []))
+    questions += [PREWARM_SYMBOL_QUESTION.format(symbol=s) for s in watchlist.get("symbols", [])]
+    return list(dict.fromkeys(q.strip() for q in questions if q.strip()))
+
+@app.task
+def prewarm_watchlist():
+    questions = load_watchlist()
+    if not questions:
+        return "Watchlist is empty"
+    # The period lets the orchestrator refresh only answers that would expire before the next run
+    body = {"questions": questions, "period": PREWARM_EVERY_MINUTES * 60}
+    if PREWARM_REFRESH_AGE:
+        body["refresh_age"] = float(PREWARM_REFRESH_AGE)
+    resp = requests.post(ORCHESTRATOR_PREWARM_URL, json=body, timeout=PREWARM_TIMEOUT)
+    if resp.status_code == 409:
+        return "Skipped: the previous pre-warm run is still in progress"
+    resp.raise_for_status()
+    summary = resp.json()
+    result = (f"Pre-warmed {summary['questions']} questions: {summary['fresh']} fresh, "
+              f"{summary['refreshed']} refreshed, {summary['failed']} failed")
+    # Audio only for answers that changed; fresh ones were synthesized by an earlier run
+    texts = [a["answer"] for a in summary["answers"] if a["outcome"] == "refreshed"]
+    if VOICE_PREWARM_URL and texts:
+        try:
+            tts = requests.post(VOICE_PREWARM_URL, json={"texts": texts}, timeout=PREWARM_TIMEOUT)
+            tts.raise_for_status()
+            result += f"; audio {tts.json()}"
+        except requests.RequestException as e:
+            logger.error(f"TTS pre-warm failed: {e}")
+            result += f"; audio failed: {e}"
+    logger.info(result)
+    return result
@@ -1,11 +1,27 @@
 # data_ingestion/celeryconfig.py
 
+import os
+
 from celery.schedules import crontab
 
+# Watchlist pre-warm, in short windows (Asia/Kolkata) leading into the market opens: Tokyo
+# 05:30, Taipei 06:30, Hong Kong 07:00 and New York 19:00 (20:00 in northern winter) IST.
+# With the period equal to the orchestrator's answer-cache lifetime (ANSWER_CACHE_MAX_AGE,
+# 300s by default) every run recomputes the whole watchlist once, so the LLM cost is
+# runs/day x watchlist questions: 4 hours x 12 runs = 48 runs, x 7 questions in the shipped
+# watchlist.json = 336 completions per weekday (plus their TTS). Widen PREWARM_HOURS only
+# if demand outside the opens justifies that cost
+PREWARM_EVERY_MINUTES = int(os.getenv("PREWARM_EVERY_MINUTES", "5"))
+PREWARM_HOURS = os.getenv("PREWARM_HOURS", "5-6,18-19")
+
 beat_schedule = {
     "rebuild-faiss-every-3h": {
         "task": "data_ingestion.celery_app.rebuild_faiss_index",  # <-- match module path!
         "schedule": crontab(minute=0, hour="*/3"),  # every 3 hours
-    }
+    },
+    "prewarm-watchlist": {
+        "task": "data_ingestion.celery_app.prewarm_watchlist",
+        "schedule": crontab(minute=f"*/{PREWARM_EVERY_MINUTES}", hour=PREWARM_HOURS, day_of_week="mon-fri"),
+        "options": {"expires": PREWARM_EVERY_MINUTES * 60},  # a late run is superseded by the next one
+    },
 }
- 
\ No newline at end of file
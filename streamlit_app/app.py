@@ -1,14 +1,15 @@
 import os
-import tempfile
 import requests
-import wave
-import numpy as np
-import soundfile as sf  # For debugging the saved WAV file
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import streamlit as st
+from requests.adapters import HTTPAdapter
 from streamlit_webrtc import webrtc_streamer, WebRtcMode, RTCConfiguration
 
+# `streamlit run streamlit_app/app.py` puts this directory on sys.path
+from audio_utils import save_audio_frames_to_mono_wav  # noqa: F401  (for WebRTC recordings)
+
 logger = logging.getLogger("streamlit_app")
 logging.getLogger("streamlit_webrtc").setLevel(logging.ERROR)
 
@@ -16,6 +17,8 @@ logging.getLogger("streamlit_webrtc").setLevel(logging.ERROR)
 VOICE_AGENT_URL = os.getenv("VOICE_AGENT_URL", "https://finance-ai-agent-1-u7bk.onrender.com/voice_brief")
 ORCH_URL = os.getenv("ORCHESTRATOR_AGENT_URL", "https://finance-ai-agent-rfqw.onrender.com/orchestrate")
 VOICE_TTS_URL = os.getenv("VOICE_TTS_URL", "https://finance-ai-agent-1-u7bk.onrender.com/tts")
+# How long identical questions / texts are answered from Streamlit's cache
+RESPONSE_CACHE_TTL = int(os.getenv("STREAMLIT_CACHE_TTL", "300"))
 
 WEBRTC_RTC_CONFIGURATION = RTCConfiguration({
     "iceServers": [{"urls": ["stun:stun.l.google.com:19302"]}]
@@ -25,26 +28,49 @@ MEDIA_CONSTRAINTS = {"audio": True, "video": False}
 st.set_page_config(page_title="Voice-Enabled Finance AI", layout="centered")
 st.title("🗣️ Finance AI Assistant — Voice Interface")
 
-def save_audio_frames_to_mono_wav(audio_frames, wav_path, sample_rate):
-    # Converts any input to mono 16-bit PCM, contiguous
-    with wave.open(wav_path, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)  # 16-bit
-        wf.setframerate(sample_rate)
-        for frame in audio_frames:
-            arr = frame.to_ndarray()
-            if arr.ndim > 1:
-                arr = np.mean(arr, axis=1)
-            if arr.dtype != np.int16:
-                arr = (arr * 32767).clip(-32768, 32767).astype(np.int16)
-            arr = np.ascontiguousarray(arr)
-            wf.writeframes(arr.tobytes())
-    # Log and debug the output file
-    try:
-        data, sr = sf.read(wav_path)
-        logger.info(f"[DEBUG] Saved WAV: shape={data.shape}, sr={sr}, dtype={data.dtype}")
-    except Exception as e:
-        logger.error(f"[DEBUG] Could not read saved WAV for inspection: {e}")
+
+# ——— Backend calls (shared across reruns and sessions) ———
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One keep-alive connection pool to the agents for the whole Streamlit server."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="backend")
+
+
+@st.cache_data(ttl=RESPONSE_CACHE_TTL, show_spinner=False)
+def ask_orchestrator(question: str) -> str:
+    resp = get_session().post(ORCH_URL, json={"question": question}, timeout=300)
+    resp.raise_for_status()
+    return resp.json().get("answer", "")
+
+
+@st.cache_data(ttl=RESPONSE_CACHE_TTL, show_spinner=False)
+def text_to_speech(text: str):
+    """(audio bytes, content type) from the voice agent's /tts."""
+    resp = get_session().post(VOICE_TTS_URL, data={"text": text}, timeout=120)
+    resp.raise_for_status()
+    return resp.content, resp.headers.get("content-type", "audio/mpeg")
+
+
+@st.cache_data(ttl=RESPONSE_CACHE_TTL, show_spinner=False)
+def voice_brief(audio: bytes, filename: str, content_type: str):
+    """(audio bytes, content type) of the spoken brief for an uploaded question."""
+    logger.info(f"Sending audio file to voice agent: {VOICE_AGENT_URL}")
+    resp = get_session().post(VOICE_AGENT_URL, files={"file": (filename, audio, content_type)}, timeout=300)
+    if resp.status_code != 200:
+        logger.error(f"Voice agent error {resp.status_code}: {resp.text}")
+    resp.raise_for_status()
+    return resp.content, resp.headers.get("content-type", "audio/mpeg")
+
 
 mode = st.radio("Select input mode:", [
     "Upload Audio File",
@@ -56,33 +82,20 @@ if mode == "Upload Audio File":
     if audio_file and st.button("Send to Assistant"):
         with st.spinner("Generating market brief…"):
             logger.info(f"User uploaded file: {audio_file.name} ({audio_file.type})")
-            file_suffix = os.path.splitext(audio_file.name)[-1]
-            with tempfile.NamedTemporaryFile(suffix=file_suffix, delete=False) as tmp:
-                tmp.write(audio_file.read())
-                upload_path = tmp.name
-            logger.info(f"Saved upload to {upload_path}")
-
             try:
-                with open(upload_path, "rb") as f:
-                    files = {"file": (audio_file.name, f, audio_file.type)}
-                    logger.info(f"Sending audio file to voice agent: {VOICE_AGENT_URL}")
-                    resp = requests.post(VOICE_AGENT_URL, files=files)
-                os.unlink(upload_path)
+                audio, content_type = voice_brief(audio_file.getvalue(), audio_file.name, audio_file.type)
+            except requests.HTTPError as e:
+                st.error(f"Error {e.response.status_code}: {e.response.text}")
+                audio = None
             except Exception as e:
                 logger.error(f"Error sending file to voice agent: {e}")
                 st.error(f"Error sending file: {e}")
-                resp = None
+                audio = None
 
-            if resp is not None:
-                if resp.status_code != 200:
-                    logger.error(f"Voice agent error {resp.status_code}: {resp.text}")
-                    st.error(f"Error {resp.status_code}: {resp.text}")
-                else:
-                    logger.info("Received successful response from voice agent.")
-                    st.success("Here’s your market brief:")
-                    st.audio(resp.content, format="audio/mp3")
-
- 
+            if audio is not None:
+                logger.info("Received successful response from voice agent.")
+                st.success("Here’s your market brief:")
+                st.audio(audio, format=content_type)
 
 elif mode == "Type Text (verbal answer)":
     user_text = st.text_area("Type your finance question here:")
@@ -90,22 +103,23 @@ elif mode == "Type Text (verbal answer)":
         with st.spinner("Generating answer…"):
             try:
                 # Step 1: Ask orchestrator for text answer
-                resp = requests.post(ORCH_URL, json={"question": user_text}, timeout=300)
-                resp.raise_for_status()
-                answer = resp.json().get("answer", "")
-                st.success("Here’s your market brief:")
-                st.write(answer)
-
-                # Step 2: TTS audio
-                tts_resp = requests.post(
-                    VOICE_TTS_URL, data={"text": answer}
-                )
-                if tts_resp.status_code == 200:
-                    st.audio(tts_resp.content, format="audio/mp3")
-                else:
-                    st.warning("Could not generate audio.")
+                answer = ask_orchestrator(user_text)
             except Exception as e:
                 st.error(f"Error: {e}")
+                answer = None
+
+        if answer is not None:
+            # Step 2: TTS audio, fetched while the text answer is rendered
+            tts_future = get_executor().submit(text_to_speech, answer)
+            st.success("Here’s your market brief:")
+            st.write(answer)
+            with st.spinner("Generating audio…"):
+                try:
+                    audio, content_type = tts_future.result()
+                    st.audio(audio, format=content_type)
+                except Exception as e:
+                    logger.error(f"TTS error: {e}")
+                    st.warning("Could not generate audio.")
 
 st.markdown("---")
 st.markdown("Built with FastAPI voice agent • Streamlit • streamlit-webrtc")
@@ -0,0 +1,44 @@
+import logging
+import wave
+
+import numpy as np
+
+logger = logging.getLogger("streamlit_app.audio_utils")
+
+
+def frames_to_pcm16(arrays, channels: int = 1, planar: bool = True) -> np.ndarray:
+    """
+    Mono 16-bit PCM from per-frame sample arrays (as returned by av's AudioFrame.to_ndarray),
+    converted in one pass over the concatenated samples. Planar frames are shaped
+    (channels, samples); packed ones interleave the channels.
+    """
+    if not arrays:
+        return np.zeros(0, dtype=np.int16)
+    if planar:
+        data = np.concatenate([a.reshape(channels, -1) for a in arrays], axis=1)
+    else:
+        data = np.concatenate([a.reshape(-1) for a in arrays]).reshape(-1, channels).T
+    mono = data.mean(axis=0) if channels > 1 else data[0]
+    if np.issubdtype(data.dtype, np.floating):
+        mono = np.rint(mono * 32767)
+    elif channels > 1:
+        mono = np.rint(mono)
+    return np.ascontiguousarray(mono.clip(-32768, 32767).astype(np.int16))
+
+
+def save_audio_frames_to_mono_wav(audio_frames, wav_path, sample_rate):
+    """Write WebRTC audio frames to `wav_path` as mono 16-bit PCM, in a single write."""
+    audio_frames = list(audio_frames)
+    if audio_frames:
+        first = audio_frames[0]
+        pcm = frames_to_pcm16([f.to_ndarray() for f in audio_frames],
+                              channels=len(first.layout.channels), planar=first.format.is_planar)
+    else:
+        pcm = frames_to_pcm16([])
+    with wave.open(wav_path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)  # 16-bit
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm.tobytes())
+    logger.debug(f"Saved WAV: {len(audio_frames)} frames, {pcm.size} samples at {sample_rate} Hz")
+    return pcm.size
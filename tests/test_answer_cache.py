@@ -0,0 +1,102 @@
+# tests/test_answer_cache.py
+
+from agents.orchestrator_agent.answer_cache import (
+    AnswerCache, cosine, embed_question, normalize_question, question_specifics,
+)
+
+QUESTION = "What's our risk exposure in Asia tech stocks today?"
+
+
+def test_normalized_question_and_symbol_order_share_a_key():
+    cache = AnswerCache()
+    cache.store(QUESTION, ["TSM", "005930.KS"], "brief", prices={"TSM": 180.0})
+    entry, match = cache.lookup("  what's our RISK exposure in asia tech stocks today ", ["005930.ks", "TSM"])
+    assert match == "exact" and entry.answer == "brief"
+    assert normalize_question("Whats  up?") == normalize_question("what's up")
+
+
+def test_paraphrase_hits_only_with_the_same_symbols():
+    cache = AnswerCache(similarity=0.5)
+    cache.store(QUESTION, ["TSM"], "brief")
+    hit = cache.lookup("Asia tech stocks risk exposure today?", ["TSM"])
+    assert hit is not None and hit[1] == "semantic"
+    assert cache.lookup("Asia tech stocks risk exposure today?", ["AAPL"]) is None
+    assert cosine(embed_question(QUESTION), embed_question("earnings surprises for bond funds")) < 0.5
+
+
+def test_different_year_is_not_a_paraphrase():
+    cache = AnswerCache()
+    cache.store("What is TSM price target for 2025?", ["TSM"], "2025 brief")
+    assert cosine(embed_question("What is TSM price target for 2025?"),
+                  embed_question("What is TSM price target for 2026?")) >= cache.similarity
+    assert cache.lookup("What is TSM price target for 2026?", ["TSM"]) is None
+    assert cache.lookup("TSM price target for 2025?", ["TSM"])[1] == "semantic"
+
+
+def test_different_quarter_is_not_a_paraphrase():
+    cache = AnswerCache(similarity=0.5)
+    cache.store("How did TSM do in Q1?", ["TSM"], "Q1 brief")
+    assert cache.lookup("How did TSM do in Q2?", ["TSM"]) is None
+    assert cache.lookup("How did TSM do in the second quarter?", ["TSM"]) is None
+    assert question_specifics("first quarter revenue") == question_specifics("Q1 revenue")
+
+
+def test_different_relative_period_is_not_a_paraphrase():
+    cache = AnswerCache()
+    cache.store("What was TSM revenue last year?", ["TSM"], "last year's brief")
+    assert cache.lookup("What was TSM revenue this year?", ["TSM"]) is None
+    assert cache.lookup("TSM revenue YTD?", ["TSM"]) is None
+    assert cache.lookup("What was TSM revenue in the past year?", ["TSM"])[1] == "semantic"
+    assert question_specifics("TSM today") != question_specifics("TSM yesterday")
+    assert question_specifics("year-to-date returns") == question_specifics("YTD returns")
+
+
+def test_different_form_is_not_a_paraphrase():
+    cache = AnswerCache(similarity=0.5)
+    cache.store("Summarize TSM's latest 20-F", ["TSM"], "20-F brief")
+    assert cache.lookup("Summarize TSM's latest 10-K", ["TSM"]) is None
+    assert cache.lookup("Summarize the latest TSM 20F", ["TSM"])[1] == "semantic"
+
+
+def test_entries_expire_after_the_staleness_window():
+    cache = AnswerCache(max_age=60)
+    cache.store(QUESTION, ["TSM"], "brief")
+    assert cache.lookup(QUESTION, ["TSM"], max_age=0) is None
+    cache._entries[next(iter(cache._entries))].created_at -= 61
+    assert cache.lookup(QUESTION, ["TSM"]) is None
+    assert cache.snapshot()["expired"] == 1
+
+
+def test_caller_max_age_cannot_exceed_the_cache_lifetime():
+    cache = AnswerCache(max_age=60)
+    cache.store(QUESTION, ["TSM"], "brief")
+    cache._entries[next(iter(cache._entries))].created_at -= 61
+    assert cache.lookup(QUESTION, ["TSM"], max_age=3600) is None
+
+
+def test_material_price_move_invalidates():
+    cache = AnswerCache(price_move=0.01)
+    cache.store(QUESTION, ["TSM"], "brief", prices={"TSM": 100.0})
+    cache.observe_price("TSM", 100.5)
+    assert cache.lookup(QUESTION, ["TSM"]) is not None
+    cache.observe_price("TSM", 102.0)
+    assert cache.lookup(QUESTION, ["TSM"]) is None
+    assert cache.snapshot()["invalidated_price"] == 1
+
+
+def test_new_filing_accession_invalidates():
+    cache = AnswerCache()
+    cache.store(QUESTION, ["TSM"], "brief", accessions={"TSM": "0001046179-25-000010"})
+    cache.observe_filing("TSM", "0001046179-25-000010")
+    assert cache.lookup(QUESTION, ["TSM"]) is not None
+    cache.observe_filing("TSM", "0001046179-25-000042")
+    assert cache.lookup(QUESTION, ["TSM"]) is None
+
+
+def test_uncounted_lookup_leaves_stats_alone():
+    cache = AnswerCache()
+    cache.store(QUESTION, ["TSM"], "brief")
+    assert cache.lookup(QUESTION, ["TSM"], count=False) is not None
+    assert cache.lookup("Unrelated question", ["TSM"], count=False) is None
+    stats = cache.snapshot()
+    assert stats["exact_hits"] == stats["semantic_hits"] == stats["misses"] == 0
@@ -0,0 +1,39 @@
+# tests/test_audio_utils.py
+
+import wave
+
+import numpy as np
+
+from streamlit_app.audio_utils import frames_to_pcm16, save_audio_frames_to_mono_wav
+
+
+class FakeFrame:
+    """The parts of av.AudioFrame the helper uses."""
+
+    def __init__(self, array, channels, planar):
+        self._array = array
+        self.layout = type("Layout", (), {"channels": [None] * channels})()
+        self.format = type("Format", (), {"is_planar": planar})()
+
+    def to_ndarray(self):
+        return self._array
+
+
+def test_planar_float_stereo_is_downmixed_and_scaled():
+    frames = [np.array([[0.5, -0.5], [0.5, 0.5]], dtype=np.float32), np.array([[1.0], [1.0]], dtype=np.float32)]
+    assert frames_to_pcm16(frames, channels=2).tolist() == [16384, 0, 32767]
+
+
+def test_packed_int16_stereo_is_deinterleaved():
+    frames = [np.array([[100, 300, -100, -300]], dtype=np.int16)]
+    assert frames_to_pcm16(frames, channels=2, planar=False).tolist() == [200, -200]
+
+
+def test_mono_int16_passes_through_unchanged(tmp_path):
+    samples = np.arange(-20000, 20000, 7, dtype=np.int16)
+    frames = [FakeFrame(chunk[np.newaxis], 1, False) for chunk in np.array_split(samples, 9)]
+    path = str(tmp_path / "out.wav")
+    assert save_audio_frames_to_mono_wav(frames, path, 48000) == samples.size
+    with wave.open(path) as w:
+        assert (w.getnchannels(), w.getframerate()) == (1, 48000)
+        assert np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16).tolist() == samples.tolist()
@@ -0,0 +1,45 @@
+# tests/test_backpressure.py
+
+import asyncio
+
+import pytest
+
+from agents.language_agent.backpressure import ConcurrencyLimiter, Saturated
+
+
+def test_full_queue_is_rejected_with_429():
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=1, queue_timeout=5)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        with pytest.raises(Saturated) as exc:
+            await limiter.acquire()
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return exc.value
+
+    err = asyncio.run(run())
+    assert err.status_code == 429 and err.retry_after >= 1
+    assert limiter.active == 0 and limiter.waiting == 0
+
+
+def test_queue_timeout_is_503():
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=4, queue_timeout=0.01)
+
+    async def run():
+        async with limiter.slot():
+            with pytest.raises(Saturated) as exc:
+                await limiter.acquire()
+        return exc.value
+
+    assert asyncio.run(run()).status_code == 503
+    assert limiter.snapshot()["timed_out"] == 1
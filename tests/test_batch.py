@@ -0,0 +1,79 @@
+# tests/test_batch.py
+
+import asyncio
+
+from agents.common.deadline import deadline_in
+from agents.orchestrator_agent.batch import run_batch
+
+DETAILS = {
+    "TSM": {"symbol": "TSM", "cik": "0001046179", "filing_type": "20-F"},
+    "AAPL": {"symbol": "AAPL", "cik": "0000320193", "filing_type": "10-K"},
+}
+
+
+def run(questions, **overrides):
+    calls = {"resolve": [], "quotes": [], "filing": [], "chunks": [], "llm": 0, "peak": 0}
+    active = {"n": 0}
+
+    async def resolve(question, deadline):
+        calls["resolve"].append(question)
+        return [DETAILS[s] for s in DETAILS if s.lower() in question.lower()] or [DETAILS["TSM"]]
+
+    async def fetch_quotes(symbols, deadline):
+        calls["quotes"].append(symbols)
+        return [{"symbol": s, "latest_price": 100.0} for s in symbols]
+
+    async def fetch_filing(detail, deadline):
+        calls["filing"].append(detail["cik"])
+        return {"document_text": f"{detail['symbol']} filing", "accession_number": "acc-" + detail["cik"]}
+
+    async def fetch_chunks(query, deadline, symbols=None):
+        calls["chunks"].append((query, symbols))
+        return [{"text": "chunk"}]
+
+    async def synthesize(question, context, deadline):
+        active["n"] += 1
+        calls["peak"] = max(calls["peak"], active["n"])
+        await asyncio.sleep(0.01)
+        active["n"] -= 1
+        calls["llm"] += 1
+        return f"brief: {question}"
+
+    async def collect():
+        return [item async for item in run_batch(
+            questions, deadline_in(30), resolve=resolve, fetch_quotes=fetch_quotes, fetch_filing=fetch_filing,
+            fetch_chunks=fetch_chunks, synthesize=synthesize, **overrides,
+        )]
+
+    return asyncio.run(collect()), calls
+
+
+def test_each_distinct_input_is_fetched_once():
+    questions = ["TSM outlook?", "tsm outlook", "TSM and AAPL margins", "AAPL buybacks", "TSM outlook?"]
+    items, calls = run(questions, max_concurrency=2)
+
+    answers = sorted((i for i in items if "index" in i), key=lambda i: i["index"])
+    assert [a["index"] for a in answers] == [0, 1, 2, 3, 4]
+    assert answers[2]["symbols"] == ["TSM", "AAPL"]
+    assert len(calls["resolve"]) == 3  # distinct normalised questions
+    assert calls["quotes"] == [["AAPL", "TSM"]]  # one quote call for every symbol
+    assert sorted(calls["filing"]) == ["0000320193", "0001046179"]
+    assert len(calls["chunks"]) == 3
+    assert ("TSM and AAPL margins", ["TSM", "AAPL"]) in calls["chunks"]  # filtered to the question's symbols
+    assert calls["llm"] == 5 and calls["peak"] <= 2
+    assert items[-1]["done"] and items[-1]["distinct_symbols"] == 2
+
+
+def test_cache_hits_skip_fetches_and_synthesis():
+    class Entry:
+        answer, symbols, age = "cached brief", ("TSM",), 5.0
+
+    remembered = []
+    items, calls = run(
+        ["TSM outlook?", "AAPL buybacks"],
+        lookup=lambda q, details: (Entry, "exact") if "TSM" in q else None,
+        remember=lambda q, result: remembered.append((q, result["filing_accessions"])),
+    )
+    assert items[0]["cached"] and items[0]["answer"] == "cached brief"
+    assert calls["quotes"] == [["AAPL"]] and calls["llm"] == 1
+    assert remembered == [("AAPL buybacks", {"AAPL": "acc-0000320193"})]
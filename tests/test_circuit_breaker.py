@@ -0,0 +1,36 @@
+# tests/test_circuit_breaker.py
+
+import pytest
+
+from agents.orchestrator_agent.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+
+
+def test_opens_once_failure_rate_is_reached():
+    breaker = CircuitBreaker("retriever", failure_rate=0.5, min_calls=4)
+    for _ in range(2):
+        breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("retriever", min_calls=1, open_seconds=0.0)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    breaker.before_call()  # the single probe
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()  # no second call while the probe is out
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
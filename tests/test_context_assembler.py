@@ -0,0 +1,24 @@
+# tests/test_context_assembler.py
+
+from agents.orchestrator_agent.context_assembler import assemble_context, count_tokens
+
+QUOTE = {"symbol": "TSM", "latest_price": 187.5, "latest_timestamp": "2025-05-30 16:00:00"}
+
+
+def test_context_stays_within_budget_and_reports_counts():
+    filing = "Revenue grew in Asia. " * 2000
+    chunks = [{"text": f"Chunk {i} about semiconductor demand " * 40, "score": i / 10} for i in range(10)]
+    context, stats = assemble_context([QUOTE], filing, chunks, budget=600)
+    assert stats["tokens_before"] > stats["tokens_after"]
+    assert stats["tokens_after"] <= 600 + 20  # section labels are not budgeted
+    assert "Latest quote for TSM: $187.5" in context
+    # highest-scoring chunk is kept first
+    assert context.index("Chunk 9") < context.index("Knowledge Base Chunks:") + 40
+
+
+def test_duplicate_chunks_are_dropped():
+    text = "TSMC reported record quarterly revenue driven by AI accelerator demand in Taiwan."
+    chunks = [{"text": text, "score": 0.9}, {"text": "  " + text.upper(), "score": 0.8}, {"text": "Unrelated note.", "score": 0.1}]
+    context, stats = assemble_context([QUOTE], "", chunks)
+    assert stats["chunks_used"] == 2 and stats["chunks_dropped"] == 1
+    assert count_tokens(context) == stats["tokens_after"]
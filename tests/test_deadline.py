@@ -0,0 +1,36 @@
+# tests/test_deadline.py
+
+import asyncio
+import time
+
+from agents.common.deadline import DEADLINE_HEADER, DeadlineMiddleware, current_deadline, time_left
+
+
+def _call(deadline):
+    sent, seen = [], {}
+
+    async def inner(scope, receive, send):
+        seen["deadline"] = current_deadline()
+        seen["time_left"] = time_left(100)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": "/quote", "headers": [(DEADLINE_HEADER.lower().encode(), str(deadline).encode())]}
+    asyncio.run(DeadlineMiddleware(inner)(scope, None, send))
+    return sent[0]["status"], seen
+
+
+def test_expired_requests_are_rejected_before_the_handler_runs():
+    status, seen = _call(time.time() - 1)
+    assert status == 504 and seen == {}
+
+
+def test_handlers_see_the_propagated_deadline():
+    deadline = time.time() + 5
+    status, seen = _call(deadline)
+    assert status == 200
+    assert seen["deadline"] == deadline
+    assert 0 < seen["time_left"] <= 5
+    assert current_deadline() is None
@@ -0,0 +1,23 @@
+# tests/test_doc_writer.py
+
+import os
+
+from agents.orchestrator_agent.doc_writer import HASH_INDEX, WriteBehindQueue
+
+
+def test_batches_are_written_once_per_content_hash(tmp_path):
+    (tmp_path / "TSMC_20F_20250528_204322.txt").write_text("already indexed filing", encoding="utf-8")
+    landed = []
+    writer = WriteBehindQueue(docs_dir=str(tmp_path), flush_interval=0.05, notifier=landed.extend)
+
+    assert writer.submit("new AAPL 10-K text", "AAPL", "10-K", "0000320193", "2024-11-01")
+    assert not writer.submit("new AAPL 10-K text", "AAPL", "10-K", "0000320193")  # queued duplicate
+    writer.submit("already indexed filing", "TSM", "20-F", "0001046179")  # duplicate of a file on disk
+    writer.stop()
+
+    files = sorted(f for f in os.listdir(tmp_path) if f.endswith(".txt"))
+    assert len(files) == 2
+    assert any(f.startswith("AAPL_10K_0000320193_filed20241101_") for f in files)
+    assert [os.path.basename(p) for p in landed] == [f for f in files if f.startswith("AAPL")]
+    assert writer.stats["duplicates"] == 2 and writer.stats["written"] == 1
+    assert len((tmp_path / HASH_INDEX).read_text().split()) == 2
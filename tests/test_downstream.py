@@ -0,0 +1,30 @@
+# tests/test_downstream.py
+
+import pytest
+
+from agents.orchestrator_agent import circuit_breaker
+from agents.orchestrator_agent.circuit_breaker import CLOSED, OPEN, CircuitBreaker, CircuitOpen
+from agents.orchestrator_agent.downstream import guarded
+
+
+def test_exceptions_without_a_status_open_the_circuit():
+    breaker = circuit_breaker._breakers["scraper-test"] = CircuitBreaker("scraper-test", min_calls=3)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            with guarded("scraper-test"):
+                raise ConnectionError("connection refused")  # e.g. requests.ConnectionError in-process
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpen):
+        with guarded("scraper-test"):
+            pass
+
+
+def test_4xx_means_the_agent_is_up():
+    class NotFound(Exception):
+        status_code = 404
+
+    breaker = circuit_breaker._breakers["api-test"] = CircuitBreaker("api-test", min_calls=1)
+    with pytest.raises(NotFound):
+        with guarded("api-test"):
+            raise NotFound()
+    assert breaker.state == CLOSED and breaker.snapshot()["failure_rate"] == 0.0
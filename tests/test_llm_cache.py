@@ -0,0 +1,62 @@
+# tests/test_llm_cache.py
+
+import asyncio
+
+from agents.language_agent.llm_cache import DiskTier, LLMCache, cache_key
+
+
+def test_cache_key_depends_on_model_temperature_and_prompt():
+    assert cache_key("m", 0.5, "p") == cache_key("m", 0.5, "p")
+    assert cache_key("m", 0.5, "p") != cache_key("m", 0.0, "p")
+    assert cache_key("m", 0.5, "p") != cache_key("other", 0.5, "p")
+
+
+def test_concurrent_identical_prompts_share_one_completion():
+    cache = LLMCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "brief"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["brief"] * 5
+    assert len(calls) == 1
+    stats = cache.snapshot()
+    assert stats["misses"] == 1 and stats["shared"] == 4
+
+
+def test_lru_eviction_and_bypass():
+    cache = LLMCache(max_entries=2)
+
+    async def run():
+        for key in ("a", "b", "c"):
+            await cache.get_or_compute(key, lambda key=key: asyncio.sleep(0, result=key))
+        fresh = await cache.get_or_compute("b", lambda: asyncio.sleep(0, result="new"), bypass=True)
+        return fresh
+
+    assert asyncio.run(run()) == "new"
+    snap = cache.snapshot()
+    assert snap["entries"] == 2 and snap["evictions"] == 1 and snap["bypassed"] == 1
+
+
+def test_disk_tier_survives_a_new_process_cache(tmp_path):
+    tier = DiskTier(str(tmp_path))
+
+    async def run(cache, value):
+        return await cache.get_or_compute("k", lambda: asyncio.sleep(0, result=value))
+
+    assert asyncio.run(run(LLMCache(tier=tier), "first")) == "first"
+    assert asyncio.run(run(LLMCache(tier=tier), "second")) == "first"
+
+
+def test_streamed_answers_reach_the_tier_and_peek_reads_it(tmp_path):
+    tier = DiskTier(str(tmp_path))
+    asyncio.run(LLMCache(tier=tier).put("k", "streamed"))
+    cache = LLMCache(tier=tier)
+    assert asyncio.run(cache.peek("k")) == "streamed"
+    assert cache.stats["tier_hits"] == 1 and cache.snapshot()["entries"] == 1
+    assert asyncio.run(cache.peek("missing")) is None
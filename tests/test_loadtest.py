@@ -0,0 +1,46 @@
+# tests/test_loadtest.py
+
+import asyncio
+import time
+
+from benchmarks.loadtest.loadgen import Sample, Scenario, arrivals, percentile, regressions, run_open_loop, summarize
+
+
+def test_arrivals_match_the_rate():
+    assert len(arrivals(10, 2, poisson=False)) == 19
+    assert 1800 <= len(arrivals(100, 20, seed=3)) <= 2200
+
+
+def test_open_loop_keeps_starting_requests_while_others_are_slow():
+    started = []
+
+    async def slow():
+        started.append(time.perf_counter())
+        await asyncio.sleep(0.5)
+        return 200, None
+
+    async def failing():
+        raise ConnectionError()
+
+    scenarios = [Scenario("slow", slow, weight=3), Scenario("failing", failing, weight=1)]
+    t = time.perf_counter()
+    samples, lag = asyncio.run(run_open_loop(scenarios, rate=40, duration=0.5, poisson=False, seed=1))
+    # 19 requests in 0.5s although each slow one takes 0.5s: nothing waited for a response
+    assert len(samples) == 19 and time.perf_counter() - t < 1.5
+    assert max(started) - min(started) < 0.6 and lag < 0.1
+    assert {s.error for s in samples if s.scenario == "failing"} == {"ConnectionError"}
+
+
+def test_summarize_and_regressions():
+    samples = [Sample("quote", i / 100, (i + 1) / 1000, True, 200) for i in range(100)]
+    samples += [Sample("quote", 1.0, 0.5, False, 503)]
+    report = summarize(samples, duration=10)
+    quote = report["quote"]
+    assert (quote["p50_ms"], quote["p95_ms"], quote["p99_ms"]) == (50.0, 95.0, 99.0)
+    assert quote["errors"] == {"503": 1} and quote["throughput_rps"] == 10.0
+    assert report["all"]["requests"] == 101
+    assert percentile([], 50) is None
+
+    slower = summarize([Sample("quote", 0, 0.2, True, 200)], duration=1)
+    assert ("quote", "p50_ms", 50.0, 200.0) in regressions(slower, report)
+    assert regressions(report, report) == []
@@ -0,0 +1,38 @@
+# tests/test_metrics.py
+
+import asyncio
+
+from agents.common.metrics import OUTBOUND_LATENCY, MetricsMiddleware, Registry, track
+
+
+def test_histogram_renders_prometheus_text():
+    registry = Registry()
+    hist = registry.histogram("demo_seconds", "Demo latency", ("target",), buckets=(0.1, 1.0))
+    hist.observe(0.05, target="groq")
+    hist.observe(0.5, target="groq")
+    registry.counter("demo_total", "Demo counter", ("cache",)).inc(cache="llm")
+    text = registry.render()
+    assert 'demo_seconds_bucket{target="groq",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{target="groq",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{target="groq"} 2' in text
+    assert 'demo_total{cache="llm"} 1.0' in text
+
+
+def test_middleware_adds_server_timing_breakdown_on_request():
+    async def app(scope, receive, send):
+        with track("cohere"):
+            pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/retrieve", "headers": [(b"x-debug-timing", b"1")]}
+    asyncio.run(MetricsMiddleware(app, service="retriever_agent")(scope, None, send))
+    headers = dict(sent[0]["headers"])
+    assert b"total;dur=" in headers[b"server-timing"]
+    assert b"cohere;dur=" in headers[b"server-timing"]
+    assert OUTBOUND_LATENCY._values[("cohere", "ok")]["count"] >= 1
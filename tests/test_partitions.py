@@ -0,0 +1,37 @@
+from agents.common.partitions import PartitionFilter, parse_doc_filename
+
+
+def test_parse_doc_filename():
+    tags = parse_doc_filename("scraped_docs/TSM_20F_0001046179_filed20250417_20250528_120301_2.txt")
+    assert tags == {"symbol": "TSM", "form_type": "20F", "cik": "0001046179",
+                    "filing_date": "2025-04-17", "filing_day": 20250417}
+
+
+def test_save_time_is_not_a_filing_date():
+    tags = parse_doc_filename("TSM_20F_0001046179_20250528_120301.txt")
+    assert tags == {"symbol": "TSM", "form_type": "20F", "cik": "0001046179"}
+
+
+def test_parse_legacy_and_foreign_names():
+    tags = parse_doc_filename("TSMC_20F_20250527_093000.txt")
+    assert tags["symbol"] == "TSM" and tags["cik"] == "0001046179"
+    assert "cik" not in parse_doc_filename("AAPL_10K_20250527_093000.txt")
+    assert parse_doc_filename("notes.txt") == {}
+
+
+def test_filter_matches():
+    tags = parse_doc_filename("TSM_20F_0001046179_filed20250528_20250601_120301.txt")
+    assert PartitionFilter(symbols=["tsm"], form_types=["20-F"]).matches(tags)
+    assert PartitionFilter(ciks=["1046179"], date_from="2025-05-01", date_to="2025-05-28").matches(tags)
+    assert not PartitionFilter(symbols=["AAPL"]).matches(tags)
+    assert not PartitionFilter(date_from="2025-06-01").matches(tags)
+    assert not PartitionFilter(date_to="2025-01-01").matches({})
+    assert not PartitionFilter()
+
+
+def test_pinecone_filter():
+    assert PartitionFilter().pinecone() is None
+    assert PartitionFilter(symbols=["TSM"]).pinecone() == {"symbol": {"$in": ["TSM"]}}
+    assert PartitionFilter(symbols=["TSM"], date_from="2025-05-01").pinecone() == {
+        "$and": [{"symbol": {"$in": ["TSM"]}}, {"filing_day": {"$gte": 20250501}}]
+    }
@@ -0,0 +1,43 @@
+# tests/test_prewarm.py
+
+from agents.orchestrator_agent.prewarm import (
+    PREWARM_COVERAGE, PREWARM_QUESTIONS, record_prewarm, refresh_age_for, summarize_prewarm,
+)
+
+ERROR_ANSWER = "Sorry, there was an error generating your market brief."
+
+
+def test_summary_counts_outcomes_coverage_and_freshness():
+    items = [
+        {"index": 2, "question": "AAPL buybacks", "answer": ERROR_ANSWER, "cached": False},
+        {"index": 0, "question": "TSM outlook?", "answer": "cached brief", "cached": True, "age_seconds": 90.0},
+        {"index": 1, "question": "Asia tech risk", "answer": "new brief", "cached": False, "symbols": ["TSM"]},
+        {"index": 3, "question": "NVDA margins", "error": "timeout", "cached": False},
+        {"done": True, "questions": 4, "elapsed_ms": 1500.0},
+    ]
+    summary = summarize_prewarm(items, ERROR_ANSWER)
+    assert (summary["fresh"], summary["refreshed"], summary["failed"]) == (1, 1, 2)
+    assert summary["coverage"] == 0.5 and summary["oldest_age_seconds"] == 90.0
+    assert [a["outcome"] for a in summary["answers"]] == ["fresh", "refreshed", "failed", "failed"]
+    assert summary["answers"][1]["symbols"] == ["TSM"]
+
+    record_prewarm(summary)
+    assert PREWARM_COVERAGE.value() == 0.5
+    assert PREWARM_QUESTIONS.value(outcome="failed") == 2
+
+
+def test_empty_run():
+    summary = summarize_prewarm([{"done": True, "elapsed_ms": 1.0}], ERROR_ANSWER)
+    assert summary["questions"] == 0 and summary["coverage"] == 0.0 and summary["oldest_age_seconds"] is None
+
+
+def test_refresh_only_answers_that_would_expire_before_the_next_run():
+    refresh_age = refresh_age_for(max_age=300, period=60)
+    assert refresh_age == 240
+    # An answer made in one run is kept by the next four (the last sees it at exactly
+    # max_age, still servable) and refreshed by the fifth
+    ages = [60 * n for n in range(1, 6)]
+    assert [age > refresh_age for age in ages] == [False, False, False, False, True]
+    assert refresh_age_for(max_age=300, period=300) == 0.0  # default schedule: one recompute per run
+    assert refresh_age_for(max_age=300, period=600) == 0.0  # runs too rare: always refresh
+    assert refresh_age_for(max_age=300, period=60, refresh_age=30) == 30
@@ -26,3 +26,11 @@ def test_retrieve_endpoint():
         assert "text" in chunk
         assert "source" in chunk
         assert isinstance(chunk["score"], float)
+
+def test_retrieve_with_partition_filter():
+    # Unknown partitions fall back to an unfiltered search instead of returning nothing
+    response = client.post("/retrieve", json={"query": "Asia tech stocks", "top_k": 3, "symbols": ["ZZZZ"]})
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["filtered"] is False
+    assert len(data["results"]) <= 3
@@ -0,0 +1,51 @@
+# tests/test_ticker_matcher.py
+
+from agents.language_agent.ticker_matcher import TickerMatcher, normalize_name
+
+ENTRIES = [
+    {"cik_str": 1046179, "ticker": "TSM", "title": "TAIWAN SEMICONDUCTOR MANUFACTURING CO LTD"},
+    {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."},
+    {"cik_str": 749251, "ticker": "IT", "title": "GARTNER INC"},
+    {"cik_str": 1097864, "ticker": "ON", "title": "ON SEMICONDUCTOR CORP"},
+    {"cik_str": 27419, "ticker": "TGT", "title": "TARGET CORP"},
+    {"cik_str": 1318605, "ticker": "TSLA", "title": "Tesla, Inc."},
+    {"cik_str": 1564708, "ticker": "NWSA", "title": "NEWS CORP"},
+]
+
+matcher = TickerMatcher(ENTRIES, aliases={"tsmc": "TSM", "tesla": "TSLA"})
+
+
+def test_normalize_name_strips_legal_suffixes():
+    assert normalize_name("TAIWAN SEMICONDUCTOR MANUFACTURING CO LTD") == ["taiwan", "semiconductor", "manufacturing"]
+    assert normalize_name("Apple Inc.") == ["apple"]
+
+
+def test_ticker_alias_and_name_matches():
+    result = matcher.match("Compare TSMC with Apple and AAPL options")
+    assert not result.ambiguous
+    assert [m.symbol for m in result.matches] == ["TSM", "AAPL"]
+    assert result.matches[0].cik == "0001046179"
+
+
+def test_common_word_tickers_need_a_cashtag():
+    assert matcher.match("Is IT a good time to buy?").matches == []
+    result = matcher.match("Is now a good time to buy $ON?")
+    assert [m.symbol for m in result.matches] == ["ON"]
+    assert result.matches[0].confidence == 1.0
+
+
+def test_weak_only_matches_are_ambiguous():
+    result = matcher.match("what about target this quarter")
+    assert result.matches == []
+    assert result.ambiguous
+
+
+def test_possessives_match():
+    assert [m.symbol for m in matcher.match("What is TSMC's revenue?").matches] == ["TSM"]
+    assert [m.symbol for m in matcher.match("Apple\u2019s margins").matches] == ["AAPL"]
+
+
+def test_capitalised_common_word_is_not_a_company():
+    result = matcher.match("Show me the latest News on Tesla")
+    assert [m.symbol for m in result.matches] == ["TSLA"]
+    assert [m.symbol for m in matcher.match("NWSA and $NWSA").matches] == ["NWSA"]
@@ -0,0 +1,11 @@
+from agents.common.tokens import count_tokens, truncate_to_tokens
+
+
+def test_count_and_truncate_agree():
+    text = "Apple's revenue rose 8% year over year, driven by services. " * 20
+    assert count_tokens("") == 0
+    assert count_tokens(text) > count_tokens(text[:100]) > 0
+    cut = truncate_to_tokens(text, 50)
+    assert text.startswith(cut) and count_tokens(cut) <= 52
+    assert truncate_to_tokens(text, 0) == ""
+    assert truncate_to_tokens("short", 50) == "short"
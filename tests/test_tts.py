@@ -0,0 +1,126 @@
+# tests/test_tts.py
+
+import asyncio
+import io
+import time
+import wave
+
+import pytest
+
+from agents.voice_agent.tts import (
+    EspeakEngine, SentenceBuffer, TTSCache, TTSEngine, TTSService, WavEngine, split_sentences,
+)
+
+ANSWER = ("Asia tech is 22% of AUM, up from 18% yesterday. TSMC beat estimates by 4%, while Samsung missed by 2%. "
+          "Regional sentiment is neutral with a cautionary tilt due to rising yields.")
+
+
+class FakeEngine(TTSEngine):
+    name = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def synthesize(self, text):
+        self.calls.append(text)
+        time.sleep(0.05 if text.startswith("Asia") else 0.0)  # first sentence is the slowest
+        return f"<{text}>".encode()
+
+
+def test_split_sentences_keeps_decimals_and_merges_fragments():
+    assert split_sentences(ANSWER) == [
+        "Asia tech is 22% of AUM, up from 18% yesterday.",
+        "TSMC beat estimates by 4%, while Samsung missed by 2%.",
+        "Regional sentiment is neutral with a cautionary tilt due to rising yields.",
+    ]
+    assert split_sentences("Yes. Prices rose 1.5% on the day.") == ["Yes. Prices rose 1.5% on the day."]
+    assert all(len(p) <= 60 for p in split_sentences("word, " * 40, max_chars=60))
+
+
+def test_stream_yields_sentences_in_order_and_caches(tmp_path):
+    engine = FakeEngine()
+    service = TTSService(engine, TTSCache(str(tmp_path)))
+
+    async def collect():
+        return [piece async for piece in service.stream(ANSWER)]
+
+    pieces = asyncio.run(collect())
+    assert b"".join(pieces).startswith(b"<Asia tech")
+    assert len(pieces) == 3 and len(engine.calls) == 3
+    asyncio.run(collect())
+    assert len(engine.calls) == 3  # every sentence came from the cache
+    assert service.cache.snapshot()["hits"] == 3
+
+
+def test_sentence_buffer_emits_sentences_as_tokens_arrive():
+    buffer = SentenceBuffer()
+    emitted = []
+    for i in range(0, len(ANSWER), 7):  # token-sized chunks
+        emitted.append(buffer.feed(ANSWER[i:i + 7]))
+    emitted.append(buffer.flush())
+    sentences = [s for batch in emitted for s in batch]
+    assert sentences == split_sentences(ANSWER)
+    assert emitted[-1] == [sentences[-1]]  # only the last one had to wait for the end
+
+
+def test_stream_sentences_synthesizes_before_the_text_is_complete(tmp_path):
+    engine = FakeEngine()
+    service = TTSService(engine, TTSCache(str(tmp_path)))
+    received = []
+
+    async def tokens():
+        for sentence in split_sentences(ANSWER):
+            yield sentence
+            await asyncio.sleep(0.1)  # the LLM is still writing
+
+    async def collect():
+        async for piece in service.stream_sentences(tokens()):
+            received.append((piece, len(engine.calls)))
+
+    asyncio.run(collect())
+    assert [p for p, _ in received] == [f"<{s}>".encode() for s in split_sentences(ANSWER)]
+    assert received[0][1] == 1  # first audio arrived before later sentences were written
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=250)
+    for name in ("a", "b", "c"):
+        cache.put(name, "mp3", b"x" * 100)
+        time.sleep(0.01)
+    assert cache.get("a", "mp3") is None and cache.get("c", "mp3") is not None
+    assert cache.snapshot()["evictions"] == 1
+
+
+def test_wav_pieces_form_one_stream():
+    def wav(n):
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1), w.setsampwidth(2), w.setframerate(22050)
+            w.writeframes(b"\x01\x00" * n)
+        return buf.getvalue()
+
+    engine = EspeakEngine()  # any WAV engine; nothing is synthesized
+    first, second = engine.stream_piece(wav(10), True), engine.stream_piece(wav(5), False)
+    assert first[:4] == b"RIFF" and len(first) == 44 + 20
+    assert second == b"\x01\x00" * 5
+
+
+def test_engine_without_synthesize_cannot_be_built():
+    with pytest.raises(TypeError):
+        WavEngine()
+
+
+def test_warm_caches_sentences_and_short_whole_texts(tmp_path):
+    engine = FakeEngine()
+    service = TTSService(engine, TTSCache(str(tmp_path)))
+
+    outcomes = asyncio.run(service.warm([ANSWER, ANSWER]))
+    assert outcomes == {"cached": 0, "synthesized": 4, "failed": 0}  # 3 sentences + the whole answer
+    assert asyncio.run(service.warm([ANSWER])) == {"cached": 4, "synthesized": 0, "failed": 0}
+
+    async def collect():
+        return [piece async for piece in service.stream(ANSWER)]
+
+    asyncio.run(collect())
+    service.synthesize_sync(ANSWER)
+    assert len(engine.calls) == 4  # /tts/stream and /tts both served from the warmed cache
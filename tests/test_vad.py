@@ -0,0 +1,45 @@
+# tests/test_vad.py
+
+import math
+import struct
+
+from agents.voice_agent.vad import Resampler, Segmenter
+
+RATE = 16000
+
+
+def tone(ms, amplitude=8000):
+    n = RATE * ms // 1000
+    return struct.pack(f"<{n}h", *(int(amplitude * math.sin(2 * math.pi * 440 * i / RATE)) for i in range(n)))
+
+
+def silence(ms, amplitude=30):
+    n = RATE * ms // 1000
+    return struct.pack(f"<{n}h", *((amplitude if i % 2 else -amplitude) for i in range(n)))
+
+
+def test_segments_close_at_pauses_and_end_after_long_silence():
+    segmenter = Segmenter(pause_ms=300, end_ms=800)
+    stream = silence(300) + tone(600) + silence(400) + tone(900) + silence(1000)
+    events = []
+    for i in range(0, len(stream), 3200):  # 100 ms chunks, as a client would send them
+        events.extend(segmenter.feed(stream[i:i + 3200]))
+
+    kinds = [kind for kind, _ in events]
+    assert kinds == ["segment", "segment", "end"]
+    first, second = events[0][1], events[1][1]
+    assert 0.6 <= len(first) / (RATE * 2) <= 1.2
+    assert 0.9 <= len(second) / (RATE * 2) <= 1.5
+    assert segmenter.flush() is None
+
+
+def test_long_speech_is_cut_and_remainder_flushed():
+    segmenter = Segmenter(max_segment_s=1.0)
+    events = segmenter.feed(silence(100) + tone(1500))
+    assert [kind for kind, _ in events] == ["segment"]
+    assert segmenter.flush() is not None
+
+
+def test_resampler_converts_rate():
+    out = Resampler(8000)(silence(1000)[: 8000 * 2])
+    assert abs(len(out) - RATE * 2) <= 8
@@ -0,0 +1,41 @@
+# tests/test_warmup.py
+
+import threading
+
+from agents.common.warmup import Lazy
+
+
+def test_lazy_builds_once_on_first_use():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return object()
+
+    lazy = Lazy("client", build)
+    assert not lazy.loaded and calls == []
+    threads = [threading.Thread(target=lazy.get) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert lazy.loaded and len(calls) == 1
+    assert lazy.get() is lazy.get()
+
+
+def test_failed_build_is_retried():
+    attempts = []
+
+    def build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("cold network")
+        return "client"
+
+    lazy = Lazy("client", build)
+    try:
+        lazy.get()
+    except RuntimeError:
+        pass
+    assert not lazy.loaded
+    assert lazy.get() == "client"